@@ -1,23 +1,53 @@
 # main.py
+import time
+
+# Taken before the other imports so startup timings include them
+PROCESS_STARTED = time.perf_counter()
+
+import os
+import sys
 import tkinter as tk
+from contextlib import contextmanager
 from tkinter import ttk
 from controllers.auth_controller import AuthController
 from controllers.student_controller import StudentController
 from controllers.admin_controller import AdminController
 from models.database_manager import DatabaseManager
 from views.login_view import LoginView
+from views.task_executor import TkTaskExecutor
+
+# "production" leaves the sample data out of new databases
+MODE_ENV = "STUDENT_REGISTRATION_MODE"
+# Set to print startup phase timings even when within budget
+STARTUP_REPORT_ENV = "STUDENT_REGISTRATION_STARTUP_REPORT"
+
+# The login screen should be drawn and usable within this many milliseconds of launch
+STARTUP_BUDGET_MS = 1500
 
 class MainApplication:
-    def __init__(self):
-        self.root = tk.Tk()
-        self.root.title("ระบบลงทะเบียนเรียนล่วงหน้า")
-        self.root.geometry("800x600")
-        self.root.resizable(True, True)
+    def __init__(self, db_path="student_registration.db", mode=None, started=None, on_ready=None):
+        self.mode = mode or os.environ.get(MODE_ENV, "development")
+        self.started = PROCESS_STARTED if started is None else started
+        self.on_ready = on_ready
+        self.startup_timings = {}
+        self.time_to_interactive_ms = None
+        
+        with self.startup_phase("window"):
+            self.root = tk.Tk()
+            self.root.title("ระบบลงทะเบียนเรียนล่วงหน้า")
+            self.root.geometry("800x600")
+            self.root.resizable(True, True)
+        
+        # Initialize database; the DDL is skipped when the schema is already set up
+        with self.startup_phase("schema"):
+            self.db_manager = DatabaseManager(db_path)
+            self.db_manager.ensure_schema(registration_counters=True)
+        if self.mode != "production":
+            with self.startup_phase("sample_data"):
+                self.db_manager.insert_sample_data()
         
-        # Initialize database
-        self.db_manager = DatabaseManager()
-        self.db_manager.create_tables()
-        self.db_manager.insert_sample_data()
+        # Worker pool shared by every view for controller calls
+        self.executor = TkTaskExecutor(self.root)
         
         # Initialize controllers
         self.auth_controller = AuthController(self.db_manager)
@@ -29,18 +59,49 @@ class MainApplication:
         self.current_user = None
         
         # Show login screen
-        self.show_login()
+        with self.startup_phase("login_view"):
+            self.show_login()
+        
+        # The window is drawn by idle handlers that run once it is mapped
+        self._map_binding = self.root.bind("<Map>", self.on_root_mapped, add="+")
+    
+    @contextmanager
+    def startup_phase(self, name):
+        phase_started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[name] = round((time.perf_counter() - phase_started) * 1000, 1)
+    
+    def on_root_mapped(self, event):
+        if event.widget is self.root and self.time_to_interactive_ms is None:
+            self.root.unbind("<Map>", self._map_binding)
+            self.root.after_idle(self.on_first_frame)
+    
+    def on_first_frame(self):
+        self.time_to_interactive_ms = round((time.perf_counter() - self.started) * 1000, 1)
+        if os.environ.get(STARTUP_REPORT_ENV) or self.time_to_interactive_ms > STARTUP_BUDGET_MS:
+            print(self.startup_report(), file=sys.stderr)
+        if self.on_ready:
+            self.on_ready(self)
+    
+    def startup_report(self):
+        phases = ", ".join(f"{name} {ms}ms" for name, ms in self.startup_timings.items())
+        verdict = "over budget" if self.time_to_interactive_ms > STARTUP_BUDGET_MS else "within budget"
+        return (f"startup: {phases}; interactive after {self.time_to_interactive_ms}ms "
+                f"({verdict} of {STARTUP_BUDGET_MS}ms)")
     
     def show_login(self):
         if self.current_view:
             self.current_view.destroy()
         
-        self.current_view = LoginView(self.root, self.on_login_success)
+        self.current_view = LoginView(self.root, self.auth_controller, self.on_login_success,
+                                      executor=self.executor)
     
-    def on_login_success(self, user_id, user_type):
-        self.current_user = {"id": user_id, "type": user_type}
+    def on_login_success(self, session):
+        self.current_user = {"id": session.user_id, "type": session.user_type, "token": session.token}
         
-        if user_type == "admin":
+        if session.user_type == "admin":
             self.show_admin_dashboard()
         else:
             self.show_student_dashboard()
@@ -53,7 +114,8 @@ class MainApplication:
         self.current_view = AdminView(
             self.root, 
             self.admin_controller,
-            self.logout
+            self.logout,
+            executor=self.executor
         )
     
     def show_student_dashboard(self):
@@ -65,15 +127,19 @@ class MainApplication:
             self.root,
             self.student_controller,
             self.current_user["id"],
-            self.logout
+            self.logout,
+            executor=self.executor
         )
     
     def logout(self):
+        if self.current_user:
+            self.auth_controller.logout(self.current_user["token"])
         self.current_user = None
         self.show_login()
     
     def run(self):
         self.root.mainloop()
+        self.executor.shutdown()
 
 if __name__ == "__main__":
     app = MainApplication()
@@ -0,0 +1,320 @@
+# api/server.py
+"""
+HTTP/JSON service over the controllers, for serving many users from one process.
+
+    python -m api.server --port 8080
+
+Requests and responses are JSON. POST /api/login returns a token that later
+requests send as "Authorization: Bearer <token>". Connections are kept alive
+(HTTP/1.1) and larger responses are gzip-compressed for clients that accept it.
+
+    POST /api/login                              {"username", "password"}
+    POST /api/logout
+    GET  /api/subjects
+    GET  /api/students/<id>                      profile, GPA and credits
+    GET  /api/students/<id>/subjects             registered subjects and grades
+    GET  /api/students/<id>/available-subjects   with prerequisite status
+    POST /api/students/<id>/registrations        {"subject_code"}
+    GET  /api/subjects/<code>/registrations      roster (admin)
+    PUT  /api/subjects/<code>/grades             {"grades": [{"student_id", "grade"}]} (admin)
+
+Students may only read and register for themselves; admins may do everything.
+"""
+import argparse
+import gzip
+import json
+import re
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from controllers.admin_controller import AdminController
+from controllers.auth_controller import AuthController
+from controllers.student_controller import StudentController
+from models.database_manager import (
+    DatabaseManager, REGISTERED, SECTION_FULL, ALREADY_REGISTERED, PREREQUISITE_NOT_MET,
+    TOO_YOUNG, STUDENT_NOT_FOUND, SUBJECT_NOT_FOUND
+)
+from models.records import json_default
+from models.session_store import Session, SessionStore
+
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_TIMEOUT = 30
+
+MAX_BODY_BYTES = 1024 * 1024
+
+REGISTRATION_STATUS = {
+    REGISTERED: HTTPStatus.CREATED,
+    SECTION_FULL: HTTPStatus.CONFLICT,
+    ALREADY_REGISTERED: HTTPStatus.CONFLICT,
+    PREREQUISITE_NOT_MET: HTTPStatus.UNPROCESSABLE_ENTITY,
+    TOO_YOUNG: HTTPStatus.UNPROCESSABLE_ENTITY,
+    STUDENT_NOT_FOUND: HTTPStatus.NOT_FOUND,
+    SUBJECT_NOT_FOUND: HTTPStatus.NOT_FOUND
+}
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip; a coding listed with q=0 is refused"""
+    qualities = {}
+    for item in (accept_encoding or '').split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    # An explicit gzip entry wins over the wildcard
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+def without_password(row: Optional[Dict]) -> Optional[Dict]:
+    if row is not None:
+        row.pop('password', None)
+    return row
+
+class RegistrationService:
+    """
+    The API's routes, independent of HTTP plumbing. Each route takes the
+    caller's session, the path parameters and the parsed JSON body, and returns
+    (status, payload).
+    """
+    def __init__(self, db_manager: DatabaseManager, session_store: Optional[SessionStore] = None):
+        self.db_manager = db_manager
+        self.auth_controller = AuthController(db_manager, session_store)
+        self.student_controller = StudentController(db_manager)
+        self.admin_controller = AdminController(db_manager)
+
+        # (method, path pattern, handler, who may call it)
+        self.routes = [
+            ('POST', r'/api/login', self.login, None),
+            ('POST', r'/api/logout', self.logout, 'any'),
+            ('GET', r'/api/subjects', self.list_subjects, 'any'),
+            ('GET', r'/api/students/(?P<student_id>[^/]+)', self.get_profile, 'self'),
+            ('GET', r'/api/students/(?P<student_id>[^/]+)/subjects', self.get_registered_subjects, 'self'),
+            ('GET', r'/api/students/(?P<student_id>[^/]+)/available-subjects', self.get_available_subjects, 'self'),
+            ('POST', r'/api/students/(?P<student_id>[^/]+)/registrations', self.register, 'self'),
+            ('GET', r'/api/subjects/(?P<subject_code>[^/]+)/registrations', self.get_roster, 'admin'),
+            ('PUT', r'/api/subjects/(?P<subject_code>[^/]+)/grades', self.post_grades, 'admin'),
+        ]
+        self._compiled = [(method, re.compile(pattern + r'/?$'), handler, access)
+                          for method, pattern, handler, access in self.routes]
+
+    def dispatch(self, method: str, path: str, token: Optional[str], body: Dict) -> Tuple[int, object]:
+        allowed_methods = []
+        for route_method, pattern, handler, access in self._compiled:
+            match = pattern.match(path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed_methods.append(route_method)
+                continue
+            params = match.groupdict()
+            session = self._authorize(access, token, params)
+            return handler(session, params, body)
+
+        if allowed_methods:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "method not allowed")
+        raise ApiError(HTTPStatus.NOT_FOUND, "not found")
+
+    def _authorize(self, access: Optional[str], token: Optional[str], params: Dict) -> Optional[Session]:
+        if access is None:
+            return None
+        session = self.auth_controller.get_session(token)
+        if session is None:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "login required")
+        if session.user_type == 'admin':
+            return session
+        if access == 'admin' or (access == 'self' and params.get('student_id') != session.user_id):
+            raise ApiError(HTTPStatus.FORBIDDEN, "not allowed")
+        return session
+
+    # Routes
+    def login(self, session, params, body):
+        session = self.auth_controller.login(str(body.get('username', '')), str(body.get('password', '')))
+        if session is None:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "ชื่อผู้ใช้หรือรหัสผ่านไม่ถูกต้อง")
+        return HTTPStatus.OK, {
+            'token': session.token,
+            'user_id': session.user_id,
+            'user_type': session.user_type,
+            'expires_in': self.auth_controller.session_store.ttl_seconds
+        }
+
+    def logout(self, session, params, body):
+        self.auth_controller.logout(session.token)
+        return HTTPStatus.OK, {'logged_out': True}
+
+    def list_subjects(self, session, params, body):
+        return HTTPStatus.OK, self.admin_controller.get_all_subjects()
+
+    def get_profile(self, session, params, body):
+        student_id = params['student_id']
+        profile = self.student_controller.get_student_profile(student_id)
+        if profile is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, "ไม่พบข้อมูลนักเรียน")
+        # A plain dict, so the summary fields can be added
+        profile = without_password(dict(profile))
+        summary = self.student_controller.get_academic_summary(student_id)
+        profile['gpa'] = summary['gpa']
+        profile['completed_credits'] = summary['completed_credits']
+        return HTTPStatus.OK, profile
+
+    def get_registered_subjects(self, session, params, body):
+        return HTTPStatus.OK, self.student_controller.get_student_registered_subjects(params['student_id'])
+
+    def get_available_subjects(self, session, params, body):
+        return HTTPStatus.OK, self.student_controller.get_available_subjects(params['student_id'])
+
+    def register(self, session, params, body):
+        subject_code = body.get('subject_code')
+        if not isinstance(subject_code, str) or not subject_code:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "subject_code is required")
+        outcome, message = self.student_controller.try_register_for_subject(params['student_id'], subject_code)
+        return REGISTRATION_STATUS[outcome], {'outcome': outcome, 'message': message}
+
+    def get_roster(self, session, params, body):
+        registrations = self.admin_controller.get_subject_registrations(params['subject_code'])
+        return HTTPStatus.OK, [without_password(row) for row in registrations]
+
+    def post_grades(self, session, params, body):
+        grades = body.get('grades')
+        if not isinstance(grades, list):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "grades must be a list")
+        try:
+            pairs = [(str(item['student_id']), str(item['grade'])) for item in grades]
+        except (KeyError, TypeError):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "each grade needs student_id and grade")
+        results = self.admin_controller.update_student_grades(params['subject_code'], pairs)
+        return HTTPStatus.OK, results
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = KEEP_ALIVE_TIMEOUT
+    server_version = "StudentRegistration/1.0"
+
+    def do_GET(self):
+        self.handle_api_request()
+
+    def do_POST(self):
+        self.handle_api_request()
+
+    def do_PUT(self):
+        self.handle_api_request()
+
+    def handle_api_request(self):
+        try:
+            body = self.read_json_body()
+            status, payload = self.server.service.dispatch(
+                self.command, self.path.split('?', 1)[0], self.bearer_token(), body
+            )
+        except ApiError as error:
+            status, payload = error.status, {'error': error.message}
+        except Exception:
+            self.log_error("error handling %s %s", self.command, self.path)
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "internal error"}
+        self.send_json(status, payload)
+
+    def read_json_body(self) -> Dict:
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Without a usable length the body cannot be skipped either
+            self.close_connection = True
+            raise ApiError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            # The unread body would corrupt the next request on this connection
+            self.close_connection = True
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "request body must be a JSON object")
+        return body
+
+    def bearer_token(self) -> Optional[str]:
+        scheme, _, token = (self.headers.get('Authorization') or '').partition(' ')
+        return token.strip() if scheme.lower() == 'bearer' else None
+
+    def send_json(self, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=json_default).encode('utf-8')
+        gzipped = len(body) >= GZIP_MIN_BYTES and accepts_gzip(self.headers.get('Accept-Encoding'))
+        if gzipped:
+            body = gzip.compress(body, compresslevel=5)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        if self.close_connection:
+            # Tell the client not to send another request on this connection
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class RegistrationServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: RegistrationService, verbose: bool = False):
+        super().__init__(address, RequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+def make_server(db_manager: DatabaseManager, host: str = "127.0.0.1", port: int = 8080,
+                verbose: bool = False) -> RegistrationServer:
+    return RegistrationServer((host, port), RegistrationService(db_manager), verbose=verbose)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Student registration HTTP/JSON service")
+    parser.add_argument('--db', default="student_registration.db", help="SQLite database file")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--sample-data', action='store_true', help="Load the sample data into an empty database")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args(argv)
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.create_tables()
+    if args.sample_data:
+        db_manager.insert_sample_data()
+
+    server = make_server(db_manager, args.host, args.port, verbose=args.verbose)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db_manager.close_connection()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
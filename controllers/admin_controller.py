@@ -1,6 +1,6 @@
 # controllers/admin_controller.py
-from models.database_manager import DatabaseManager
-from typing import List, Dict
+from models.database_manager import DatabaseManager, VALID_GRADES
+from typing import List, Dict, Optional, Tuple
 
 class AdminController:
     def __init__(self, db_manager: DatabaseManager):
@@ -10,9 +10,19 @@ class AdminController:
         """Get all students for admin view"""
         return self.db_manager.get_all_students()
     
-    def search_students(self, search_term: str = "", school_filter: str = "", sort_by: str = "name") -> List[Dict]:
+    def search_students(self, search_term: str = "", school_filter: str = "", sort_by: str = "name",
+                        limit: Optional[int] = None) -> List[Dict]:
         """Search and filter students"""
-        return self.db_manager.search_students(search_term, school_filter, sort_by)
+        return self.db_manager.search_students(search_term, school_filter, sort_by, limit)
+    
+    def search_students_page(self, search_term: str = "", school_filter: str = "", sort_by: str = "name",
+                             after: Optional[Tuple] = None, page_size: int = 100) -> List[Dict]:
+        """Get one page of matching students, starting after the sort key `after`"""
+        return self.db_manager.search_students_page(search_term, school_filter, sort_by, after, page_size)
+    
+    def student_page_key(self, student: Dict, sort_by: str = "name") -> Tuple:
+        """Get the sort key to pass as `after` when fetching the page following `student`"""
+        return self.db_manager.student_page_key(student, sort_by)
     
     def get_schools(self) -> List[str]:
         """Get list of all schools for filtering"""
@@ -34,34 +44,28 @@ class AdminController:
         """Get all students registered for a specific subject"""
         return self.db_manager.get_subject_registrations(subject_code)
     
+    def get_subject_seats(self, subject_code: str) -> Optional[Dict]:
+        """Get a subject's capacity and how many seats are taken"""
+        return self.db_manager.get_subject_seats(subject_code)
+    
+    def set_subject_capacity(self, subject_code: str, capacity: Optional[int]) -> bool:
+        """Set a subject's seat limit (None for unlimited)"""
+        if capacity is not None and capacity < 0:
+            return False
+        
+        return self.db_manager.set_subject_capacity(subject_code, capacity)
+    
     def update_student_grade(self, student_id: str, subject_code: str, grade: str) -> bool:
         """Update student's grade for a subject"""
-        valid_grades = ['A', 'B+', 'B', 'C+', 'C', 'D+', 'D', 'F', 'IP']
-        
-        if grade not in valid_grades:
+        if grade not in VALID_GRADES:
             return False
         
         return self.db_manager.update_grade(student_id, subject_code, grade)
     
+    def update_student_grades(self, subject_code: str, grades: List[Tuple[str, str]]) -> List[Dict]:
+        """Update many students' grades for a subject at once; returns a result per (student_id, grade)"""
+        return self.db_manager.update_grades(subject_code, grades)
+    
     def get_registration_statistics(self) -> Dict:
         """Get statistics about registrations"""
-        subjects = self.get_all_subjects()
-        students = self.get_all_students()
-        
-        total_registrations = 0
-        subject_registration_counts = {}
-        
-        for subject in subjects:
-            registrations = self.get_subject_registrations(subject['subject_code'])
-            count = len(registrations)
-            subject_registration_counts[subject['subject_code']] = count
-            total_registrations += count
-        
-        stats = {
-            'total_subjects': len(subjects),
-            'total_students': len(students),
-            'total_registrations': total_registrations,
-            'subject_registration_counts': subject_registration_counts
-        }
-        
-        return stats
+        return self.db_manager.get_registration_statistics()
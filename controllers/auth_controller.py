@@ -1,10 +1,12 @@
 # controllers/auth_controller.py
 from models.database_manager import DatabaseManager
+from models.session_store import Session, SessionStore
 from typing import Optional, Tuple
 
 class AuthController:
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, session_store: Optional[SessionStore] = None):
         self.db_manager = db_manager
+        self.session_store = session_store or SessionStore()
     
     def authenticate(self, username: str, password: str) -> Tuple[bool, Optional[str], Optional[str]]:
         """
@@ -14,24 +16,32 @@ class AuthController:
         if not username or not password:
             return False, None, None
         
-        # Check if it's admin login
-        if self.db_manager.authenticate_admin(username, password):
-            return True, username, "admin"
-        
-        # Check if it's student login (using student_id as username)
-        if self.db_manager.authenticate_student(username, password):
-            return True, username, "student"
+        # Admin accounts take precedence over a student with the same id
+        for candidate in self.db_manager.get_login_candidates(username):
+            if candidate['password'] == password:
+                return True, candidate['user_id'], candidate['user_type']
         
         return False, None, None
     
+    def login(self, username: str, password: str) -> Optional[Session]:
+        """Authenticate user and open a session for them"""
+        success, user_id, user_type = self.authenticate(username, password)
+        if not success:
+            return None
+        return self.session_store.create(user_id, user_type)
+    
+    def get_session(self, token: str) -> Optional[Session]:
+        """Get the live session for a token without touching the database"""
+        return self.session_store.get(token)
+    
+    def logout(self, token: str):
+        """End a session"""
+        self.session_store.revoke(token)
+    
     def validate_student_age(self, student_id: str) -> bool:
         """Check if student is at least 15 years old"""
-        from datetime import datetime, date
-        
         student = self.db_manager.get_student_by_id(student_id)
         if not student:
             return False
         
-        birth_date = datetime.strptime(student['birth_date'], '%Y-%m-%d').date()
-        age = (date.today() - birth_date).days // 365
-        return age >= 15
+        return student['age'] >= 15
@@ -1,10 +1,12 @@
 # controllers/student_controller.py
 from models.database_manager import DatabaseManager
-from typing import List, Dict, Tuple
+from models.change_events import ChangeEventBus, REGISTRATION_ADDED
+from typing import List, Dict, Optional, Tuple
 
 class StudentController:
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, events: Optional[ChangeEventBus] = None):
         self.db_manager = db_manager
+        self.events = events or ChangeEventBus()
     
     def get_student_profile(self, student_id: str) -> Dict:
         """Get student profile information"""
@@ -16,54 +18,36 @@ class StudentController:
     
     def get_available_subjects(self, student_id: str) -> List[Dict]:
         """Get subjects available for the student to register"""
-        available_subjects = self.db_manager.get_available_subjects_for_student(student_id)
-        
-        # Add prerequisite check status for each subject
-        for subject in available_subjects:
-            can_register, message = self.db_manager.check_prerequisite(student_id, subject['subject_code'])
-            subject['can_register'] = can_register
-            subject['prerequisite_status'] = message
-        
-        return available_subjects
+        # Prerequisite status comes back with each subject, so no per-subject lookups here
+        return self.db_manager.get_available_subjects_with_eligibility(student_id)
     
     def register_for_subject(self, student_id: str, subject_code: str) -> Tuple[bool, str]:
-        """Register student for a subject"""
-        return self.db_manager.register_subject(student_id, subject_code)
+        """Register student for a subject; views showing the student get the delta as REGISTRATION_ADDED"""
+        success, message, delta = self.db_manager.register_subject(student_id, subject_code)
+        if success:
+            self.events.publish(REGISTRATION_ADDED, delta)
+        return success, message
+    
+    def try_register_for_subject(self, student_id: str, subject_code: str) -> Tuple[str, str]:
+        """Register student for a subject; returns (outcome, message), e.g. 'section_full'"""
+        return self.db_manager.try_register_subject(student_id, subject_code)
     
     def check_prerequisite(self, student_id: str, subject_code: str) -> Tuple[bool, str]:
         """Check if student meets prerequisite requirements"""
         return self.db_manager.check_prerequisite(student_id, subject_code)
     
+    def get_missing_prerequisites(self, student_id: str, subject_code: str) -> List[Dict]:
+        """Get the unpassed subjects in a subject's whole prerequisite chain, first to take first"""
+        return self.db_manager.get_missing_prerequisites(student_id, subject_code)
+    
+    def get_academic_summary(self, student_id: str) -> Dict:
+        """Get the student's GPA and credit totals in one lookup"""
+        return self.db_manager.get_academic_summary(student_id)
+    
     def get_student_gpa(self, student_id: str) -> float:
-        """Calculate student's GPA based on completed subjects"""
-        registered_subjects = self.get_student_registered_subjects(student_id)
-        
-        if not registered_subjects:
-            return 0.0
-        
-        grade_points = {
-            'A': 4.0, 'B+': 3.5, 'B': 3.0, 'C+': 2.5, 
-            'C': 2.0, 'D+': 1.5, 'D': 1.0, 'F': 0.0
-        }
-        
-        total_points = 0.0
-        total_credits = 0
-        
-        for subject in registered_subjects:
-            if subject['grade'] in grade_points:
-                points = grade_points[subject['grade']] * subject['credits']
-                total_points += points
-                total_credits += subject['credits']
-        
-        return total_points / total_credits if total_credits > 0 else 0.0
+        """Get student's GPA based on completed subjects"""
+        return self.get_academic_summary(student_id)['gpa']
     
     def get_completed_credits(self, student_id: str) -> int:
         """Get total credits completed by student"""
-        registered_subjects = self.get_student_registered_subjects(student_id)
-        
-        total_credits = 0
-        for subject in registered_subjects:
-            if subject['grade'] not in ['F', 'IP']:
-                total_credits += subject['credits']
-        
-        return total_credits
+        return self.get_academic_summary(student_id)['completed_credits']
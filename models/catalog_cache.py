@@ -0,0 +1,85 @@
+# models/catalog_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+class CatalogCache:
+    """
+    Read-through cache for reference data (subjects, programs, school list).
+    Entries expire `ttl_seconds` after loading, and the least recently used entry
+    is dropped once more than `max_entries` are held. Entries are tagged with the
+    tables they were read from; DatabaseManager drops the ones whose tables a
+    committed write changed, so the TTL only matters for writes made by other
+    processes.
+    """
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], object], tables: Iterable[str] = ()):
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+
+        with self._lock:
+            # A write that committed while loading may have made the value stale
+            if generation == self._generation:
+                self._entries[key] = (value, now + self.ttl_seconds, frozenset(tables))
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one entry, or everything when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._generation += 1
+            else:
+                self._entries.pop(key, None)
+            self.invalidations += 1
+
+    def invalidate_tables(self, tables: Iterable[str]):
+        """Drop every entry read from any of `tables`; untagged entries are dropped too"""
+        tables = set(tables)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items()
+                        if not entry[2] or entry[2] & tables]:
+                del self._entries[key]
+            # A load still running may have read the old rows
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
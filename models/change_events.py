@@ -0,0 +1,37 @@
+# models/change_events.py
+import threading
+from typing import Callable, Dict, List
+
+# Published by StudentController.register_for_subject with the delta from
+# DatabaseManager.register_subject
+REGISTRATION_ADDED = "registration_added"
+
+class ChangeEventBus:
+    """
+    Tells views what changed after a write, so they can apply just that change
+    instead of reloading everything they show. Handlers run on the publishing
+    thread, in the order they subscribed.
+    """
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, event: str, handler: Callable[[Dict], None]) -> Callable[[], None]:
+        """Call handler(payload) for every `event`; returns a function that unsubscribes it"""
+        with self._lock:
+            self._handlers.setdefault(event, []).append(handler)
+
+        def unsubscribe():
+            with self._lock:
+                handlers = self._handlers.get(event, [])
+                if handler in handlers:
+                    handlers.remove(handler)
+        return unsubscribe
+
+    def publish(self, event: str, payload: Dict) -> int:
+        """Deliver payload to the event's handlers; returns how many there were"""
+        with self._lock:
+            handlers = list(self._handlers.get(event, ()))
+        for handler in handlers:
+            handler(payload)
+        return len(handlers)
@@ -0,0 +1,153 @@
+# models/connection_pool.py
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+from models.query_stats import InstrumentedConnection, QueryStats
+
+class PooledConnection(sqlite3.Connection):
+    # A Python subclass so the pool can track connections through weak references
+    pass
+
+class ConnectionPool:
+    """
+    SQLite connections for a multi-threaded app: one reader connection per thread
+    and a single writer connection that threads take turns on. In WAL mode readers
+    keep working while the writer commits.
+    """
+    def __init__(self, db_path: str, busy_timeout_ms: int = 5000,
+                 pragmas: Optional[Dict[str, object]] = None, journal_mode: str = "WAL",
+                 query_stats: Optional[QueryStats] = None):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.pragmas = dict(pragmas or {})
+        self.journal_mode = journal_mode
+        # When set, connections record every statement they run (see models/query_stats.py)
+        self.query_stats = query_stats
+
+        # Every connection to an in-memory database is a separate database,
+        # so those share the writer connection for reads too
+        self.shared_connection = db_path in (":memory:", "") or "mode=memory" in db_path
+
+        self._local = threading.local()
+        self._writer_lock = threading.RLock()
+        self._writer = None
+        # Reader connections close when their thread exits and drop out of this set
+        self._connections = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        self._commit_listeners: List[Callable[[sqlite3.Connection], None]] = []
+
+        self._metrics_lock = threading.Lock()
+        self._checkouts = 0
+        self._writer_checkouts = 0
+        self._writer_waits = 0
+        self._writer_wait_seconds = 0.0
+
+    def reader(self) -> sqlite3.Connection:
+        """The calling thread's read connection, opened on first use"""
+        with self._metrics_lock:
+            self._checkouts += 1
+        if self.shared_connection:
+            return self._get_writer()
+
+        conn = getattr(self._local, 'connection', None)
+        if conn is None or getattr(self._local, 'generation', None) != self._generation:
+            conn = self._connect()
+            self._local.connection = conn
+            self._local.generation = self._generation
+        return conn
+
+    @contextmanager
+    def writer(self, immediate: bool = False):
+        """
+        Hold the writer connection for a transaction; commits on success and rolls
+        back on error. Nested use in the same thread joins the outer transaction.
+        With `immediate` the transaction takes SQLite's write lock up front
+        (BEGIN IMMEDIATE), so what it reads cannot change before it writes,
+        even from another process.
+        """
+        if not self._writer_lock.acquire(blocking=False):
+            started = time.perf_counter()
+            self._writer_lock.acquire()
+            self._writer_waits += 1
+            self._writer_wait_seconds += time.perf_counter() - started
+
+        depth = getattr(self._local, 'writer_depth', 0)
+        self._local.writer_depth = depth + 1
+        with self._metrics_lock:
+            self._checkouts += 1
+            self._writer_checkouts += 1
+        try:
+            conn = self._get_writer()
+            changes_before = conn.total_changes
+            try:
+                if immediate and depth == 0 and not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+                yield conn
+                if depth == 0:
+                    conn.commit()
+                    # A transaction that wrote nothing (e.g. a rejected registration) is not announced
+                    if conn.total_changes != changes_before:
+                        for listener in self._commit_listeners:
+                            listener(conn)
+            except BaseException:
+                if depth == 0:
+                    conn.rollback()
+                raise
+        finally:
+            self._local.writer_depth = depth
+            self._writer_lock.release()
+
+    def add_commit_listener(self, listener: Callable[[sqlite3.Connection], None]):
+        """
+        Call listener(conn) after every writer transaction that changed rows commits.
+        It runs while the writer is still held, so it can read what was written.
+        """
+        self._commit_listeners.append(listener)
+
+    def close_all(self):
+        with self._writer_lock, self._connections_lock:
+            for conn in list(self._connections):
+                conn.close()
+            self._connections.clear()
+            self._writer = None
+            self._generation += 1
+
+    def metrics(self) -> Dict:
+        with self._connections_lock:
+            active = len(self._connections)
+        return {
+            'active_connections': active,
+            'checkouts': self._checkouts,
+            'writer_checkouts': self._writer_checkouts,
+            'writer_waits': self._writer_waits,
+            'writer_wait_seconds': self._writer_wait_seconds
+        }
+
+    def _get_writer(self) -> sqlite3.Connection:
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            return self._writer
+
+    def _connect(self) -> sqlite3.Connection:
+        factory = PooledConnection if self.query_stats is None else InstrumentedConnection
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               timeout=self.busy_timeout_ms / 1000, factory=factory)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        if self.journal_mode and not self.shared_connection:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        # Attached after the setup PRAGMAs, which are plumbing rather than a query any
+        # method asked for and would otherwise be charged to whoever opened the connection
+        if self.query_stats is not None:
+            conn.query_stats = self.query_stats
+
+        with self._connections_lock:
+            self._connections.add(conn)
+        return conn
@@ -2,229 +2,369 @@
 import sqlite3
 import os
 from datetime import datetime, date
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Iterator, Optional, Tuple, Type
+from models.catalog_cache import CatalogCache
+from models.connection_pool import ConnectionPool
+from models.query_stats import QueryStats
+from models.records import Record, Student, Program, Subject, Registration
+from models import migrations
+
+# Trigram matching needs at least this many characters in a search term
+MIN_FTS_TERM_LENGTH = 3
+
+MIN_STUDENT_AGE = 15
+
+VALID_GRADES = ['A', 'B+', 'B', 'C+', 'C', 'D+', 'D', 'F', 'IP']
+
+# Outcomes of DatabaseManager.try_register_subject
+REGISTERED = 'registered'
+SECTION_FULL = 'section_full'
+ALREADY_REGISTERED = 'already_registered'
+PREREQUISITE_NOT_MET = 'prerequisite_not_met'
+TOO_YOUNG = 'too_young'
+STUDENT_NOT_FOUND = 'student_not_found'
+SUBJECT_NOT_FOUND = 'subject_not_found'
+
+def calculate_age(birth_date: str, today: Optional[date] = None) -> int:
+    # birth_date is stored as YYYY-MM-DD; age_sql() is the same rule in SQL
+    born = date.fromisoformat(birth_date)
+    return ((today or date.today()) - born).days // 365
+
+def age_sql(birth_date_column: str) -> str:
+    # calculate_age() for rows already in the database: whole days since birth
+    # against today's local date, divided by 365
+    return f"(CAST(julianday(date('now', 'localtime')) - julianday({birth_date_column}) AS INTEGER) / 365)"
+
+def student_display_sql(alias: str = "s") -> str:
+    # Derived fields the views show for a student, computed in SQL instead of per row in Python
+    return (f"{age_sql(alias + '.birth_date')} AS age, "
+            f"{alias}.prefix || {alias}.first_name || ' ' || {alias}.last_name AS full_name")
 
 class DatabaseManager:
-    def __init__(self, db_path="student_registration.db"):
+    def __init__(self, db_path="student_registration.db", busy_timeout_ms: int = 5000,
+                 pragmas: Optional[Dict[str, object]] = None, catalog_cache_ttl: float = 300,
+                 catalog_cache_size: int = 256, query_stats: Optional[QueryStats] = None):
         self.db_path = db_path
-        self.connection = None
+        # Query instrumentation is off unless asked for here or through the environment
+        if query_stats is None:
+            query_stats = QueryStats.from_environment()
+        self.pool = ConnectionPool(db_path, busy_timeout_ms=busy_timeout_ms, pragmas=pragmas,
+                                   query_stats=query_stats)
+        self._student_search_enabled = None
+        
+        # Reference data is cached until a committed write changes the tables it was read from
+        self.catalog_cache = CatalogCache(max_entries=catalog_cache_size, ttl_seconds=catalog_cache_ttl)
+        self._catalog_versions = {}
+        self.pool.add_commit_listener(self._invalidate_changed_catalog)
+    
+    @staticmethod
+    def _read_catalog_versions(conn: sqlite3.Connection) -> Optional[Dict[str, int]]:
+        try:
+            rows = conn.execute("SELECT table_name, version FROM CatalogVersion").fetchall()
+        except sqlite3.OperationalError:
+            # Databases older than migration 7 have no CatalogVersion table
+            return None
+        return {row[0]: row[1] for row in rows}
+    
+    def _invalidate_changed_catalog(self, conn: sqlite3.Connection):
+        # Runs after each commit that changed rows; CatalogVersion rows are bumped by triggers
+        versions = self._read_catalog_versions(conn)
+        if versions is None:
+            # Nothing tells which tables changed
+            self.catalog_cache.invalidate()
+            return
+        changed = {table for table, version in versions.items() if self._catalog_versions.get(table) != version}
+        self._catalog_versions = versions
+        if changed:
+            self.catalog_cache.invalidate_tables(changed)
     
     def get_connection(self):
-        if not self.connection:
-            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
-            self.connection.row_factory = sqlite3.Row
-        return self.connection
+        # Read connection owned by the calling thread; writes go through self.pool.writer()
+        return self.pool.reader()
     
     def close_connection(self):
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        self.pool.close_all()
+    
+    def get_pool_metrics(self) -> Dict:
+        return self.pool.metrics()
+    
+    def get_cache_stats(self) -> Dict:
+        return self.catalog_cache.stats()
+    
+    def get_query_stats(self) -> Optional[Dict[str, Dict]]:
+        # Per-method query timings and histograms; None when instrumentation is off
+        if self.pool.query_stats is None:
+            return None
+        return self.pool.query_stats.stats()
+    
+    def get_slow_queries(self) -> List[Dict]:
+        if self.pool.query_stats is None:
+            return []
+        return self.pool.query_stats.slow_queries()
+    
+    def reset_query_stats(self):
+        if self.pool.query_stats is not None:
+            self.pool.query_stats.reset()
     
     def create_tables(self):
+        self.migrate()
+        self.create_student_search_index()
+    
+    def ensure_schema(self, registration_counters: bool = False) -> bool:
+        """
+        Startup version of create_tables: the DDL only runs when the schema differs
+        from the one the last full setup recorded. Returns True if it ran.
+        """
+        version = f"v{migrations.SCHEMA_VERSION}"
+        with_counters = version + "+registration_counters"
+        setup = with_counters if registration_counters else version
+        # A setup that also enabled the counters satisfies one that does not ask for them
+        accepted = {setup, with_counters}
+        
         conn = self.get_connection()
-        cursor = conn.cursor()
+        stored_setup, _, stored_fingerprint = (self._stored_schema_setup(conn) or '').rpartition(':')
+        if stored_setup in accepted and stored_fingerprint == migrations.schema_fingerprint(conn):
+            return False
         
-        # Students table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Students (
-                student_id TEXT PRIMARY KEY,
-                prefix TEXT NOT NULL,
-                first_name TEXT NOT NULL,
-                last_name TEXT NOT NULL,
-                birth_date DATE NOT NULL,
-                current_school TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                program_code TEXT NOT NULL,
-                password TEXT DEFAULT 'password123'
+        self.create_tables()
+        if registration_counters:
+            self.enable_registration_counters()
+        with self.pool.writer() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO SchemaInfo (name, value) VALUES ('setup', ?)",
+                (f"{setup}:{migrations.schema_fingerprint(conn)}",)
             )
-        ''')
+        return True
+    
+    def _stored_schema_setup(self, conn) -> Optional[str]:
+        try:
+            row = conn.execute("SELECT value FROM SchemaInfo WHERE name = 'setup'").fetchone()
+        except sqlite3.OperationalError:
+            # Databases older than migration 6 have no SchemaInfo table
+            return None
+        return row[0] if row else None
+    
+    def migrate(self) -> List[int]:
+        with self.pool.writer() as conn:
+            return migrations.migrate(conn)
+    
+    def get_schema_version(self) -> int:
+        return migrations.get_schema_version(self.get_connection())
+    
+    def create_student_search_index(self):
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            
+            # The index is rebuilt when it is new or when its triggers went missing
+            # (for example a bulk import that suspended them never finished)
+            cursor.execute("""
+                SELECT COUNT(*) FROM sqlite_master
+                WHERE (type = 'table' AND name = 'StudentSearch')
+                OR (type = 'trigger' AND name LIKE 'StudentSearch_after_%')
+            """)
+            up_to_date = cursor.fetchone()[0] == 4
+            
+            # Trigram tokens match any substring, which also works for Thai names
+            # that have no word boundaries. SQLite builds without FTS5 fall back to LIKE.
+            try:
+                cursor.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS StudentSearch USING fts5(
+                        student_id, first_name, last_name, current_school,
+                        content='Students', content_rowid='rowid', tokenize='trigram'
+                    )
+                ''')
+            except sqlite3.OperationalError:
+                self._student_search_enabled = False
+                return
+            
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS StudentSearch_after_insert
+                AFTER INSERT ON Students
+                BEGIN
+                    INSERT INTO StudentSearch (rowid, student_id, first_name, last_name, current_school)
+                    VALUES (NEW.rowid, NEW.student_id, NEW.first_name, NEW.last_name, NEW.current_school);
+                END
+            ''')
+            
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS StudentSearch_after_delete
+                AFTER DELETE ON Students
+                BEGIN
+                    INSERT INTO StudentSearch (StudentSearch, rowid, student_id, first_name, last_name, current_school)
+                    VALUES ('delete', OLD.rowid, OLD.student_id, OLD.first_name, OLD.last_name, OLD.current_school);
+                END
+            ''')
+            
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS StudentSearch_after_update
+                AFTER UPDATE OF student_id, first_name, last_name, current_school ON Students
+                BEGIN
+                    INSERT INTO StudentSearch (StudentSearch, rowid, student_id, first_name, last_name, current_school)
+                    VALUES ('delete', OLD.rowid, OLD.student_id, OLD.first_name, OLD.last_name, OLD.current_school);
+                    INSERT INTO StudentSearch (rowid, student_id, first_name, last_name, current_school)
+                    VALUES (NEW.rowid, NEW.student_id, NEW.first_name, NEW.last_name, NEW.current_school);
+                END
+            ''')
         
-        # Programs table (for curriculum structure)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Programs (
-                program_code TEXT PRIMARY KEY,
-                program_name TEXT NOT NULL,
-                department TEXT NOT NULL
-            )
-        ''')
+        self._student_search_enabled = True
         
-        # Subjects table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Subjects (
-                subject_code TEXT PRIMARY KEY,
-                subject_name TEXT NOT NULL,
-                credits INTEGER CHECK(credits > 0),
-                instructor TEXT NOT NULL,
-                prerequisite TEXT DEFAULT NULL,
-                FOREIGN KEY (prerequisite) REFERENCES Subjects(subject_code)
+        # Index students that were inserted while the index or its triggers were missing
+        if not up_to_date:
+            self.rebuild_student_search_index()
+    
+    def suspend_student_search_index(self):
+        # Bulk loads skip per-row index maintenance; resume_student_search_index() catches up
+        with self.pool.writer() as conn:
+            for event in ('insert', 'delete', 'update'):
+                conn.execute(f"DROP TRIGGER IF EXISTS StudentSearch_after_{event}")
+    
+    def resume_student_search_index(self):
+        self.create_student_search_index()
+    
+    def rebuild_student_search_index(self):
+        # Needed after VACUUM, which may renumber the implicit Students rowids
+        with self.pool.writer() as conn:
+            conn.execute("INSERT INTO StudentSearch (StudentSearch) VALUES ('rebuild')")
+    
+    def student_search_enabled(self) -> bool:
+        if self._student_search_enabled is None:
+            cursor = self.get_connection().cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'StudentSearch'")
+            self._student_search_enabled = cursor.fetchone() is not None
+        return self._student_search_enabled
+    
+    def insert_sample_data(self):
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            
+            # Check if data already exists (without counting every student)
+            cursor.execute("SELECT 1 FROM Students LIMIT 1")
+            if cursor.fetchone() is not None:
+                return
+            
+            # Insert Programs
+            programs = [
+                ('12345678', 'วิทยาการคอมพิวเตอร์', 'ภาควิชาวิทยาการคอมพิวเตอร์'),
+                ('12345679', 'วิศวกรรมซอฟต์แวร์', 'ภาควิชาวิทยาการคอมพิวเตอร์'),
+                ('12345680', 'คณิตศาสตร์ประยุกต์', 'ภาควิชาคณิตศาสตร์')
+            ]
+            
+            cursor.executemany(
+                "INSERT OR IGNORE INTO Programs (program_code, program_name, department) VALUES (?, ?, ?)",
+                programs
             )
-        ''')
-        
-        # SubjectStructure table (curriculum requirements)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS SubjectStructure (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                program_code TEXT NOT NULL,
-                subject_code TEXT NOT NULL,
-                semester INTEGER CHECK(semester IN (1, 2)),
-                FOREIGN KEY (program_code) REFERENCES Programs(program_code),
-                FOREIGN KEY (subject_code) REFERENCES Subjects(subject_code),
-                UNIQUE(program_code, subject_code, semester)
+            
+            # Insert Subjects
+            subjects = [
+                ('05500101', 'Computer Programming I', 3, 'อ.สมชาย', None),
+                ('05500102', 'Computer Programming II', 3, 'อ.สมหญิง', '05500101'),
+                ('05500201', 'Data Structures', 3, 'อ.วิชัย', '05500102'),
+                ('05500301', 'Database Systems', 3, 'อ.มาลี', '05500201'),
+                ('05500401', 'Software Engineering', 3, 'อ.ประยูร', '05500301'),
+                ('90690101', 'English I', 3, 'อ.จอห์น', None),
+                ('90690102', 'English II', 3, 'อ.เมรี่', '90690101'),
+                ('90690201', 'Mathematics I', 3, 'อ.สุทธิพงษ์', None),
+                ('90690202', 'Mathematics II', 3, 'อ.กมลพร', '90690201'),
+                ('05500105', 'Web Development', 3, 'อ.นันทา', '05500102'),
+                ('05500205', 'Algorithms', 3, 'อ.สมศักดิ์', '05500201')
+            ]
+            
+            cursor.executemany(
+                "INSERT OR IGNORE INTO Subjects (subject_code, subject_name, credits, instructor, prerequisite) VALUES (?, ?, ?, ?, ?)",
+                subjects
             )
-        ''')
-        
-        # RegisteredSubject table (student registrations and grades)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS RegisteredSubject (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT NOT NULL,
-                subject_code TEXT NOT NULL,
-                grade TEXT CHECK(grade IN ('A', 'B+', 'B', 'C+', 'C', 'D+', 'D', 'F', 'IP')) DEFAULT 'IP',
-                registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (student_id) REFERENCES Students(student_id),
-                FOREIGN KEY (subject_code) REFERENCES Subjects(subject_code),
-                UNIQUE(student_id, subject_code)
+            
+            # Insert SubjectStructure
+            structure = [
+                ('12345678', '05500101', 1),
+                ('12345678', '90690101', 1),
+                ('12345678', '90690201', 1),
+                ('12345678', '05500102', 2),
+                ('12345678', '90690102', 2),
+                ('12345678', '90690202', 2),
+                ('12345678', '05500201', 2),
+                ('12345679', '05500101', 1),
+                ('12345679', '90690101', 1),
+                ('12345679', '05500105', 1),
+                ('12345679', '05500102', 2),
+                ('12345679', '05500201', 2)
+            ]
+            
+            cursor.executemany(
+                "INSERT OR IGNORE INTO SubjectStructure (program_code, subject_code, semester) VALUES (?, ?, ?)",
+                structure
             )
-        ''')
-        
-        # Admin table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Admin (
-                admin_id TEXT PRIMARY KEY,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL
+            
+            # Insert Students
+            students = [
+                ('69000001', 'นาย', 'สมชาย', 'ใจดี', '2007-01-15', 'โรงเรียนสมชาย', 'somchai@email.com', '12345678'),
+                ('69000002', 'นางสาว', 'สมหญิง', 'รักเรียน', '2007-03-20', 'โรงเรียนดาวเด่น', 'somying@email.com', '12345678'),
+                ('69000003', 'นาย', 'วิชัย', 'เก่งมาก', '2007-02-10', 'โรงเรียนวิทยา', 'wichai@email.com', '12345679'),
+                ('69000004', 'นางสาว', 'มาลี', 'สวยงาม', '2006-12-05', 'โรงเรียนสายรุ้ง', 'malee@email.com', '12345678'),
+                ('69000005', 'นาย', 'ประยูร', 'ฉลาด', '2007-04-25', 'โรงเรียนปัญญา', 'prayoon@email.com', '12345679'),
+                ('69000006', 'นางสาว', 'กมลพร', 'เรียบร้อย', '2007-01-30', 'โรงเรียนคุณธรรม', 'kamolporn@email.com', '12345680'),
+                ('69000007', 'นาย', 'นันทา', 'ซื่อสัตย์', '2006-11-12', 'โรงเรียนสุจริต', 'nanta@email.com', '12345678'),
+                ('69000008', 'นางสาว', 'สุนิสา', 'มั่นใจ', '2007-05-08', 'โรงเรียนมั่นคง', 'sunisa@email.com', '12345679'),
+                ('69000009', 'นาย', 'อภิชาต', 'กล้าหาญ', '2006-09-18', 'โรงเรียนหาดใหญ่', 'aphichat@email.com', '12345678'),
+                ('69000010', 'นางสาว', 'วรรณา', 'อ่อนโยน', '2007-07-03', 'โรงเรียนสงขลา', 'wanna@email.com', '12345679'),
+                ('69000011', 'นาย', 'ธนากร', 'มุ่งมั่น', '2006-10-22', 'โรงเรียนปัตตานี', 'thanakorn@email.com', '12345680')
+            ]
+            
+            cursor.executemany(
+                "INSERT OR IGNORE INTO Students (student_id, prefix, first_name, last_name, birth_date, current_school, email, program_code) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                students
+            )
+            
+            # Insert some grades for testing prerequisites
+            registered_subjects = [
+                ('69000001', '05500101', 'B+'),
+                ('69000001', '90690101', 'A'),
+                ('69000001', '90690201', 'B'),
+                ('69000002', '05500101', 'A'),
+                ('69000002', '90690101', 'B+'),
+                ('69000003', '05500101', 'C+'),
+                ('69000004', '90690101', 'A')
+            ]
+            
+            cursor.executemany(
+                "INSERT OR IGNORE INTO RegisteredSubject (student_id, subject_code, grade) VALUES (?, ?, ?)",
+                registered_subjects
+            )
+            
+            # Insert Admin
+            cursor.execute(
+                "INSERT OR IGNORE INTO Admin (admin_id, username, password) VALUES (?, ?, ?)",
+                ('admin001', 'admin', 'admin123')
             )
-        ''')
-        
-        conn.commit()
-    
-    def insert_sample_data(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Check if data already exists
-        cursor.execute("SELECT COUNT(*) FROM Students")
-        if cursor.fetchone()[0] > 0:
-            return
-        
-        # Insert Programs
-        programs = [
-            ('12345678', 'วิทยาการคอมพิวเตอร์', 'ภาควิชาวิทยาการคอมพิวเตอร์'),
-            ('12345679', 'วิศวกรรมซอฟต์แวร์', 'ภาควิชาวิทยาการคอมพิวเตอร์'),
-            ('12345680', 'คณิตศาสตร์ประยุกต์', 'ภาควิชาคณิตศาสตร์')
-        ]
-        
-        cursor.executemany(
-            "INSERT OR IGNORE INTO Programs (program_code, program_name, department) VALUES (?, ?, ?)",
-            programs
-        )
-        
-        # Insert Subjects
-        subjects = [
-            ('05500101', 'Computer Programming I', 3, 'อ.สมชาย', None),
-            ('05500102', 'Computer Programming II', 3, 'อ.สมหญิง', '05500101'),
-            ('05500201', 'Data Structures', 3, 'อ.วิชัย', '05500102'),
-            ('05500301', 'Database Systems', 3, 'อ.มาลี', '05500201'),
-            ('05500401', 'Software Engineering', 3, 'อ.ประยูร', '05500301'),
-            ('90690101', 'English I', 3, 'อ.จอห์น', None),
-            ('90690102', 'English II', 3, 'อ.เมรี่', '90690101'),
-            ('90690201', 'Mathematics I', 3, 'อ.สุทธิพงษ์', None),
-            ('90690202', 'Mathematics II', 3, 'อ.กมลพร', '90690201'),
-            ('05500105', 'Web Development', 3, 'อ.นันทา', '05500102'),
-            ('05500205', 'Algorithms', 3, 'อ.สมศักดิ์', '05500201')
-        ]
-        
-        cursor.executemany(
-            "INSERT OR IGNORE INTO Subjects (subject_code, subject_name, credits, instructor, prerequisite) VALUES (?, ?, ?, ?, ?)",
-            subjects
-        )
-        
-        # Insert SubjectStructure
-        structure = [
-            ('12345678', '05500101', 1),
-            ('12345678', '90690101', 1),
-            ('12345678', '90690201', 1),
-            ('12345678', '05500102', 2),
-            ('12345678', '90690102', 2),
-            ('12345678', '90690202', 2),
-            ('12345678', '05500201', 2),
-            ('12345679', '05500101', 1),
-            ('12345679', '90690101', 1),
-            ('12345679', '05500105', 1),
-            ('12345679', '05500102', 2),
-            ('12345679', '05500201', 2)
-        ]
-        
-        cursor.executemany(
-            "INSERT OR IGNORE INTO SubjectStructure (program_code, subject_code, semester) VALUES (?, ?, ?)",
-            structure
-        )
-        
-        # Insert Students
-        students = [
-            ('69000001', 'นาย', 'สมชาย', 'ใจดี', '2007-01-15', 'โรงเรียนสมชาย', 'somchai@email.com', '12345678'),
-            ('69000002', 'นางสาว', 'สมหญิง', 'รักเรียน', '2007-03-20', 'โรงเรียนดาวเด่น', 'somying@email.com', '12345678'),
-            ('69000003', 'นาย', 'วิชัย', 'เก่งมาก', '2007-02-10', 'โรงเรียนวิทยา', 'wichai@email.com', '12345679'),
-            ('69000004', 'นางสาว', 'มาลี', 'สวยงาม', '2006-12-05', 'โรงเรียนสายรุ้ง', 'malee@email.com', '12345678'),
-            ('69000005', 'นาย', 'ประยูร', 'ฉลาด', '2007-04-25', 'โรงเรียนปัญญา', 'prayoon@email.com', '12345679'),
-            ('69000006', 'นางสาว', 'กมลพร', 'เรียบร้อย', '2007-01-30', 'โรงเรียนคุณธรรม', 'kamolporn@email.com', '12345680'),
-            ('69000007', 'นาย', 'นันทา', 'ซื่อสัตย์', '2006-11-12', 'โรงเรียนสุจริต', 'nanta@email.com', '12345678'),
-            ('69000008', 'นางสาว', 'สุนิสา', 'มั่นใจ', '2007-05-08', 'โรงเรียนมั่นคง', 'sunisa@email.com', '12345679'),
-            ('69000009', 'นาย', 'อภิชาต', 'กล้าหาญ', '2006-09-18', 'โรงเรียนหาดใหญ่', 'aphichat@email.com', '12345678'),
-            ('69000010', 'นางสาว', 'วรรณา', 'อ่อนโยน', '2007-07-03', 'โรงเรียนสงขลา', 'wanna@email.com', '12345679'),
-            ('69000011', 'นาย', 'ธนากร', 'มุ่งมั่น', '2006-10-22', 'โรงเรียนปัตตานี', 'thanakorn@email.com', '12345680')
-        ]
-        
-        cursor.executemany(
-            "INSERT OR IGNORE INTO Students (student_id, prefix, first_name, last_name, birth_date, current_school, email, program_code) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            students
-        )
-        
-        # Insert some grades for testing prerequisites
-        registered_subjects = [
-            ('69000001', '05500101', 'B+'),
-            ('69000001', '90690101', 'A'),
-            ('69000001', '90690201', 'B'),
-            ('69000002', '05500101', 'A'),
-            ('69000002', '90690101', 'B+'),
-            ('69000003', '05500101', 'C+'),
-            ('69000004', '90690101', 'A')
-        ]
-        
-        cursor.executemany(
-            "INSERT OR IGNORE INTO RegisteredSubject (student_id, subject_code, grade) VALUES (?, ?, ?)",
-            registered_subjects
-        )
-        
-        # Insert Admin
-        cursor.execute(
-            "INSERT OR IGNORE INTO Admin (admin_id, username, password) VALUES (?, ?, ?)",
-            ('admin001', 'admin', 'admin123')
-        )
-        
-        conn.commit()
     
     # Student-related methods
-    def get_student_by_id(self, student_id: str) -> Optional[Dict]:
+    def get_student_by_id(self, student_id: str) -> Optional[Student]:
         cursor = self.get_connection().cursor()
-        cursor.execute("""
-            SELECT s.*, p.program_name, p.department
-            FROM Students s
-            JOIN Programs p ON s.program_code = p.program_code
-            WHERE s.student_id = ?
-        """, (student_id,))
+        cursor.row_factory = Student.from_row
+        cursor.execute(f"SELECT s.*, {student_display_sql('s')} FROM Students s WHERE s.student_id = ?",
+                       (student_id,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        if row is None:
+            return None
+        
+        # Program details come from the catalog cache; a student without one is not returned
+        program = self.get_program(row['program_code'])
+        if not program:
+            return None
+        row.program_name = program['program_name']
+        row.department = program['department']
+        return row
     
-    def get_all_students(self) -> List[Dict]:
+    def get_all_students(self) -> List[Student]:
         cursor = self.get_connection().cursor()
-        cursor.execute("""
-            SELECT s.*, p.program_name, p.department
+        cursor.row_factory = Student.from_row
+        cursor.execute(f"""
+            SELECT s.*, p.program_name, p.department, {student_display_sql('s')}
             FROM Students s
             JOIN Programs p ON s.program_code = p.program_code
             ORDER BY s.first_name, s.last_name
         """)
-        return [dict(row) for row in cursor.fetchall()]
+        return cursor.fetchall()
     
     def authenticate_student(self, student_id: str, password: str) -> bool:
         cursor = self.get_connection().cursor()
@@ -238,129 +378,536 @@ class DatabaseManager:
         row = cursor.fetchone()
         return row and row['password'] == password
     
+    def get_login_candidates(self, username: str) -> List[Dict]:
+        # Admin and student accounts matching the username, admin first, in one round trip
+        cursor = self.get_connection().cursor()
+        cursor.execute("""
+            SELECT 'admin' AS user_type, username AS user_id, password, 0 AS priority
+            FROM Admin WHERE username = ?
+            UNION ALL
+            SELECT 'student' AS user_type, student_id AS user_id, password, 1 AS priority
+            FROM Students WHERE student_id = ?
+            ORDER BY priority
+        """, (username, username))
+        return [dict(row) for row in cursor.fetchall()]
+    
     # Subject-related methods
-    def get_available_subjects_for_student(self, student_id: str) -> List[Dict]:
+    def get_available_subjects_for_student(self, student_id: str) -> List[Subject]:
+        program_code, grades = self._get_program_and_grades(student_id)
+        if program_code is None:
+            return []
+        return [subject for subject in self.get_program_subjects(program_code)
+                if subject['subject_code'] not in grades]
+    
+    def _get_program_and_grades(self, student_id: str) -> Tuple[Optional[str], Dict[str, Optional[str]]]:
+        # The student's program and {subject_code: grade} of every registration, in one query
         cursor = self.get_connection().cursor()
         cursor.execute("""
-            SELECT DISTINCT s.*, ss.semester
-            FROM Subjects s
-            JOIN SubjectStructure ss ON s.subject_code = ss.subject_code
-            JOIN Students st ON ss.program_code = st.program_code
+            SELECT st.program_code, rs.subject_code, rs.grade
+            FROM Students st
+            LEFT JOIN RegisteredSubject rs ON rs.student_id = st.student_id
             WHERE st.student_id = ?
-            AND s.subject_code NOT IN (
-                SELECT subject_code FROM RegisteredSubject WHERE student_id = ?
-            )
-            ORDER BY ss.semester, s.subject_code
-        """, (student_id, student_id))
-        return [dict(row) for row in cursor.fetchall()]
+        """, (student_id,))
+        rows = cursor.fetchall()
+        if not rows:
+            return None, {}
+        return rows[0]['program_code'], {
+            row['subject_code']: row['grade'] for row in rows if row['subject_code'] is not None
+        }
     
-    def get_student_registered_subjects(self, student_id: str) -> List[Dict]:
+    def get_student_registered_subjects(self, student_id: str) -> List[Registration]:
         cursor = self.get_connection().cursor()
+        cursor.row_factory = Registration.from_row
         cursor.execute("""
-            SELECT s.*, rs.grade, rs.registration_date
+            SELECT s.*, rs.grade, rs.registration_date, date(rs.registration_date) AS registration_day
             FROM Subjects s
             JOIN RegisteredSubject rs ON s.subject_code = rs.subject_code
             WHERE rs.student_id = ?
-            ORDER BY rs.registration_date
+            ORDER BY rs.registration_date, rs.id
+        """, (student_id,))
+        return cursor.fetchall()
+    
+    def get_academic_summary(self, student_id: str) -> Dict:
+        """GPA and credit totals from the StudentAcademicSummary row kept current by triggers"""
+        return self._read_academic_summary(self.get_connection().cursor(), student_id)
+    
+    @staticmethod
+    def _read_academic_summary(cursor: sqlite3.Cursor, student_id: str) -> Dict:
+        cursor.execute("""
+            SELECT grade_points, graded_credits, attempted_credits, completed_credits
+            FROM StudentAcademicSummary
+            WHERE student_id = ?
         """, (student_id,))
+        row = cursor.fetchone()
+        summary = dict(row) if row else {
+            'grade_points': 0.0, 'graded_credits': 0, 'attempted_credits': 0, 'completed_credits': 0
+        }
+        graded_credits = summary['graded_credits']
+        summary['gpa'] = summary['grade_points'] / graded_credits if graded_credits > 0 else 0.0
+        return summary
+    
+    def rebuild_academic_summary(self):
+        with self.pool.writer() as conn:
+            migrations.rebuild_academic_summary(conn)
+
+    def suspend_academic_summary(self):
+        # Bulk loads of registrations skip per-row upkeep; resume_academic_summary() recomputes
+        with self.pool.writer() as conn:
+            for event in ('insert', 'delete', 'update', 'credits_update'):
+                conn.execute(f"DROP TRIGGER IF EXISTS StudentAcademicSummary_after_{event}")
+
+    def resume_academic_summary(self):
+        with self.pool.writer() as conn:
+            migrations.create_academic_summary_triggers(conn)
+            migrations.rebuild_academic_summary(conn)
+    
+    def verify_academic_summary(self) -> List[Dict]:
+        """Students whose stored totals differ from a full recompute; empty when all agree"""
+        columns = ('grade_points', 'graded_credits', 'attempted_credits', 'completed_credits')
+        cursor = self.get_connection().cursor()
+        cursor.execute(f"""
+            WITH expected AS ({migrations.academic_summary_query()})
+            SELECT e.student_id, 'missing' AS problem FROM expected e
+            WHERE NOT EXISTS (SELECT 1 FROM StudentAcademicSummary a WHERE a.student_id = e.student_id)
+            UNION ALL
+            SELECT a.student_id, 'different' AS problem FROM StudentAcademicSummary a
+            JOIN expected e ON e.student_id = a.student_id
+            WHERE {' OR '.join(f'ABS(a.{c} - e.{c}) > 1e-9' for c in columns)}
+            UNION ALL
+            SELECT a.student_id, 'unexpected' AS problem FROM StudentAcademicSummary a
+            WHERE NOT EXISTS (SELECT 1 FROM expected e WHERE e.student_id = a.student_id)
+            AND ({' OR '.join(f'a.{c} != 0' for c in columns)})
+        """)
         return [dict(row) for row in cursor.fetchall()]
     
+    def get_available_subjects_with_eligibility(self, student_id: str) -> List[Subject]:
+        # Program subjects come from the catalog cache; only the student's registrations are queried
+        program_code, grades = self._get_program_and_grades(student_id)
+        if program_code is None:
+            return []
+        
+        subjects = []
+        for subject in self.get_program_subjects(program_code):
+            if subject['subject_code'] in grades:
+                continue
+            prerequisite = subject['prerequisite']
+            can_register, message = self._prerequisite_status(
+                prerequisite, grades.get(prerequisite), prerequisite in grades
+            )
+            subject['can_register'] = can_register
+            subject['prerequisite_status'] = message
+            subjects.append(subject)
+        return subjects
+    
     def check_prerequisite(self, student_id: str, subject_code: str) -> Tuple[bool, str]:
         cursor = self.get_connection().cursor()
-        
-        # Get prerequisite
-        cursor.execute("SELECT prerequisite FROM Subjects WHERE subject_code = ?", (subject_code,))
+        cursor.execute("""
+            SELECT s.prerequisite,
+                   rs.student_id IS NOT NULL AS prerequisite_taken,
+                   rs.grade AS prerequisite_grade
+            FROM Subjects s
+            LEFT JOIN RegisteredSubject rs
+                ON rs.subject_code = s.prerequisite AND rs.student_id = ?
+            WHERE s.subject_code = ?
+        """, (student_id, subject_code))
         row = cursor.fetchone()
         
-        if not row or not row['prerequisite']:
+        if not row:
             return True, "ไม่มีวิชาบังคับก่อน"
         
-        prerequisite = row['prerequisite']
-        
-        # Check if student passed prerequisite
-        cursor.execute("""
-            SELECT grade FROM RegisteredSubject 
-            WHERE student_id = ? AND subject_code = ?
-        """, (student_id, prerequisite))
+        return self._prerequisite_status(
+            row['prerequisite'], row['prerequisite_grade'], row['prerequisite_taken']
+        )
+    
+    @staticmethod
+    def _prerequisite_status(prerequisite: Optional[str], grade: Optional[str],
+                             taken: bool) -> Tuple[bool, str]:
+        if not prerequisite:
+            return True, "ไม่มีวิชาบังคับก่อน"
         
-        grade_row = cursor.fetchone()
-        if not grade_row:
+        if not taken:
             return False, f"ต้องเรียนวิชา {prerequisite} ก่อน"
         
-        grade = grade_row['grade']
         if grade in ['F', 'IP']:
             return False, f"ต้องสอบผ่านวิชา {prerequisite} ก่อน (เกรดปัจจุบัน: {grade})"
         
         return True, "เรียนครบวิชาบังคับก่อนแล้ว"
     
-    def register_subject(self, student_id: str, subject_code: str) -> Tuple[bool, str]:
-        # Check age
-        student = self.get_student_by_id(student_id)
-        if not student:
-            return False, "ไม่พบข้อมูลนักเรียน"
+    # Prerequisite chains, answered from the PrerequisiteClosure table
+    def get_prerequisite_ancestors(self, subject_code: str) -> List[Dict]:
+        """Every subject that must come before subject_code, nearest first"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("""
+            SELECT s.*, c.depth
+            FROM PrerequisiteClosure c
+            JOIN Subjects s ON s.subject_code = c.ancestor
+            WHERE c.descendant = ? AND c.depth > 0
+            ORDER BY c.depth
+        """, (subject_code,))
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_prerequisite_descendants(self, subject_code: str) -> List[Dict]:
+        """Every subject that needs subject_code somewhere in its chain, nearest first"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("""
+            SELECT s.*, c.depth
+            FROM PrerequisiteClosure c
+            JOIN Subjects s ON s.subject_code = c.descendant
+            WHERE c.ancestor = ? AND c.depth > 0
+            ORDER BY c.depth, s.subject_code
+        """, (subject_code,))
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_missing_prerequisites(self, student_id: str, subject_code: str) -> List[Dict]:
+        """
+        Subjects in the chain before subject_code that the student has not passed,
+        in the order they have to be taken. `grade` is None when never registered.
+        """
+        cursor = self.get_connection().cursor()
+        cursor.execute("""
+            SELECT s.*, c.depth, rs.grade
+            FROM PrerequisiteClosure c
+            JOIN Subjects s ON s.subject_code = c.ancestor
+            LEFT JOIN RegisteredSubject rs
+                ON rs.subject_code = c.ancestor AND rs.student_id = ?
+            WHERE c.descendant = ? AND c.depth > 0
+            AND (rs.student_id IS NULL OR rs.grade IN ('F', 'IP'))
+            ORDER BY c.depth DESC
+        """, (student_id, subject_code))
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def rebuild_prerequisite_closure(self):
+        with self.pool.writer() as conn:
+            migrations.rebuild_prerequisite_closure(conn)
+    
+    def register_subject(self, student_id: str, subject_code: str) -> Tuple[bool, str, Optional[Dict]]:
+        """
+        Register and describe what changed for the student, so a view can apply it
+        instead of reloading: the new registration row, the subject that leaves the
+        available list, the subjects that became registrable because subject_code was
+        their prerequisite, and the new academic summary. The delta is None on failure.
+        """
+        outcome, message, delta = self._register_subject(student_id, subject_code, with_delta=True)
+        return outcome == REGISTERED, message, delta
+    
+    def try_register_subject(self, student_id: str, subject_code: str) -> Tuple[str, str]:
+        """
+        Check eligibility and take a seat in one BEGIN IMMEDIATE transaction, so
+        concurrent registrants (threads or processes) cannot overbook a subject.
+        Returns one of the outcome constants above and a message for the user.
+        """
+        outcome, message, _ = self._register_subject(student_id, subject_code)
+        return outcome, message
+    
+    def _register_subject(self, student_id: str, subject_code: str,
+                          with_delta: bool = False) -> Tuple[str, str, Optional[Dict]]:
+        with self.pool.writer(immediate=True) as conn:
+            cursor = conn.cursor()
+            
+            # Check age
+            cursor.execute(f"SELECT {age_sql('birth_date')} AS age FROM Students WHERE student_id = ?",
+                           (student_id,))
+            student = cursor.fetchone()
+            if not student:
+                return STUDENT_NOT_FOUND, "ไม่พบข้อมูลนักเรียน", None
+            
+            if student['age'] < MIN_STUDENT_AGE:
+                return TOO_YOUNG, f"นักเรียนต้องมีอายุอย่างน้อย {MIN_STUDENT_AGE} ปี", None
+            
+            # Prerequisite, existing registration and seats, read under the write lock
+            cursor.execute("""
+                SELECT s.prerequisite, s.capacity,
+                       pr.student_id IS NOT NULL AS prerequisite_taken,
+                       pr.grade AS prerequisite_grade,
+                       EXISTS (
+                           SELECT 1 FROM RegisteredSubject
+                           WHERE student_id = ? AND subject_code = s.subject_code
+                       ) AS already_registered,
+                       CASE WHEN s.capacity IS NULL THEN 0
+                            ELSE (SELECT COUNT(*) FROM RegisteredSubject WHERE subject_code = s.subject_code)
+                       END AS seats_taken
+                FROM Subjects s
+                LEFT JOIN RegisteredSubject pr
+                    ON pr.subject_code = s.prerequisite AND pr.student_id = ?
+                WHERE s.subject_code = ?
+            """, (student_id, student_id, subject_code))
+            subject = cursor.fetchone()
+            if not subject:
+                return SUBJECT_NOT_FOUND, "ไม่พบรายวิชานี้", None
+            
+            can_register, message = self._prerequisite_status(
+                subject['prerequisite'], subject['prerequisite_grade'], subject['prerequisite_taken']
+            )
+            if not can_register:
+                return PREREQUISITE_NOT_MET, message, None
+            
+            if subject['already_registered']:
+                return ALREADY_REGISTERED, "ลงทะเบียนวิชานี้แล้ว", None
+            
+            if subject['capacity'] is not None and subject['seats_taken'] >= subject['capacity']:
+                return SECTION_FULL, "รายวิชานี้ที่นั่งเต็มแล้ว", None
+            
+            # Register subject
+            try:
+                cursor.execute("""
+                    INSERT INTO RegisteredSubject (student_id, subject_code)
+                    VALUES (?, ?)
+                """, (student_id, subject_code))
+            except sqlite3.IntegrityError as error:
+                if 'section full' in str(error):
+                    return SECTION_FULL, "รายวิชานี้ที่นั่งเต็มแล้ว", None
+                return ALREADY_REGISTERED, "ลงทะเบียนวิชานี้แล้ว", None
+            
+            # Read back under the same lock, so the delta matches what was committed
+            delta = self._registration_delta(cursor, student_id, subject_code) if with_delta else None
         
-        birth_date = datetime.strptime(student['birth_date'], '%Y-%m-%d').date()
-        age = (date.today() - birth_date).days // 365
-        if age < 15:
-            return False, "นักเรียนต้องมีอายุอย่างน้อย 15 ปี"
+        return REGISTERED, "ลงทะเบียนสำเร็จ", delta
+    
+    def _registration_delta(self, cursor: sqlite3.Cursor, student_id: str, subject_code: str) -> Dict:
+        cursor.row_factory = Registration.from_row
+        cursor.execute("""
+            SELECT s.*, rs.grade, rs.registration_date, date(rs.registration_date) AS registration_day
+            FROM Subjects s
+            JOIN RegisteredSubject rs ON s.subject_code = rs.subject_code
+            WHERE rs.student_id = ? AND rs.subject_code = ?
+        """, (student_id, subject_code))
+        registration = cursor.fetchone()
         
-        # Check prerequisite
-        can_register, message = self.check_prerequisite(student_id, subject_code)
-        if not can_register:
-            return False, message
+        # Program subjects not yet registered that were waiting on subject_code
+        cursor.row_factory = Subject.from_row
+        cursor.execute("""
+            SELECT DISTINCT s.*, ss.semester
+            FROM Students st
+            JOIN SubjectStructure ss ON ss.program_code = st.program_code
+            JOIN Subjects s ON s.subject_code = ss.subject_code
+            WHERE st.student_id = ? AND s.prerequisite = ?
+            AND NOT EXISTS (
+                SELECT 1 FROM RegisteredSubject
+                WHERE student_id = st.student_id AND subject_code = s.subject_code
+            )
+            ORDER BY ss.semester, s.subject_code
+        """, (student_id, subject_code))
+        now_eligible = cursor.fetchall()
+        for subject in now_eligible:
+            subject['can_register'], subject['prerequisite_status'] = self._prerequisite_status(
+                subject_code, registration['grade'], True
+            )
         
-        # Register subject
-        try:
-            cursor = self.get_connection().cursor()
-            cursor.execute("""
-                INSERT INTO RegisteredSubject (student_id, subject_code)
-                VALUES (?, ?)
-            """, (student_id, subject_code))
-            self.get_connection().commit()
-            return True, "ลงทะเบียนสำเร็จ"
-        except sqlite3.IntegrityError:
-            return False, "ลงทะเบียนวิชานี้แล้ว"
-    
-    def get_subject_registrations(self, subject_code: str) -> List[Dict]:
+        cursor.row_factory = cursor.connection.row_factory
+        return {
+            'student_id': student_id,
+            'registration': registration,
+            'removed_subject_code': subject_code,
+            'eligibility_changes': now_eligible,
+            'summary': self._read_academic_summary(cursor, student_id)
+        }
+    
+    def get_subject_seats(self, subject_code: str) -> Optional[Dict]:
+        """Capacity, seats taken and seats left (None when unlimited) of a subject"""
         cursor = self.get_connection().cursor()
         cursor.execute("""
-            SELECT s.*, rs.grade, rs.registration_date
+            SELECT s.subject_code, s.capacity,
+                   (SELECT COUNT(*) FROM RegisteredSubject WHERE subject_code = s.subject_code) AS seats_taken
+            FROM Subjects s
+            WHERE s.subject_code = ?
+        """, (subject_code,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        seats = dict(row)
+        seats['seats_left'] = (None if seats['capacity'] is None
+                               else max(seats['capacity'] - seats['seats_taken'], 0))
+        return seats
+    
+    def set_subject_capacity(self, subject_code: str, capacity: Optional[int]) -> bool:
+        """Set a subject's seat limit; None removes the limit"""
+        with self.pool.writer() as conn:
+            cursor = conn.execute(
+                "UPDATE Subjects SET capacity = ? WHERE subject_code = ?", (capacity, subject_code)
+            )
+            return cursor.rowcount > 0
+    
+    def get_subject_registrations(self, subject_code: str) -> List[Registration]:
+        cursor = self.get_connection().cursor()
+        cursor.row_factory = Registration.from_row
+        cursor.execute(f"""
+            SELECT s.student_id, s.prefix, s.first_name, s.last_name, s.birth_date,
+                   s.current_school, s.email, s.program_code,
+                   rs.grade, rs.registration_date, date(rs.registration_date) AS registration_day,
+                   {student_display_sql('s')}
             FROM Students s
             JOIN RegisteredSubject rs ON s.student_id = rs.student_id
             WHERE rs.subject_code = ?
             ORDER BY s.first_name, s.last_name
         """, (subject_code,))
-        return [dict(row) for row in cursor.fetchall()]
+        return cursor.fetchall()
     
     def update_grade(self, student_id: str, subject_code: str, grade: str) -> bool:
         try:
-            cursor = self.get_connection().cursor()
-            cursor.execute("""
-                UPDATE RegisteredSubject 
-                SET grade = ?
-                WHERE student_id = ? AND subject_code = ?
-            """, (grade, student_id, subject_code))
-            self.get_connection().commit()
+            with self.pool.writer() as conn:
+                conn.execute("""
+                    UPDATE RegisteredSubject 
+                    SET grade = ?
+                    WHERE student_id = ? AND subject_code = ?
+                """, (grade, student_id, subject_code))
             return True
-        except:
+        except sqlite3.Error:
             return False
     
-    def get_all_subjects(self) -> List[Dict]:
+    def update_grades(self, subject_code: str, grades: List[Tuple[str, str]]) -> List[Dict]:
+        # Post a roster's (student_id, grade) pairs in one transaction; returns one result per pair
+        results = []
+        updates = []
+        
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT student_id FROM RegisteredSubject WHERE subject_code = ?", (subject_code,))
+            registered = {row[0] for row in cursor.fetchall()}
+            
+            for student_id, grade in grades:
+                if grade not in VALID_GRADES:
+                    success, message = False, f"เกรด {grade} ไม่ถูกต้อง"
+                elif student_id not in registered:
+                    success, message = False, "นักเรียนไม่ได้ลงทะเบียนวิชานี้"
+                else:
+                    success, message = True, "อัพเดทเกรดเรียบร้อยแล้ว"
+                    updates.append((grade, student_id, subject_code))
+                results.append({'student_id': student_id, 'grade': grade, 'success': success, 'message': message})
+            
+            cursor.executemany("""
+                UPDATE RegisteredSubject
+                SET grade = ?
+                WHERE student_id = ? AND subject_code = ?
+            """, updates)
+        
+        return results
+    
+    # Catalog methods, served from self.catalog_cache
+    def _get_cached_rows(self, key: Tuple, tables: Tuple[str, ...], query: str, params: Tuple = (),
+                         record: Optional[Type[Record]] = None) -> List:
+        def load():
+            if not self._catalog_versions:
+                # Versions to compare the next commit against; read before the rows, so a
+                # write in between can only make the next invalidation drop more
+                self._catalog_versions = self._read_catalog_versions(self.get_connection()) or {}
+            cursor = self.get_connection().cursor()
+            if record is not None:
+                cursor.row_factory = record.from_row
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+        # Callers may modify what they get back, so each gets its own copies
+        return [row.copy() for row in self.catalog_cache.get_or_load(key, load, tables)]
+    
+    def get_all_subjects(self) -> List[Subject]:
+        return self._get_cached_rows(('subjects',), ('Subjects',),
+                                     "SELECT * FROM Subjects ORDER BY subject_code", record=Subject)
+    
+    def get_programs(self) -> List[Program]:
+        return self._get_cached_rows(('programs',), ('Programs',),
+                                     "SELECT * FROM Programs ORDER BY program_code", record=Program)
+    
+    def get_program(self, program_code: str) -> Optional[Program]:
+        # Cached per code, so a lookup is one cache hit and one record copy
+        rows = self._get_cached_rows(('program', program_code), ('Programs',),
+                                     "SELECT * FROM Programs WHERE program_code = ?", (program_code,),
+                                     record=Program)
+        return rows[0] if rows else None
+    
+    def get_program_subjects(self, program_code: str) -> List[Subject]:
+        """Subjects in a program's structure with the semester they are offered in"""
+        return self._get_cached_rows(
+            ('program_subjects', program_code), ('Subjects', 'SubjectStructure'), """
+            SELECT DISTINCT s.*, ss.semester
+            FROM SubjectStructure ss
+            JOIN Subjects s ON s.subject_code = ss.subject_code
+            WHERE ss.program_code = ?
+            ORDER BY ss.semester, s.subject_code
+        """, (program_code,), record=Subject)
+    
+    def search_students(self, search_term: str = "", school_filter: str = "", sort_by: str = "name",
+                        limit: Optional[int] = None) -> List[Student]:
         cursor = self.get_connection().cursor()
-        cursor.execute("SELECT * FROM Subjects ORDER BY subject_code")
-        return [dict(row) for row in cursor.fetchall()]
+        cursor.row_factory = Student.from_row
+        query, params, order_by = self._student_search_query(search_term, school_filter, sort_by)
+        
+        query += " ORDER BY " + ", ".join(f"{column} {direction}" for column, direction in order_by)
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        cursor.execute(query, params)
+        return cursor.fetchall()
     
-    def search_students(self, search_term: str = "", school_filter: str = "", sort_by: str = "name") -> List[Dict]:
+    def search_students_page(self, search_term: str = "", school_filter: str = "", sort_by: str = "name",
+                             after: Optional[Tuple] = None, page_size: int = 100) -> List[Student]:
+        # Keyset pagination: seek past the sort key of the last row already shown
+        # instead of using OFFSET, so every page costs the same
         cursor = self.get_connection().cursor()
+        cursor.row_factory = Student.from_row
+        query, params, order_by = self._student_search_query(search_term, school_filter, sort_by)
+        
+        directions = {direction for _, direction in order_by}
+        if after is not None and directions == {"ASC"}:
+            columns = ", ".join(column for column, _ in order_by)
+            query += f" AND ({columns}) > ({', '.join('?' for _ in order_by)})"
+            params.extend(after)
+        elif after is not None:
+            conditions = []
+            for i, (column, direction) in enumerate(order_by):
+                terms = [f"{prev} = ?" for prev, _ in order_by[:i]]
+                terms.append(f"{column} {'<' if direction == 'DESC' else '>'} ?")
+                conditions.append("(" + " AND ".join(terms) + ")")
+                params.extend(after[:i + 1])
+            query += " AND (" + " OR ".join(conditions) + ")"
+        
+        query += " ORDER BY " + ", ".join(f"{column} {direction}" for column, direction in order_by)
+        query += " LIMIT ?"
+        params.append(page_size)
+        
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    
+    @staticmethod
+    def student_page_key(student: Dict, sort_by: str = "name") -> Tuple:
+        # Sort key of a row from search_students_page, passed back as `after`
+        if sort_by == "age":
+            return (student['birth_date'], student['student_id'])
+        if sort_by == "relevance" and 'search_rank' in student:
+            return (student['search_rank'], student['student_id'])
+        return (student['first_name'], student['last_name'], student['student_id'])
+    
+    def _student_search_query(self, search_term: str, school_filter: str, sort_by: str):
+        match_terms = []
+        if self.student_search_enabled():
+            if len(search_term) >= MIN_FTS_TERM_LENGTH:
+                match_terms.append("{student_id first_name last_name} : " + self._fts_phrase(search_term))
+                search_term = ""
+            if len(school_filter) >= MIN_FTS_TERM_LENGTH:
+                match_terms.append("current_school : " + self._fts_phrase(school_filter))
+                school_filter = ""
         
-        query = """
-            SELECT s.*, p.program_name, p.department
-            FROM Students s
-            JOIN Programs p ON s.program_code = p.program_code
-            WHERE 1=1
-        """
         params = []
+        if match_terms:
+            query = """
+                SELECT s.*, p.program_name, p.department, {display}{rank_column}
+                FROM StudentSearch f
+                JOIN Students s ON s.rowid = f.rowid
+                JOIN Programs p ON s.program_code = p.program_code
+                WHERE StudentSearch MATCH ?
+            """.format(display=student_display_sql('s'),
+                       rank_column=", f.rank AS search_rank" if sort_by == "relevance" else "")
+            params.append(" AND ".join(match_terms))
+        else:
+            query = f"""
+                SELECT s.*, p.program_name, p.department, {student_display_sql('s')}
+                FROM Students s
+                JOIN Programs p ON s.program_code = p.program_code
+                WHERE 1=1
+            """
         
+        # Terms too short for trigram matching still use LIKE
         if search_term:
             query += " AND (s.first_name LIKE ? OR s.last_name LIKE ? OR s.student_id LIKE ?)"
             search_param = f"%{search_term}%"
@@ -370,15 +917,385 @@ class DatabaseManager:
             query += " AND s.current_school LIKE ?"
             params.append(f"%{school_filter}%")
         
-        if sort_by == "name":
-            query += " ORDER BY s.first_name, s.last_name"
+        # student_id breaks ties so every row has a unique, seekable sort key
+        if sort_by == "relevance" and match_terms:
+            order_by = [("f.rank", "ASC"), ("s.student_id", "ASC")]
         elif sort_by == "age":
-            query += " ORDER BY s.birth_date DESC"
+            order_by = [("s.birth_date", "DESC"), ("s.student_id", "ASC")]
+        else:
+            order_by = [("s.first_name", "ASC"), ("s.last_name", "ASC"), ("s.student_id", "ASC")]
         
+        return query, params, order_by
+    
+    @staticmethod
+    def _fts_phrase(term: str) -> str:
+        return '"' + term.replace('"', '""') + '"'
+    
+    def get_schools(self) -> List[str]:
+        rows = self._get_cached_rows(
+            ('schools',), ('Students',), "SELECT DISTINCT current_school FROM Students ORDER BY current_school"
+        )
+        return [row['current_school'] for row in rows]
+    
+    # Streaming export methods
+    def iter_query(self, query: str, params: Tuple = (), batch_size: int = 1000) -> Iterator[Dict]:
+        # Rows are pulled from the cursor batch_size at a time, so memory stays flat
+        cursor = self.get_connection().cursor()
         cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(row)
+    
+    def iter_all_students(self, batch_size: int = 1000) -> Iterator[Dict]:
+        return self.iter_query("""
+            SELECT s.student_id, s.prefix, s.first_name, s.last_name, s.birth_date,
+                   s.current_school, s.email, s.program_code, p.program_name, p.department
+            FROM Students s
+            JOIN Programs p ON s.program_code = p.program_code
+            ORDER BY s.student_id
+        """, batch_size=batch_size)
+    
+    def iter_subject_registrations(self, subject_code: str, batch_size: int = 1000) -> Iterator[Dict]:
+        return self.iter_query("""
+            SELECT rs.subject_code, s.student_id, s.prefix, s.first_name, s.last_name,
+                   s.current_school, s.program_code, rs.grade, rs.registration_date
+            FROM RegisteredSubject rs
+            JOIN Students s ON s.student_id = rs.student_id
+            WHERE rs.subject_code = ?
+            ORDER BY s.first_name, s.last_name, s.student_id
+        """, (subject_code,), batch_size=batch_size)
+    
+    def iter_student_transcript(self, student_id: str, batch_size: int = 1000) -> Iterator[Dict]:
+        return self.iter_query("""
+            SELECT rs.student_id, s.subject_code, s.subject_name, s.credits, rs.grade, rs.registration_date
+            FROM RegisteredSubject rs
+            JOIN Subjects s ON s.subject_code = rs.subject_code
+            WHERE rs.student_id = ?
+            ORDER BY rs.registration_date, s.subject_code
+        """, (student_id,), batch_size=batch_size)
+    
+    def iter_transcripts(self, batch_size: int = 1000) -> Iterator[Dict]:
+        # Every student's transcript, grouped by student
+        return self.iter_query("""
+            SELECT rs.student_id, s.subject_code, s.subject_name, s.credits, rs.grade, rs.registration_date
+            FROM RegisteredSubject rs
+            JOIN Subjects s ON s.subject_code = rs.subject_code
+            ORDER BY rs.student_id, rs.registration_date, s.subject_code
+        """, batch_size=batch_size)
+    
+    # Bulk student methods
+    def get_program_codes(self) -> List[str]:
+        return [program['program_code'] for program in self.get_programs()]
+    
+    def find_existing_students(self, student_ids: List[str], emails: List[str]) -> Tuple[set, set]:
+        # Which of these ids and emails are already taken, answered from the unique indexes
+        cursor = self.get_connection().cursor()
+        taken_ids, taken_emails = set(), set()
+        
+        for start in range(0, len(student_ids), 500):
+            batch = student_ids[start:start + 500]
+            cursor.execute(
+                f"SELECT student_id FROM Students WHERE student_id IN ({', '.join('?' for _ in batch)})",
+                batch
+            )
+            taken_ids.update(row[0] for row in cursor.fetchall())
+        
+        for start in range(0, len(emails), 500):
+            batch = emails[start:start + 500]
+            cursor.execute(
+                f"SELECT email FROM Students WHERE email IN ({', '.join('?' for _ in batch)})",
+                batch
+            )
+            taken_emails.update(row[0] for row in cursor.fetchall())
+        
+        return taken_ids, taken_emails
+    
+    def insert_students(self, students: List[Dict]):
+        # One transaction for the whole batch; rows without a password get the column default
+        columns = ('student_id', 'prefix', 'first_name', 'last_name', 'birth_date',
+                   'current_school', 'email', 'program_code')
+        with_password = [tuple(s[c] for c in columns) + (s['password'],) for s in students if s.get('password')]
+        without_password = [tuple(s[c] for c in columns) for s in students if not s.get('password')]
+        
+        with self.pool.writer() as conn:
+            if without_password:
+                conn.executemany(
+                    f"INSERT INTO Students ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                    without_password
+                )
+            if with_password:
+                conn.executemany(
+                    f"INSERT INTO Students ({', '.join(columns)}, password) VALUES ({', '.join('?' for _ in columns)}, ?)",
+                    with_password
+                )
+    
+    # Statistics methods
+    def enable_registration_counters(self):
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            
+            existing = self._counter_tables(cursor)
+            
+            # One row per (subject, grade), kept current by triggers on RegisteredSubject.
+            # A NULL grade is counted under '' so it can take part in the primary key.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS RegistrationCounts (
+                    subject_code TEXT NOT NULL,
+                    grade TEXT NOT NULL,
+                    registration_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (subject_code, grade)
+                )
+            ''')
+            
+            # Recreated every time, so counters enabled before a trigger changed pick the change up
+            for event in ('insert', 'delete', 'update'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS RegistrationCounts_after_{event}")
+            
+            cursor.execute('''
+                CREATE TRIGGER RegistrationCounts_after_insert
+                AFTER INSERT ON RegisteredSubject
+                BEGIN
+                    INSERT INTO RegistrationCounts (subject_code, grade, registration_count)
+                    VALUES (NEW.subject_code, COALESCE(NEW.grade, ''), 1)
+                    ON CONFLICT (subject_code, grade)
+                    DO UPDATE SET registration_count = registration_count + 1;
+                END
+            ''')
+            
+            cursor.execute('''
+                CREATE TRIGGER RegistrationCounts_after_delete
+                AFTER DELETE ON RegisteredSubject
+                BEGIN
+                    UPDATE RegistrationCounts
+                    SET registration_count = registration_count - 1
+                    WHERE subject_code = OLD.subject_code AND grade = COALESCE(OLD.grade, '');
+                END
+            ''')
+            
+            cursor.execute('''
+                CREATE TRIGGER RegistrationCounts_after_update
+                AFTER UPDATE OF subject_code, grade ON RegisteredSubject
+                BEGIN
+                    UPDATE RegistrationCounts
+                    SET registration_count = registration_count - 1
+                    WHERE subject_code = OLD.subject_code AND grade = COALESCE(OLD.grade, '');
+                    INSERT INTO RegistrationCounts (subject_code, grade, registration_count)
+                    VALUES (NEW.subject_code, COALESCE(NEW.grade, ''), 1)
+                    ON CONFLICT (subject_code, grade)
+                    DO UPDATE SET registration_count = registration_count + 1;
+                END
+            ''')
+            
+            # Backfill from existing registrations the first time the counters are enabled
+            if 'RegistrationCounts' not in existing:
+                cursor.execute('''
+                    INSERT INTO RegistrationCounts (subject_code, grade, registration_count)
+                    SELECT subject_code, COALESCE(grade, ''), COUNT(*)
+                    FROM RegisteredSubject
+                    GROUP BY subject_code, COALESCE(grade, '')
+                ''')
+            
+            self._create_program_counters(cursor, backfill='ProgramCounts' not in existing)
+    
+    def _create_program_counters(self, cursor: sqlite3.Cursor, backfill: bool):
+        # Students and registrations per program and the subject/student totals, so the
+        # dashboard reads a handful of rows instead of scanning
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ProgramCounts (
+                program_code TEXT PRIMARY KEY,
+                student_count INTEGER NOT NULL DEFAULT 0,
+                registration_count INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS StatisticsTotals (
+                name TEXT PRIMARY KEY,
+                total INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        ''')
+        
+        program_of = "(SELECT program_code FROM Students WHERE student_id = {student})"
+        registrations_of = "(SELECT COUNT(*) FROM RegisteredSubject WHERE student_id = {student})"
+        add_student = '''
+            INSERT INTO ProgramCounts (program_code, student_count, registration_count)
+            VALUES (NEW.program_code, 1, {registrations})
+            ON CONFLICT (program_code) DO UPDATE SET
+                student_count = student_count + 1,
+                registration_count = registration_count + excluded.registration_count;
+        '''.format(registrations=registrations_of.format(student='NEW.student_id'))
+        remove_student = '''
+            UPDATE ProgramCounts SET
+                student_count = student_count - 1,
+                registration_count = registration_count - {registrations}
+            WHERE program_code = OLD.program_code;
+        '''.format(registrations=registrations_of.format(student='OLD.student_id'))
+        total = "UPDATE StatisticsTotals SET total = total {sign} 1 WHERE name = '{name}';"
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS ProgramCounts_after_student_insert
+            AFTER INSERT ON Students
+            BEGIN {add_student} {total.format(sign='+', name='students')} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS ProgramCounts_after_student_delete
+            AFTER DELETE ON Students
+            BEGIN {remove_student} {total.format(sign='-', name='students')} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS ProgramCounts_after_student_update
+            AFTER UPDATE OF student_id, program_code ON Students
+            WHEN OLD.student_id != NEW.student_id OR OLD.program_code != NEW.program_code
+            BEGIN {remove_student} {add_student} END
+        ''')
+        
+        for event, student, sign in (('insert', 'NEW', '+'), ('delete', 'OLD', '-')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS ProgramCounts_after_registration_{event}
+                AFTER {event.upper()} ON RegisteredSubject
+                BEGIN
+                    UPDATE ProgramCounts SET registration_count = registration_count {sign} 1
+                    WHERE program_code = {program_of.format(student=student + '.student_id')};
+                END
+            ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS ProgramCounts_after_registration_update
+            AFTER UPDATE OF student_id ON RegisteredSubject
+            WHEN OLD.student_id IS NOT NEW.student_id
+            BEGIN
+                UPDATE ProgramCounts SET registration_count = registration_count - 1
+                WHERE program_code = {program_of.format(student='OLD.student_id')};
+                UPDATE ProgramCounts SET registration_count = registration_count + 1
+                WHERE program_code = {program_of.format(student='NEW.student_id')};
+            END
+        ''')
+        
+        for event, sign in (('insert', '+'), ('delete', '-')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS StatisticsTotals_after_subject_{event}
+                AFTER {event.upper()} ON Subjects
+                BEGIN {total.format(sign=sign, name='subjects')} END
+            ''')
+        
+        if backfill:
+            cursor.execute('''
+                INSERT INTO ProgramCounts (program_code, student_count, registration_count)
+                SELECT s.program_code, COUNT(*),
+                       COALESCE(SUM((SELECT COUNT(*) FROM RegisteredSubject rs
+                                     WHERE rs.student_id = s.student_id)), 0)
+                FROM Students s
+                GROUP BY s.program_code
+            ''')
+            cursor.execute('''
+                INSERT INTO StatisticsTotals (name, total)
+                VALUES ('subjects', (SELECT COUNT(*) FROM Subjects)),
+                       ('students', (SELECT COUNT(*) FROM Students))
+            ''')
+    
+    @staticmethod
+    def _counter_tables(cursor: sqlite3.Cursor) -> set:
+        cursor.execute('''
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name IN ('RegistrationCounts', 'ProgramCounts', 'StatisticsTotals')
+        ''')
+        return {row[0] for row in cursor.fetchall()}
+    
+    def registration_counters_enabled(self) -> bool:
+        return 'RegistrationCounts' in self._counter_tables(self.get_connection().cursor())
+    
+    def program_counters_enabled(self) -> bool:
+        # Databases whose counters were enabled before the program counters existed lack them
+        # until enable_registration_counters() runs again
+        return {'ProgramCounts', 'StatisticsTotals'} <= self._counter_tables(self.get_connection().cursor())
+    
+    def get_subject_grade_counts(self) -> List[Dict]:
+        cursor = self.get_connection().cursor()
+        if self.registration_counters_enabled():
+            cursor.execute("""
+                SELECT subject_code, NULLIF(grade, '') AS grade, registration_count
+                FROM RegistrationCounts
+                WHERE registration_count > 0
+            """)
+        else:
+            cursor.execute("""
+                SELECT subject_code, grade, COUNT(*) AS registration_count
+                FROM RegisteredSubject
+                GROUP BY subject_code, grade
+            """)
         return [dict(row) for row in cursor.fetchall()]
     
-    def get_schools(self) -> List[str]:
+    def get_program_statistics(self) -> List[Dict]:
+        cursor = self.get_connection().cursor()
+        if self.program_counters_enabled():
+            cursor.execute("""
+                SELECT p.program_code, p.program_name,
+                       COALESCE(pc.student_count, 0) AS student_count,
+                       COALESCE(pc.registration_count, 0) AS registration_count
+                FROM Programs p
+                LEFT JOIN ProgramCounts pc ON pc.program_code = p.program_code
+                ORDER BY p.program_code
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+        
+        cursor.execute("""
+            SELECT p.program_code, p.program_name,
+                   COALESCE(st.student_count, 0) AS student_count,
+                   COALESCE(rg.registration_count, 0) AS registration_count
+            FROM Programs p
+            LEFT JOIN (
+                SELECT program_code, COUNT(*) AS student_count
+                FROM Students
+                GROUP BY program_code
+            ) st ON st.program_code = p.program_code
+            LEFT JOIN (
+                SELECT s.program_code, COUNT(*) AS registration_count
+                FROM RegisteredSubject rs
+                JOIN Students s ON s.student_id = rs.student_id
+                GROUP BY s.program_code
+            ) rg ON rg.program_code = p.program_code
+            ORDER BY p.program_code
+        """)
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_registration_statistics(self) -> Dict:
         cursor = self.get_connection().cursor()
-        cursor.execute("SELECT DISTINCT current_school FROM Students ORDER BY current_school")
-        return [row[0] for row in cursor.fetchall()]
+        
+        if self.program_counters_enabled():
+            cursor.execute("""
+                SELECT (SELECT total FROM StatisticsTotals WHERE name = 'subjects') AS total_subjects,
+                       (SELECT total FROM StatisticsTotals WHERE name = 'students') AS total_students
+            """)
+        else:
+            cursor.execute("""
+                SELECT (SELECT COUNT(*) FROM Subjects) AS total_subjects,
+                       (SELECT COUNT(*) FROM Students) AS total_students
+            """)
+        totals = cursor.fetchone()
+        
+        # Every subject gets an entry, registered or not; the list comes from the catalog cache
+        subject_registration_counts = {subject['subject_code']: 0 for subject in self.get_all_subjects()}
+        subject_grade_distribution = {}
+        grade_distribution = {}
+        total_registrations = 0
+        
+        for row in self.get_subject_grade_counts():
+            subject_code, grade, count = row['subject_code'], row['grade'], row['registration_count']
+            subject_registration_counts[subject_code] = subject_registration_counts.get(subject_code, 0) + count
+            subject_grade_distribution.setdefault(subject_code, {})[grade] = count
+            grade_distribution[grade] = grade_distribution.get(grade, 0) + count
+            total_registrations += count
+        
+        programs = self.get_program_statistics()
+        
+        return {
+            'total_subjects': totals['total_subjects'],
+            'total_students': totals['total_students'],
+            'total_registrations': total_registrations,
+            'subject_registration_counts': subject_registration_counts,
+            'subject_grade_distribution': subject_grade_distribution,
+            'grade_distribution': grade_distribution,
+            'program_student_counts': {p['program_code']: p['student_count'] for p in programs},
+            'program_registration_counts': {p['program_code']: p['registration_count'] for p in programs}
+        }
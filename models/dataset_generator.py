@@ -0,0 +1,215 @@
+# models/dataset_generator.py
+import itertools
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from models.database_manager import DatabaseManager
+
+# Relative frequency of each grade among finished subjects
+GRADE_WEIGHTS = {'A': 14, 'B+': 14, 'B': 20, 'C+': 15, 'C': 14, 'D+': 8, 'D': 6, 'F': 9}
+
+FIRST_NAMES = ('สมชาย', 'สมหญิง', 'วิชัย', 'มาลี', 'ประยูร', 'นันทา', 'สมศักดิ์', 'กมลพร', 'สุทธิพงษ์',
+               'อรทัย', 'ธนากร', 'ปิยะนุช', 'ณัฐพล', 'ศิริพร', 'กิตติ', 'พิมพ์ชนก', 'อนุชา', 'วรรณา',
+               'ชยพล', 'สุภาวดี', 'ธีรวัฒน์', 'จันทร์เพ็ญ', 'ภานุวัฒน์', 'รัตนา', 'เอกชัย', 'ปวีณา')
+LAST_NAMES = ('ใจดี', 'รักเรียน', 'เก่งมาก', 'สุขใจ', 'มั่นคง', 'ศรีสุข', 'ทองดี', 'บุญมา', 'แก้วใส',
+              'วงศ์ใหญ่', 'พานิช', 'สมบูรณ์', 'ประเสริฐ', 'จันทร์แก้ว', 'ศักดิ์ดี', 'เจริญผล', 'ชัยมงคล',
+              'รุ่งเรือง', 'อินทร์แก้ว', 'ปัญญาดี', 'สายทอง', 'บุญยืน', 'ทองคำ', 'มีสุข')
+SCHOOL_PREFIXES = ('โรงเรียนเตรียมอุดม', 'โรงเรียนสวน', 'โรงเรียนบดินทร', 'โรงเรียนศรี', 'โรงเรียนวัด',
+                   'โรงเรียนสาธิต', 'โรงเรียนมัธยม', 'โรงเรียนประจำจังหวัด')
+DEPARTMENTS = ('ภาควิชาวิทยาการคอมพิวเตอร์', 'ภาควิชาคณิตศาสตร์', 'ภาควิชาฟิสิกส์', 'ภาควิชาเคมี',
+               'ภาควิชาสถิติ', 'ภาควิชาชีววิทยา')
+
+class DatasetGenerator:
+    """
+    Fill an empty database with a synthetic intake at any scale. The same seed
+    and sizes always produce the same rows.
+
+    Schools follow a long-tailed (Zipf-like) popularity, subjects form
+    prerequisite chains up to four levels deep, and each student takes subjects
+    from their program in order, only after passing the prerequisite.
+    """
+    def __init__(self, db_manager: DatabaseManager, seed: int = 1, programs: int = 12,
+                 subjects_per_program: int = 16, general_subjects: int = 12, schools: int = 800,
+                 chunk_size: int = 10000, reference_date: date = date(2026, 6, 1)):
+        self.db_manager = db_manager
+        self.seed = seed
+        self.program_count = programs
+        self.subjects_per_program = subjects_per_program
+        self.general_subject_count = general_subjects
+        self.school_count = schools
+        self.chunk_size = chunk_size
+        # Ages are computed from a fixed date so the output does not depend on today
+        self.reference_date = reference_date
+
+    def generate(self, students: int) -> Dict:
+        """Generate the catalog and `students` students with their registrations; returns row counts"""
+        rng = random.Random(self.seed)
+        programs = self._programs()
+        subjects, structure = self._subjects_and_structure(rng, programs)
+        schools, school_weights = self._schools(rng)
+
+        counts = {'programs': len(programs), 'subjects': len(subjects), 'subject_structure': len(structure),
+                  'students': 0, 'registrations': 0}
+
+        with self.db_manager.pool.writer() as conn:
+            if conn.execute("SELECT 1 FROM Students LIMIT 1").fetchone():
+                raise ValueError("DatasetGenerator needs a database without students")
+            conn.executemany("INSERT OR IGNORE INTO Programs (program_code, program_name, department) "
+                             "VALUES (?, ?, ?)", programs)
+            conn.executemany("INSERT OR IGNORE INTO Subjects (subject_code, subject_name, credits, instructor, "
+                             "prerequisite) VALUES (?, ?, ?, ?, ?)", subjects)
+            conn.executemany("INSERT OR IGNORE INTO SubjectStructure (program_code, subject_code, semester) "
+                             "VALUES (?, ?, ?)", structure)
+
+        # Derived tables are rebuilt once at the end instead of row by row
+        self.db_manager.suspend_student_search_index()
+        self.db_manager.suspend_academic_summary()
+        try:
+            with self._bulk_load_settings():
+                plans = self._program_plans(subjects, structure)
+                for chunk_students, chunk_registrations in self._chunks(
+                        rng, students, programs, plans, schools, school_weights):
+                    with self.db_manager.pool.writer() as conn:
+                        conn.executemany(
+                            "INSERT INTO Students (student_id, prefix, first_name, last_name, birth_date, "
+                            "current_school, email, program_code) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            chunk_students
+                        )
+                        conn.executemany(
+                            "INSERT INTO RegisteredSubject (student_id, subject_code, grade, registration_date) "
+                            "VALUES (?, ?, ?, ?)",
+                            chunk_registrations
+                        )
+                    counts['students'] += len(chunk_students)
+                    counts['registrations'] += len(chunk_registrations)
+        finally:
+            self.db_manager.resume_academic_summary()
+            self.db_manager.resume_student_search_index()
+
+        with self.db_manager.pool.writer() as conn:
+            conn.execute("ANALYZE")
+        return counts
+
+    @contextmanager
+    def _bulk_load_settings(self):
+        # Durability is not needed while loading a throwaway dataset
+        with self.db_manager.pool.writer() as conn:
+            synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+            cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("PRAGMA cache_size = -131072")
+        try:
+            yield
+        finally:
+            with self.db_manager.pool.writer() as conn:
+                conn.execute(f"PRAGMA synchronous = {int(synchronous)}")
+                conn.execute(f"PRAGMA cache_size = {int(cache_size)}")
+
+    def _programs(self) -> List[Tuple[str, str, str]]:
+        programs = [('12345678', 'วิทยาการคอมพิวเตอร์', 'ภาควิชาวิทยาการคอมพิวเตอร์'),
+                    ('12345679', 'วิศวกรรมซอฟต์แวร์', 'ภาควิชาวิทยาการคอมพิวเตอร์'),
+                    ('12345680', 'คณิตศาสตร์ประยุกต์', 'ภาควิชาคณิตศาสตร์')]
+        for i in range(len(programs), self.program_count):
+            department = DEPARTMENTS[i % len(DEPARTMENTS)]
+            programs.append((f"{12345678 + i:08d}", f"หลักสูตรที่ {i + 1} {department[6:]}", department))
+        return programs[:self.program_count]
+
+    def _subjects_and_structure(self, rng: random.Random, programs: List[Tuple]):
+        subjects = []
+        structure = []
+
+        # General education subjects shared by every program, in pairs (I needs before II)
+        general = []
+        for i in range(self.general_subject_count):
+            code = f"9069{i // 2 + 1:02d}{i % 2 + 1:02d}"
+            prerequisite = general[-1] if i % 2 == 1 else None
+            subjects.append((code, f"General Education {i // 2 + 1} {'I' * (i % 2 + 1)}",
+                             3, f"อ.ทั่วไป {i + 1}", prerequisite))
+            general.append(code)
+
+        for p, (program_code, _, _) in enumerate(programs):
+            # Faculty subjects in four levels; most depend on a subject one level down
+            levels = {level: [] for level in range(1, 5)}
+            for i in range(self.subjects_per_program):
+                level = 1 + i * 4 // self.subjects_per_program
+                code = f"{55 + p:03d}{level}{i:04d}"
+                below = levels.get(level - 1) or []
+                prerequisite = rng.choice(below) if below and rng.random() < 0.75 else None
+                subjects.append((code, f"Program {p + 1} Subject {i + 1}",
+                                 rng.choice((1, 2, 3, 3, 3, 4)), f"อ.หลักสูตร {p + 1}-{i + 1}", prerequisite))
+                levels[level].append(code)
+                structure.append((program_code, code, 1 if level % 2 else 2))
+            for code in rng.sample(general, min(len(general), 6)):
+                structure.append((program_code, code, 1 if int(code[-1]) == 1 else 2))
+        return subjects, structure
+
+    def _schools(self, rng: random.Random) -> Tuple[List[str], List[float]]:
+        schools = [f"{SCHOOL_PREFIXES[i % len(SCHOOL_PREFIXES)]}{i + 1}" for i in range(self.school_count)]
+        rng.shuffle(schools)
+        return schools, list(itertools.accumulate(1 / (rank + 1) for rank in range(len(schools))))
+
+    @staticmethod
+    def _program_plans(subjects: List[Tuple], structure: List[Tuple]) -> Dict[str, List[Tuple[str, Optional[str]]]]:
+        # Each program's subjects with their prerequisite, shallowest in the chain first
+        prerequisites = {code: prerequisite for code, _, _, _, prerequisite in subjects}
+        
+        def depth(code):
+            steps = 0
+            while prerequisites.get(code):
+                code = prerequisites[code]
+                steps += 1
+            return steps
+        
+        plans = {}
+        for program_code, subject_code, _ in structure:
+            plans.setdefault(program_code, []).append(subject_code)
+        return {program_code: [(code, prerequisites[code]) for code in sorted(codes, key=lambda c: (depth(c), c))]
+                for program_code, codes in plans.items()}
+
+    def _chunks(self, rng: random.Random, students: int, programs: List[Tuple],
+                plans: Dict, schools: List[str], school_weights: List[float]) -> Iterator[Tuple[List, List]]:
+        program_codes = [program[0] for program in programs]
+        # Bigger programs first, like a real intake
+        # Cumulative weights, so random.choices does not re-add them for every row
+        program_weights = list(itertools.accumulate(1 / (i + 1) ** 0.5 for i in range(len(program_codes))))
+        grades = list(GRADE_WEIGHTS)
+        grade_weights = list(itertools.accumulate(GRADE_WEIGHTS[g] for g in grades))
+        youngest = self.reference_date.replace(year=self.reference_date.year - 15)
+
+        student_rows, registration_rows = [], []
+        for n in range(students):
+            student_id = str(69000000 + n)
+            program_code = rng.choices(program_codes, cum_weights=program_weights)[0]
+            prefix = rng.choice(('นาย', 'นางสาว'))
+            birth_date = youngest - timedelta(days=rng.randint(0, 4 * 365))
+            student_rows.append((
+                student_id, prefix, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), birth_date.isoformat(),
+                rng.choices(schools, cum_weights=school_weights)[0], f"s{student_id}@student.example.ac.th", program_code
+            ))
+
+            # Work through the program in order, taking a random number of subjects;
+            # the last one is often still in progress
+            passed = set()
+            taking = rng.randint(0, 10)
+            taken = 0
+            registered_on = self.reference_date - timedelta(days=rng.randint(0, 365))
+            for subject_code, prerequisite in plans[program_code]:
+                if taken >= taking:
+                    break
+                if prerequisite and prerequisite not in passed:
+                    continue
+                taken += 1
+                in_progress = taken == taking and rng.random() < 0.5
+                grade = 'IP' if in_progress else rng.choices(grades, cum_weights=grade_weights)[0]
+                registration_rows.append((student_id, subject_code, grade, f"{registered_on.isoformat()} 09:00:00"))
+                registered_on += timedelta(days=rng.randint(1, 30))
+                if grade not in ('F', 'IP'):
+                    passed.add(subject_code)
+
+            if len(student_rows) >= self.chunk_size:
+                yield student_rows, registration_rows
+                student_rows, registration_rows = [], []
+
+        if student_rows:
+            yield student_rows, registration_rows
@@ -0,0 +1,30 @@
+# models/exporters.py
+import csv
+import json
+from typing import Dict, Iterable, TextIO
+
+def write_csv(rows: Iterable[Dict], output: TextIO) -> int:
+    """Write rows as CSV with a header taken from the first row; returns the row count"""
+    writer = None
+    count = 0
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(output, fieldnames=list(row.keys()))
+            writer.writeheader()
+        writer.writerow(row)
+        count += 1
+    return count
+
+def write_jsonl(rows: Iterable[Dict], output: TextIO) -> int:
+    """Write one JSON object per line; returns the row count"""
+    count = 0
+    for row in rows:
+        output.write(json.dumps(row, ensure_ascii=False))
+        output.write("\n")
+        count += 1
+    return count
+
+WRITERS = {
+    'csv': write_csv,
+    'jsonl': write_jsonl
+}
@@ -0,0 +1,423 @@
+# models/migrations.py
+"""
+Schema changes applied in order and tracked with SQLite's PRAGMA user_version.
+Each migration runs in its own transaction together with the version bump, so a
+database is never left half-way between two versions.
+"""
+import hashlib
+import sqlite3
+from typing import Callable, List, Sequence, Union
+
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+class Migration:
+    def __init__(self, version: int, description: str, steps: Sequence[Step]):
+        self.version = version
+        self.description = description
+        self.steps = list(steps)
+
+    def apply(self, conn: sqlite3.Connection):
+        for step in self.steps:
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+
+# Triggers cannot use WITH RECURSIVE, so they keep the closure current by joining
+# existing closure rows: a subject's links are the cross product of everything
+# above its prerequisite and everything below itself.
+_CLOSURE_UNLINK = '''
+    DELETE FROM PrerequisiteClosure
+    WHERE descendant IN (SELECT descendant FROM PrerequisiteClosure WHERE ancestor = OLD.subject_code)
+    AND ancestor IN (SELECT ancestor FROM PrerequisiteClosure WHERE descendant = OLD.subject_code);
+'''
+
+_CLOSURE_LINK = '''
+    INSERT OR IGNORE INTO PrerequisiteClosure (ancestor, descendant, depth)
+    VALUES (NEW.subject_code, NEW.subject_code, 0);
+    INSERT OR IGNORE INTO PrerequisiteClosure (ancestor, descendant, depth)
+    SELECT NEW.subject_code, below.descendant, below.depth + 1
+    FROM Subjects child
+    JOIN PrerequisiteClosure below ON below.ancestor = child.subject_code
+    WHERE child.prerequisite = NEW.subject_code AND child.subject_code != NEW.subject_code;
+    INSERT OR IGNORE INTO PrerequisiteClosure (ancestor, descendant, depth)
+    SELECT above.ancestor, below.descendant, above.depth + below.depth + 1
+    FROM PrerequisiteClosure above, PrerequisiteClosure below
+    WHERE above.descendant = NEW.prerequisite AND below.ancestor = NEW.subject_code;
+'''
+
+# A prerequisite may not come after the subject in its own chain
+_CLOSURE_CYCLE_CHECK = '''
+    SELECT RAISE(ABORT, 'prerequisite cycle')
+    WHERE NEW.prerequisite = NEW.subject_code
+    OR EXISTS (
+        SELECT 1 FROM PrerequisiteClosure
+        WHERE ancestor = {subject} AND descendant = NEW.prerequisite
+    )
+    OR EXISTS (
+        SELECT 1 FROM Subjects child
+        JOIN PrerequisiteClosure below ON below.ancestor = child.subject_code
+        WHERE child.prerequisite = NEW.subject_code AND below.descendant = NEW.prerequisite
+    );
+'''
+
+def create_prerequisite_closure_triggers(conn: sqlite3.Connection):
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS PrerequisiteClosure_before_insert
+        BEFORE INSERT ON Subjects
+        WHEN NEW.prerequisite IS NOT NULL
+        BEGIN {_CLOSURE_CYCLE_CHECK.format(subject='NEW.subject_code')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS PrerequisiteClosure_before_update
+        BEFORE UPDATE OF subject_code, prerequisite ON Subjects
+        WHEN NEW.prerequisite IS NOT NULL
+        BEGIN {_CLOSURE_CYCLE_CHECK.format(subject='OLD.subject_code')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS PrerequisiteClosure_after_insert
+        AFTER INSERT ON Subjects
+        BEGIN {_CLOSURE_LINK} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS PrerequisiteClosure_after_delete
+        AFTER DELETE ON Subjects
+        BEGIN {_CLOSURE_UNLINK} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS PrerequisiteClosure_after_update
+        AFTER UPDATE OF subject_code, prerequisite ON Subjects
+        WHEN OLD.subject_code IS NOT NEW.subject_code OR OLD.prerequisite IS NOT NEW.prerequisite
+        BEGIN {_CLOSURE_UNLINK} {_CLOSURE_LINK} END
+    """)
+
+def rebuild_prerequisite_closure(conn: sqlite3.Connection):
+    """Recompute the whole closure from Subjects"""
+    conn.execute("DELETE FROM PrerequisiteClosure")
+    # The depth bound stops a prerequisite cycle in bad data from recursing forever
+    conn.execute('''
+        INSERT OR IGNORE INTO PrerequisiteClosure (ancestor, descendant, depth)
+        WITH RECURSIVE chain(ancestor, descendant, depth) AS (
+            SELECT subject_code, subject_code, 0 FROM Subjects
+            UNION
+            SELECT chain.ancestor, child.subject_code, chain.depth + 1
+            FROM chain
+            JOIN Subjects child ON child.prerequisite = chain.descendant
+            WHERE child.subject_code != chain.descendant
+            AND chain.depth < (SELECT COUNT(*) FROM Subjects)
+        )
+        SELECT ancestor, descendant, MIN(depth) FROM chain GROUP BY ancestor, descendant
+    ''')
+
+# Grade points per credit; IP (in progress) has none and is left out of GPA
+GRADE_POINTS = {
+    'A': 4.0, 'B+': 3.5, 'B': 3.0, 'C+': 2.5,
+    'C': 2.0, 'D+': 1.5, 'D': 1.0, 'F': 0.0
+}
+
+def grade_points_sql(grade: str) -> str:
+    """SQL CASE expression giving the grade points of `grade`, NULL when it has none"""
+    whens = ' '.join(f"WHEN '{g}' THEN {points}" for g, points in GRADE_POINTS.items())
+    return f"(CASE {grade} {whens} ELSE NULL END)"
+
+def _academic_summary_delta(row: str, sign: str, credits: str) -> str:
+    # Add (sign '+') or remove (sign '-') one registration's share of its student's totals
+    points = grade_points_sql(f"{row}.grade")
+    return f"""
+    INSERT INTO StudentAcademicSummary (student_id) VALUES ({row}.student_id)
+    ON CONFLICT (student_id) DO NOTHING;
+    UPDATE StudentAcademicSummary SET
+        grade_points = grade_points {sign} COALESCE({points} * {credits}, 0),
+        graded_credits = graded_credits {sign} CASE WHEN {points} IS NOT NULL THEN {credits} ELSE 0 END,
+        attempted_credits = attempted_credits {sign} {credits},
+        completed_credits = completed_credits {sign}
+            CASE WHEN COALESCE({row}.grade, '') NOT IN ('F', 'IP') THEN {credits} ELSE 0 END
+    WHERE student_id = {row}.student_id;
+    """
+
+def _registration_credits(row: str) -> str:
+    return f"COALESCE((SELECT credits FROM Subjects WHERE subject_code = {row}.subject_code), 0)"
+
+def create_academic_summary_triggers(conn: sqlite3.Connection):
+    add_new = _academic_summary_delta('NEW', '+', _registration_credits('NEW'))
+    remove_old = _academic_summary_delta('OLD', '-', _registration_credits('OLD'))
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS StudentAcademicSummary_after_insert
+        AFTER INSERT ON RegisteredSubject
+        BEGIN {add_new} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS StudentAcademicSummary_after_delete
+        AFTER DELETE ON RegisteredSubject
+        BEGIN {remove_old} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS StudentAcademicSummary_after_update
+        AFTER UPDATE OF student_id, subject_code, grade ON RegisteredSubject
+        BEGIN {remove_old} {add_new} END
+    """)
+
+    # A change of credits moves every registered student's totals by the difference
+    grade = ("(SELECT grade FROM RegisteredSubject rs WHERE rs.student_id = StudentAcademicSummary.student_id "
+             "AND rs.subject_code = NEW.subject_code)")
+    points = grade_points_sql(grade)
+    difference = "(COALESCE(NEW.credits, 0) - COALESCE(OLD.credits, 0))"
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS StudentAcademicSummary_after_credits_update
+        AFTER UPDATE OF credits ON Subjects
+        WHEN OLD.credits IS NOT NEW.credits
+        BEGIN
+            UPDATE StudentAcademicSummary SET
+                grade_points = grade_points + COALESCE({points} * {difference}, 0),
+                graded_credits = graded_credits + CASE WHEN {points} IS NOT NULL THEN {difference} ELSE 0 END,
+                attempted_credits = attempted_credits + {difference},
+                completed_credits = completed_credits +
+                    CASE WHEN COALESCE({grade}, '') NOT IN ('F', 'IP') THEN {difference} ELSE 0 END
+            WHERE student_id IN (SELECT student_id FROM RegisteredSubject WHERE subject_code = NEW.subject_code);
+        END
+    """)
+
+def academic_summary_query() -> str:
+    """Full recompute of StudentAcademicSummary from the registrations"""
+    points = grade_points_sql('rs.grade')
+    credits = "COALESCE(s.credits, 0)"
+    return f"""
+        SELECT rs.student_id,
+               COALESCE(SUM({points} * {credits}), 0) AS grade_points,
+               SUM(CASE WHEN {points} IS NOT NULL THEN {credits} ELSE 0 END) AS graded_credits,
+               SUM({credits}) AS attempted_credits,
+               SUM(CASE WHEN COALESCE(rs.grade, '') NOT IN ('F', 'IP') THEN {credits} ELSE 0 END)
+                   AS completed_credits
+        FROM RegisteredSubject rs
+        LEFT JOIN Subjects s ON s.subject_code = rs.subject_code
+        GROUP BY rs.student_id
+    """
+
+def rebuild_academic_summary(conn: sqlite3.Connection):
+    conn.execute("DELETE FROM StudentAcademicSummary")
+    conn.execute(f"""
+        INSERT INTO StudentAcademicSummary
+            (student_id, grade_points, graded_credits, attempted_credits, completed_credits)
+        {academic_summary_query()}
+    """)
+
+# Tables the catalog cache is built from, with the columns it reads where it
+# does not read them all. A write to one bumps its CatalogVersion row, so the
+# cache only drops what was built from tables a transaction changed.
+CATALOG_TABLES = {
+    'Subjects': None,
+    'Programs': None,
+    'SubjectStructure': None,
+    'Students': ('current_school',)
+}
+
+def create_catalog_version_triggers(conn: sqlite3.Connection):
+    for table, columns in CATALOG_TABLES.items():
+        conn.execute("INSERT OR IGNORE INTO CatalogVersion (table_name) VALUES (?)", (table,))
+        bump = f"UPDATE CatalogVersion SET version = version + 1 WHERE table_name = '{table}';"
+        update_of = f" OF {', '.join(columns)}" if columns else ""
+        for event in ('INSERT', f'UPDATE{update_of}', 'DELETE'):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS CatalogVersion_{table}_after_{event.split()[0].lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    {bump}
+                END
+            """)
+
+MIGRATIONS: List[Migration] = [
+    # Version 1 is the schema the app always had; IF NOT EXISTS lets databases
+    # created before versioning adopt it unchanged
+    Migration(1, "base tables", [
+        '''
+        CREATE TABLE IF NOT EXISTS Students (
+            student_id TEXT PRIMARY KEY,
+            prefix TEXT NOT NULL,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            birth_date DATE NOT NULL,
+            current_school TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            program_code TEXT NOT NULL,
+            password TEXT DEFAULT 'password123'
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS Programs (
+            program_code TEXT PRIMARY KEY,
+            program_name TEXT NOT NULL,
+            department TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS Subjects (
+            subject_code TEXT PRIMARY KEY,
+            subject_name TEXT NOT NULL,
+            credits INTEGER CHECK(credits > 0),
+            instructor TEXT NOT NULL,
+            prerequisite TEXT DEFAULT NULL,
+            FOREIGN KEY (prerequisite) REFERENCES Subjects(subject_code)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS SubjectStructure (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            program_code TEXT NOT NULL,
+            subject_code TEXT NOT NULL,
+            semester INTEGER CHECK(semester IN (1, 2)),
+            FOREIGN KEY (program_code) REFERENCES Programs(program_code),
+            FOREIGN KEY (subject_code) REFERENCES Subjects(subject_code),
+            UNIQUE(program_code, subject_code, semester)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS RegisteredSubject (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id TEXT NOT NULL,
+            subject_code TEXT NOT NULL,
+            grade TEXT CHECK(grade IN ('A', 'B+', 'B', 'C+', 'C', 'D+', 'D', 'F', 'IP')) DEFAULT 'IP',
+            registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (student_id) REFERENCES Students(student_id),
+            FOREIGN KEY (subject_code) REFERENCES Subjects(subject_code),
+            UNIQUE(student_id, subject_code)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS Admin (
+            admin_id TEXT PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL
+        )
+        '''
+    ]),
+    Migration(2, "indexes for registration, search and catalog lookups", [
+        # Rosters and grade posting look registrations up by subject
+        "CREATE INDEX IF NOT EXISTS idx_registered_subject_subject "
+        "ON RegisteredSubject(subject_code, student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_students_program ON Students(program_code)",
+        "CREATE INDEX IF NOT EXISTS idx_students_school ON Students(current_school)",
+        # Match the ORDER BY of the age and name sorts so pages are read in index order
+        "CREATE INDEX IF NOT EXISTS idx_students_birth_date ON Students(birth_date, student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_students_name ON Students(first_name, last_name, student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_subject_structure_subject ON SubjectStructure(subject_code)",
+        "CREATE INDEX IF NOT EXISTS idx_subjects_prerequisite ON Subjects(prerequisite)"
+    ]),
+    Migration(3, "transitive prerequisite closure", [
+        # One row per (ancestor, descendant) pair along a prerequisite chain, plus a
+        # depth-0 row per subject; depth 1 is the direct prerequisite
+        '''
+        CREATE TABLE IF NOT EXISTS PrerequisiteClosure (
+            ancestor TEXT NOT NULL,
+            descendant TEXT NOT NULL,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY (ancestor, descendant)
+        ) WITHOUT ROWID
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_prerequisite_closure_descendant "
+        "ON PrerequisiteClosure(descendant, depth)",
+        create_prerequisite_closure_triggers,
+        rebuild_prerequisite_closure
+    ]),
+    Migration(4, "per-student GPA and credit totals", [
+        # GPA is grade_points / graded_credits; IP registrations count only as attempted
+        '''
+        CREATE TABLE IF NOT EXISTS StudentAcademicSummary (
+            student_id TEXT PRIMARY KEY,
+            grade_points REAL NOT NULL DEFAULT 0,
+            graded_credits INTEGER NOT NULL DEFAULT 0,
+            attempted_credits INTEGER NOT NULL DEFAULT 0,
+            completed_credits INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        create_academic_summary_triggers,
+        rebuild_academic_summary
+    ]),
+    Migration(5, "subject seat capacity", [
+        # NULL means the subject takes any number of students
+        "ALTER TABLE Subjects ADD COLUMN capacity INTEGER DEFAULT NULL CHECK (capacity IS NULL OR capacity >= 0)",
+        # register_subject checks seats itself; this stops any other writer overbooking.
+        # Only capped subjects count their roster, which grows with unlimited subjects
+        '''
+        CREATE TRIGGER IF NOT EXISTS RegisteredSubject_before_insert_capacity
+        BEFORE INSERT ON RegisteredSubject
+        WHEN (SELECT capacity FROM Subjects WHERE subject_code = NEW.subject_code) IS NOT NULL
+        BEGIN
+            SELECT RAISE(ABORT, 'section full')
+            WHERE (SELECT COUNT(*) FROM RegisteredSubject WHERE subject_code = NEW.subject_code)
+                >= (SELECT capacity FROM Subjects WHERE subject_code = NEW.subject_code);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS RegisteredSubject_before_update_capacity
+        BEFORE UPDATE OF subject_code ON RegisteredSubject
+        WHEN NEW.subject_code IS NOT OLD.subject_code
+        AND (SELECT capacity FROM Subjects WHERE subject_code = NEW.subject_code) IS NOT NULL
+        BEGIN
+            SELECT RAISE(ABORT, 'section full')
+            WHERE (SELECT COUNT(*) FROM RegisteredSubject WHERE subject_code = NEW.subject_code)
+                >= (SELECT capacity FROM Subjects WHERE subject_code = NEW.subject_code);
+        END
+        '''
+    ]),
+    Migration(6, "schema fingerprint for fast startup", [
+        # Holds the fingerprint of the last completed schema setup (see schema_fingerprint)
+        '''
+        CREATE TABLE IF NOT EXISTS SchemaInfo (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID
+        '''
+    ]),
+    Migration(7, "per-table change counters for the catalog cache", [
+        '''
+        CREATE TABLE IF NOT EXISTS CatalogVersion (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        ''',
+        create_catalog_version_triggers
+    ])
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def schema_fingerprint(conn: sqlite3.Connection) -> str:
+    """Hash of the schema version and every table, index, view and trigger definition"""
+    digest = hashlib.sha256(str(get_schema_version(conn)).encode())
+    # sqlite_stat1 and friends come and go with ANALYZE
+    for row in conn.execute("""
+        SELECT type, name, tbl_name, sql FROM sqlite_master
+        WHERE name NOT LIKE 'sqlite!_%' ESCAPE '!'
+        ORDER BY type, name
+    """):
+        digest.update(repr(tuple(row)).encode())
+    return digest.hexdigest()
+
+def migrate(conn: sqlite3.Connection, migrations: Sequence[Migration] = MIGRATIONS) -> List[int]:
+    """Apply every migration newer than the database; returns the versions applied"""
+    current = get_schema_version(conn)
+    if current > migrations[-1].version:
+        raise RuntimeError(
+            f"Database schema version {current} is newer than this program "
+            f"(version {migrations[-1].version})"
+        )
+
+    applied = []
+    for migration in migrations:
+        if migration.version <= current:
+            continue
+        # DDL does not open a transaction implicitly, so open one explicitly
+        conn.commit()
+        conn.execute("BEGIN")
+        try:
+            migration.apply(conn)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        applied.append(migration.version)
+    return applied
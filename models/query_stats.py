@@ -0,0 +1,258 @@
+# models/query_stats.py
+import bisect
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# Set to anything but "" or "0" to record every query DatabaseManager runs
+QUERY_STATS_ENV = "STUDENT_REGISTRATION_QUERY_STATS"
+# Queries slower than this many milliseconds go to the slow-query log
+SLOW_QUERY_MS_ENV = "STUDENT_REGISTRATION_SLOW_QUERY_MS"
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Frames in these files are plumbing, not the method that asked for the query
+_PLUMBING_FILES = {os.path.normcase(os.path.join(os.path.dirname(os.path.abspath(__file__)), name))
+                   for name in ('query_stats.py', 'connection_pool.py', 'catalog_cache.py')}
+_PLUMBING_FUNCTIONS = {'__enter__', '__exit__', '__next__', 'get_or_load'}
+
+def calling_method(depth: int = 2) -> str:
+    """Qualified name of the first public function up the stack that is not query plumbing"""
+    frame = sys._getframe(depth)
+    fallback = None
+    while frame is not None:
+        code = frame.f_code
+        name = code.co_name
+        qualified = getattr(code, 'co_qualname', name)
+        if os.path.normcase(code.co_filename) in _PLUMBING_FILES or name in _PLUMBING_FUNCTIONS:
+            pass
+        elif name == '<module>':
+            fallback = fallback or os.path.basename(code.co_filename)
+        elif not name.startswith(('_', '<')) and '<locals>' not in qualified:
+            return qualified
+        elif not name.startswith('<'):
+            # Private helpers and closures are reported only if no public caller is found
+            fallback = fallback or qualified
+        frame = frame.f_back
+    return fallback or '<unknown>'
+
+class QueryStats:
+    """
+    Timings for every statement run on instrumented connections, grouped by
+    the method that ran it. Statements slower than `slow_query_ms` are kept in
+    a bounded log together with their query plan.
+    """
+    def __init__(self, slow_query_ms: float = 100.0, slow_log_size: int = 200):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._methods: Dict[str, Dict] = {}
+        self._slow_queries = deque(maxlen=slow_log_size)
+
+    @classmethod
+    def from_environment(cls, environ=None) -> Optional['QueryStats']:
+        """A QueryStats when the environment asks for one, else None"""
+        environ = os.environ if environ is None else environ
+        if environ.get(QUERY_STATS_ENV, '') in ('', '0'):
+            return None
+        return cls(slow_query_ms=float(environ.get(SLOW_QUERY_MS_ENV) or 100.0))
+
+    def record(self, conn: sqlite3.Connection, method: str, sql: str, parameters, seconds: float, rows: int):
+        elapsed_ms = seconds * 1000
+        bucket = bisect.bisect_left(HISTOGRAM_BOUNDS_MS, elapsed_ms)
+        with self._lock:
+            entry = self._methods.get(method)
+            if entry is None:
+                entry = self._methods[method] = {
+                    'count': 0, 'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'buckets': [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+                }
+            entry['count'] += 1
+            entry['rows'] += rows
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['buckets'][bucket] += 1
+
+        if elapsed_ms >= self.slow_query_ms:
+            # Slow queries are rare, so the extra EXPLAIN is only paid for them
+            self._slow_queries.append({
+                'method': method,
+                'sql': ' '.join(sql.split()),
+                'ms': round(elapsed_ms, 3),
+                'rows': rows,
+                'at': time.time(),
+                'plan': self._explain(conn, sql, parameters)
+            })
+
+    @staticmethod
+    def _explain(conn: sqlite3.Connection, sql: str, parameters) -> Optional[List[str]]:
+        if parameters is None:
+            return None
+        try:
+            # The base class execute, so explaining is not itself recorded
+            rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+        except sqlite3.Error:
+            return None
+        return [row[3] for row in rows]
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-method count, rows, latency summary and histogram ("le" bucket counts)"""
+        with self._lock:
+            methods = {name: dict(entry, buckets=list(entry['buckets'])) for name, entry in self._methods.items()}
+
+        labels = [f"{bound:g}" for bound in HISTOGRAM_BOUNDS_MS] + ['+Inf']
+        result = {}
+        for name, entry in sorted(methods.items()):
+            count = entry['count']
+            result[name] = {
+                'count': count,
+                'rows': entry['rows'],
+                'total_ms': round(entry['total_ms'], 3),
+                'mean_ms': round(entry['total_ms'] / count, 3),
+                'max_ms': round(entry['max_ms'], 3),
+                # Bucket upper bounds, so these are estimates from above
+                'p50_ms': self._bucket_percentile(entry['buckets'], count, 0.50, entry['max_ms']),
+                'p95_ms': self._bucket_percentile(entry['buckets'], count, 0.95, entry['max_ms']),
+                'p99_ms': self._bucket_percentile(entry['buckets'], count, 0.99, entry['max_ms']),
+                'histogram_ms': dict(zip(labels, entry['buckets']))
+            }
+        return result
+
+    @staticmethod
+    def _bucket_percentile(buckets: List[int], count: int, fraction: float, max_ms: float) -> float:
+        rank = fraction * count
+        seen = 0
+        for bound, bucket_count in zip(HISTOGRAM_BOUNDS_MS, buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return min(bound, round(max_ms, 3))
+        return round(max_ms, 3)
+
+    def slow_queries(self) -> List[Dict]:
+        with self._lock:
+            return list(self._slow_queries)
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+            self._slow_queries.clear()
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Times each statement from execute until its rows are read to the end (or
+    the cursor is closed, re-executed or released) and counts those rows.
+    """
+    _pending = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        method = calling_method()
+        started = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except BaseException:
+            self._record(method, sql, parameters, time.perf_counter() - started, 0)
+            raise
+        elapsed = time.perf_counter() - started
+        if self.description is None:
+            self._record(method, sql, parameters, elapsed, max(self.rowcount, 0))
+        else:
+            self._pending = [method, sql, parameters, elapsed, 0]
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        method = calling_method()
+        started = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        finally:
+            self._record(method, sql, None, time.perf_counter() - started, max(self.rowcount, 0))
+        return self
+
+    def executescript(self, sql_script):
+        self._finish()
+        method = calling_method()
+        started = time.perf_counter()
+        try:
+            super().executescript(sql_script)
+        finally:
+            self._record(method, sql_script, None, time.perf_counter() - started, 0)
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._add(time.perf_counter() - started, 0 if row is None else 1, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._add(time.perf_counter() - started, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._add(time.perf_counter() - started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add(time.perf_counter() - started, 0, True)
+            raise
+        self._add(time.perf_counter() - started, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+    def _add(self, seconds: float, rows: int, done: bool):
+        pending = self._pending
+        if pending is None:
+            return
+        pending[3] += seconds
+        pending[4] += rows
+        if done:
+            self._finish()
+
+    def _finish(self):
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            self._record(*pending)
+
+    def _record(self, method, sql, parameters, seconds, rows):
+        stats = getattr(self.connection, 'query_stats', None)
+        if stats is not None:
+            stats.record(self.connection, method, sql, parameters, seconds, rows)
+
+class InstrumentedConnection(sqlite3.Connection):
+    """A connection whose statements are recorded in `query_stats`"""
+    query_stats: Optional[QueryStats] = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection's shortcuts do not go through cursor(), so route them there
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
@@ -0,0 +1,128 @@
+# models/records.py
+import sqlite3
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Tuple
+
+class Record(MutableMapping):
+    """
+    A row held in __slots__ instead of a per-row dict. Item access, `in`, get(),
+    keys(), pop() and dict(row) work as they do on the dict rows callers
+    were written against; columns a query did not select are simply absent.
+    Keys outside the record's fields (a column a query added, or a value a
+    caller sets on the row) go to a small dict created on first use, so rows
+    stay as permissive as the dicts they replaced.
+    """
+    __slots__ = ('_extra',)
+    _fields = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = frozenset(cls.__slots__)
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: Tuple):
+        """Row factory: cursor.row_factory = Student.from_row"""
+        record = cls.__new__(cls)
+        fields = cls._fields
+        for column, value in zip(cursor.description, row):
+            if column[0] in fields:
+                setattr(record, column[0], value)
+            else:
+                record._extras()[column[0]] = value
+        return record
+
+    @classmethod
+    def from_mapping(cls, values) -> 'Record':
+        record = cls.__new__(cls)
+        for key, value in values.items():
+            record[key] = value
+        return record
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return self._extras(create=False)[key]
+
+    def __setitem__(self, key, value):
+        if key in self._fields:
+            setattr(self, key, value)
+        else:
+            self._extras()[key] = value
+
+    def __delitem__(self, key):
+        if key in self._fields:
+            if not hasattr(self, key):
+                raise KeyError(key)
+            delattr(self, key)
+        else:
+            del self._extras(create=False)[key]
+
+    def __contains__(self, key):
+        if key in self._fields:
+            return hasattr(self, key)
+        return key in self._extras(create=False)
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.__slots__:
+            if hasattr(self, name):
+                yield name
+        yield from self._extras(create=False)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> 'Record':
+        record = type(self).__new__(type(self))
+        for name in self:
+            record[name] = self[name]
+        return record
+
+    def to_dict(self) -> Dict:
+        return {name: self[name] for name in self}
+
+    def _extras(self, create: bool = True) -> Dict:
+        try:
+            return self._extra
+        except AttributeError:
+            if not create:
+                return {}
+            extra = self._extra = {}
+            return extra
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+# Column sets are the tables' own columns plus the joined and derived ones
+# DatabaseManager selects alongside them
+
+STUDENT_FIELDS = ('student_id', 'prefix', 'first_name', 'last_name', 'birth_date', 'current_school',
+                  'email', 'program_code')
+SUBJECT_FIELDS = ('subject_code', 'subject_name', 'credits', 'instructor', 'prerequisite', 'capacity')
+
+class Student(Record):
+    __slots__ = STUDENT_FIELDS + ('password', 'program_name', 'department', 'age', 'full_name', 'search_rank')
+
+class Program(Record):
+    __slots__ = ('program_code', 'program_name', 'department')
+
+class Subject(Record):
+    __slots__ = SUBJECT_FIELDS + ('semester', 'can_register', 'prerequisite_status')
+
+class Registration(Record):
+    """
+    A registration joined with either its student (rosters) or its subject
+    (transcripts). Rosters select the student's columns by name, leaving out
+    the password.
+    """
+    __slots__ = tuple(dict.fromkeys(
+        STUDENT_FIELDS + SUBJECT_FIELDS + ('age', 'full_name', 'grade', 'registration_date', 'registration_day')
+    ))
+
+def json_default(value):
+    # json.dumps(..., default=json_default) writes records as objects
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
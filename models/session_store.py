@@ -0,0 +1,64 @@
+# models/session_store.py
+import secrets
+import threading
+import time
+from typing import Dict, Optional
+
+class Session:
+    __slots__ = ('token', 'user_id', 'user_type', 'expires_at')
+
+    def __init__(self, token: str, user_id: str, user_type: str, expires_at: float):
+        self.token = token
+        self.user_id = user_id
+        self.user_type = user_type
+        self.expires_at = expires_at
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.monotonic()) >= self.expires_at
+
+class SessionStore:
+    """
+    In-memory table of logged-in users keyed by an opaque token.
+    Sessions expire after `ttl_seconds` of inactivity.
+    """
+    def __init__(self, ttl_seconds: int = 30 * 60):
+        self.ttl_seconds = ttl_seconds
+        self._sessions: Dict[str, Session] = {}
+        self._lock = threading.Lock()
+
+    def create(self, user_id: str, user_type: str) -> Session:
+        session = Session(secrets.token_urlsafe(32), user_id, user_type,
+                          time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._sessions[session.token] = session
+        return session
+
+    def get(self, token: Optional[str]) -> Optional[Session]:
+        """Look up a live session and extend its expiry"""
+        if not token:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if session.is_expired(now):
+                del self._sessions[token]
+                return None
+            session.expires_at = now + self.ttl_seconds
+            return session
+
+    def revoke(self, token: Optional[str]):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [token for token, session in self._sessions.items() if session.is_expired(now)]
+            for token in expired:
+                del self._sessions[token]
+        return len(expired)
+
+    def __len__(self):
+        return len(self._sessions)
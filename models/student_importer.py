@@ -0,0 +1,160 @@
+# models/student_importer.py
+import csv
+import json
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from models.database_manager import DatabaseManager, MIN_STUDENT_AGE, calculate_age
+
+REQUIRED_FIELDS = ('student_id', 'prefix', 'first_name', 'last_name', 'birth_date',
+                   'current_school', 'email', 'program_code')
+
+REPORT_FIELDS = ('line', 'student_id', 'email', 'reason')
+
+def read_csv_rows(path: str) -> Iterator[Tuple[int, Dict]]:
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        # Line 1 is the header
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            yield line, row
+
+def read_jsonl_rows(path: str) -> Iterator[Tuple[int, Dict]]:
+    with open(path, encoding='utf-8') as f:
+        for line, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError:
+                row = None
+            # Unparseable lines come through empty and are rejected for missing fields
+            yield line, row if isinstance(row, dict) else {}
+
+class StudentImporter:
+    """
+    Stream student rows from CSV or JSONL into the Students table.
+    Rows are validated, then written `chunk_size` at a time, one transaction per chunk.
+    Rejected rows are counted and, when a report file is given, written to it with a reason.
+    With `defer_search_index` the student search index is rebuilt once at the end
+    instead of being updated row by row.
+    """
+    def __init__(self, db_manager: DatabaseManager, chunk_size: int = 5000, defer_search_index: bool = True):
+        self.db_manager = db_manager
+        self.chunk_size = chunk_size
+        self.defer_search_index = defer_search_index
+
+    def import_file(self, path: str, report_path: Optional[str] = None,
+                    file_format: Optional[str] = None) -> Dict:
+        file_format = file_format or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        rows = read_jsonl_rows(path) if file_format == 'jsonl' else read_csv_rows(path)
+
+        if not report_path:
+            return self.import_rows(rows)
+
+        with open(report_path, 'w', newline='', encoding='utf-8') as report_file:
+            report = csv.DictWriter(report_file, fieldnames=REPORT_FIELDS)
+            report.writeheader()
+            return self.import_rows(rows, report)
+
+    def import_rows(self, rows: Iterable[Tuple[int, Dict]], report: Optional[csv.DictWriter] = None) -> Dict:
+        """Import (line_number, row) pairs; returns counts of imported and rejected rows"""
+        self._program_codes = set(self.db_manager.get_program_codes())
+        self._seen_ids = set()
+        self._seen_emails = set()
+        self._report = report
+        summary = {'imported': 0, 'rejected': 0, 'rejection_reasons': {}}
+        self._summary = summary
+
+        # Only loads of at least one full chunk are worth a full index rebuild
+        can_defer = self.defer_search_index and self.db_manager.student_search_enabled()
+        deferred = False
+
+        try:
+            chunk = []
+            for line, row in rows:
+                student, reason = self._validate(row)
+                if reason:
+                    self._reject(line, row, reason)
+                    continue
+                chunk.append((line, student))
+                if len(chunk) >= self.chunk_size:
+                    if can_defer and not deferred:
+                        self.db_manager.suspend_student_search_index()
+                        deferred = True
+                    self._write_chunk(chunk)
+                    chunk = []
+
+            if chunk:
+                self._write_chunk(chunk)
+        finally:
+            if deferred:
+                self.db_manager.resume_student_search_index()
+
+        return summary
+
+    def _validate(self, row: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+        student = {field: str(row.get(field) or '').strip() for field in REQUIRED_FIELDS}
+        student['password'] = str(row.get('password') or '').strip()
+
+        missing = [field for field in REQUIRED_FIELDS if not student[field]]
+        if missing:
+            return None, "missing " + ", ".join(missing)
+
+        try:
+            age = calculate_age(student['birth_date'])
+        except ValueError:
+            return None, "invalid birth_date"
+        if age < MIN_STUDENT_AGE:
+            return None, f"younger than {MIN_STUDENT_AGE}"
+
+        if '@' not in student['email']:
+            return None, "invalid email"
+        if student['program_code'] not in self._program_codes:
+            return None, "unknown program_code"
+
+        # Duplicates within the file; duplicates against the database are checked per chunk
+        if student['student_id'] in self._seen_ids:
+            return None, "duplicate student_id"
+        if student['email'] in self._seen_emails:
+            return None, "duplicate email"
+        self._seen_ids.add(student['student_id'])
+        self._seen_emails.add(student['email'])
+
+        return student, None
+
+    def _write_chunk(self, chunk: List[Tuple[int, Dict]]):
+        taken_ids, taken_emails = self.db_manager.find_existing_students(
+            [student['student_id'] for _, student in chunk],
+            [student['email'] for _, student in chunk]
+        )
+
+        accepted = []
+        for line, student in chunk:
+            if student['student_id'] in taken_ids:
+                self._reject(line, student, "student_id already exists")
+            elif student['email'] in taken_emails:
+                self._reject(line, student, "email already exists")
+            else:
+                accepted.append((line, student))
+
+        try:
+            self.db_manager.insert_students([student for _, student in accepted])
+            self._summary['imported'] += len(accepted)
+        except sqlite3.IntegrityError:
+            # Something changed underneath us; retry row by row to isolate the offenders
+            for line, student in accepted:
+                try:
+                    self.db_manager.insert_students([student])
+                    self._summary['imported'] += 1
+                except sqlite3.IntegrityError as error:
+                    self._reject(line, student, str(error))
+
+    def _reject(self, line: int, row: Dict, reason: str):
+        self._summary['rejected'] += 1
+        reasons = self._summary['rejection_reasons']
+        reasons[reason] = reasons.get(reason, 0) + 1
+        if self._report:
+            self._report.writerow({
+                'line': line,
+                'student_id': row.get('student_id', ''),
+                'email': row.get('email', ''),
+                'reason': reason
+            })
@@ -0,0 +1,13 @@
+# tests/conftest.py
+import pytest
+
+from models.database_manager import DatabaseManager
+
+@pytest.fixture
+def db(tmp_path):
+    """A DatabaseManager on a fresh file database with the sample data loaded"""
+    db_manager = DatabaseManager(str(tmp_path / "registration.db"))
+    db_manager.create_tables()
+    db_manager.insert_sample_data()
+    yield db_manager
+    db_manager.close_connection()
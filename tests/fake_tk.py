@@ -0,0 +1,115 @@
+# tests/fake_tk.py
+import itertools
+import time
+
+class FakeTkRoot:
+    """
+    Enough of a Tk root for the executor and the search pipeline: after()
+    timers run when the test pumps them with run() or run_until(), on the
+    test's own thread, which stands in for the Tk thread.
+    """
+    def __init__(self):
+        self.timers = {}
+        self.reported = []
+        self._ids = itertools.count()
+
+    def after(self, ms, func, *args):
+        after_id = f"after#{next(self._ids)}"
+        self.timers[after_id] = (time.monotonic() + ms / 1000, func, args)
+        return after_id
+
+    def after_cancel(self, after_id):
+        self.timers.pop(after_id, None)
+
+    def winfo_toplevel(self):
+        return self
+
+    def report_callback_exception(self, exc_type, value, traceback):
+        self.reported.append(value)
+
+    def run_until(self, condition, timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                return False
+            self._run_due()
+            time.sleep(0.001)
+        return True
+
+    def run(self, seconds: float):
+        self.run_until(lambda: False, timeout=seconds)
+
+    def _run_due(self):
+        now = time.monotonic()
+        due = sorted((when, after_id) for after_id, (when, _, _) in self.timers.items() if when <= now)
+        for _, after_id in due:
+            timer = self.timers.pop(after_id, None)
+            if timer is not None:
+                timer[1](*timer[2])
+
+class FakeTreeview:
+    """The part of ttk.Treeview that TreeviewSync and PagedTreeview use, kept in lists"""
+    def __init__(self, root=None, columns=()):
+        self.root = root or FakeTkRoot()
+        self.options = {'columns': tuple(columns)}
+        self.order = []
+        self.rows = {}
+        self.first_visible = 0.0
+        self.calls = []
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    def __getitem__(self, option):
+        return self.options[option]
+
+    def insert(self, parent, index, iid, values):
+        assert iid not in self.rows, f"duplicate iid {iid}"
+        self.calls.append(('insert', iid))
+        self.order.insert(len(self.order) if index == 'end' else index, iid)
+        self.rows[iid] = tuple(values)
+
+    def delete(self, *iids):
+        self.calls.append(('delete',) + iids)
+        for iid in iids:
+            self.order.remove(iid)
+            del self.rows[iid]
+
+    def item(self, iid, values=None):
+        if values is None:
+            return {'values': list(self.rows[iid])}
+        self.calls.append(('item', iid))
+        self.rows[iid] = tuple(values)
+
+    def set(self, iid, column, value):
+        values = list(self.rows[iid])
+        values[list(self.options['columns']).index(column)] = value
+        self.rows[iid] = tuple(values)
+
+    def move(self, iid, parent, index):
+        self.calls.append(('move', iid))
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+    def get_children(self, parent=''):
+        return tuple(self.order)
+
+    def yview(self):
+        return (self.first_visible, 1.0)
+
+    def yview_moveto(self, fraction):
+        self.first_visible = fraction
+
+    def after_idle(self, func, *args):
+        return self.root.after(0, func, *args)
+
+    def after_cancel(self, after_id):
+        self.root.after_cancel(after_id)
+
+    def scroll_to_end(self):
+        """What Tk reports once the last rows are in view"""
+        self.options['yscrollcommand']('0.9', '1.0')
+
+class FakeScrollbar:
+    def set(self, first, last):
+        self.position = (first, last)
@@ -0,0 +1,40 @@
+# tests/test_academic_summary.py
+import pytest
+
+def test_summary_of_sample_student(db):
+    # B+, A and B in three 3-credit subjects
+    summary = db.get_academic_summary('69000001')
+    assert summary['grade_points'] == pytest.approx(31.5)
+    assert (summary['graded_credits'], summary['attempted_credits'], summary['completed_credits']) == (9, 9, 9)
+    assert summary['gpa'] == pytest.approx(3.5)
+
+def test_summary_follows_grade_updates(db):
+    assert db.update_grade('69000001', '05500101', 'F')
+    assert db.update_grade('69000001', '90690101', 'IP')
+    summary = db.get_academic_summary('69000001')
+    # F is graded but not completed; IP is attempted only
+    assert (summary['graded_credits'], summary['attempted_credits'], summary['completed_credits']) == (6, 9, 3)
+    assert summary['gpa'] == pytest.approx(1.5)
+
+def test_summary_matches_recompute_after_grade_updates(db):
+    assert db.update_grade('69000001', '05500101', 'F')
+    assert db.update_grade('69000001', '90690101', 'IP')
+    assert db.update_grade('69000002', '05500101', 'C')
+    db.update_grades('90690101', [('69000002', 'D+'), ('69000004', 'B')])
+    assert db.verify_academic_summary() == []
+
+def test_summary_matches_recompute_after_registration_and_delete(db):
+    success, _, delta = db.register_subject('69000004', '05500101')
+    assert success
+    assert delta['summary'] == db.get_academic_summary('69000004')
+    with db.pool.writer() as conn:
+        conn.execute("DELETE FROM RegisteredSubject WHERE student_id = '69000001' AND subject_code = '90690201'")
+    assert db.get_academic_summary('69000001')['attempted_credits'] == 6
+    assert db.verify_academic_summary() == []
+
+def test_suspended_summary_is_rebuilt_on_resume(db):
+    db.suspend_academic_summary()
+    assert db.update_grade('69000001', '05500101', 'F')
+    assert db.verify_academic_summary() != []
+    db.resume_academic_summary()
+    assert db.verify_academic_summary() == []
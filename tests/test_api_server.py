@@ -0,0 +1,141 @@
+# tests/test_api_server.py
+import gzip
+import http.client
+import json
+import threading
+
+import pytest
+
+from api.server import accepts_gzip, make_server
+from models.database_manager import SECTION_FULL
+
+@pytest.fixture
+def server(db):
+    server = make_server(db, port=0)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+class Client:
+    def __init__(self, server):
+        self.connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        self.token = None
+
+    def call(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        self.connection.request(method, path, body=data, headers=headers)
+        response = self.connection.getresponse()
+        raw = response.read()
+        if response.getheader('Content-Encoding') == 'gzip':
+            raw = gzip.decompress(raw)
+        return response.status, json.loads(raw)
+
+    def login(self, username, password):
+        status, payload = self.call('POST', '/api/login', {'username': username, 'password': password})
+        assert status == 200
+        self.token = payload['token']
+        return payload
+
+@pytest.fixture
+def student(server):
+    client = Client(server)
+    client.login('69000004', 'password123')
+    return client
+
+@pytest.fixture
+def admin(server):
+    client = Client(server)
+    client.login('admin', 'admin123')
+    return client
+
+def test_login_and_logout(server):
+    client = Client(server)
+    assert client.call('POST', '/api/login', {'username': 'admin', 'password': 'nope'})[0] == 401
+    assert client.login('admin', 'admin123')['user_type'] == 'admin'
+    assert client.call('POST', '/api/logout') == (200, {'logged_out': True})
+    assert client.call('GET', '/api/subjects')[0] == 401
+
+def test_students_only_reach_their_own_records(student):
+    status, profile = student.call('GET', '/api/students/69000004')
+    assert status == 200 and profile['gpa'] == 4.0 and 'password' not in profile
+    assert student.call('GET', '/api/students/69000001')[0] == 403
+    assert student.call('GET', '/api/subjects/05500101/registrations')[0] == 403
+
+def test_registration_outcomes_map_to_status_codes(db, student, admin):
+    assert student.call('POST', '/api/students/69000004/registrations', {})[0] == 400
+    assert student.call('POST', '/api/students/69000004/registrations', {'subject_code': '05500101'})[0] == 201
+    assert student.call('POST', '/api/students/69000004/registrations', {'subject_code': '05500101'})[0] == 409
+    assert student.call('POST', '/api/students/69000004/registrations', {'subject_code': '05500201'})[0] == 422
+    assert student.call('POST', '/api/students/69000004/registrations', {'subject_code': '99999999'})[0] == 404
+
+    db.set_subject_capacity('90690201', 0)
+    status, payload = admin.call('POST', '/api/students/69000002/registrations', {'subject_code': '90690201'})
+    assert status == 409 and payload['outcome'] == SECTION_FULL
+
+def test_admin_posts_grades_and_reads_rosters(admin):
+    status, results = admin.call('PUT', '/api/subjects/05500101/grades',
+                                 {'grades': [{'student_id': '69000003', 'grade': 'A'}]})
+    assert status == 200 and results[0]['success']
+    assert admin.call('PUT', '/api/subjects/05500101/grades', {'grades': [{'grade': 'A'}]})[0] == 400
+
+    status, roster = admin.call('GET', '/api/subjects/05500101/registrations')
+    assert status == 200
+    assert {row['student_id']: row['grade'] for row in roster}['69000003'] == 'A'
+    assert not any('password' in row for row in roster)
+
+def test_unknown_routes_and_methods(admin):
+    assert admin.call('GET', '/api/nowhere')[0] == 404
+    assert admin.call('PUT', '/api/subjects')[0] == 405
+
+def test_bad_bodies_are_refused(server):
+    client = Client(server)
+    for body, status in [(b'{not json', 400), (b'[1, 2]', 400)]:
+        client.connection.request('POST', '/api/login', body=body)
+        response = client.connection.getresponse()
+        assert response.status == status
+        response.read()
+
+    for length in ('abc', '-5'):
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        connection.putrequest('POST', '/api/login')
+        connection.putheader('Content-Length', length)
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == 400
+        assert response.getheader('Connection') == 'close'
+        response.read()
+
+def test_large_responses_are_gzipped_when_accepted(admin):
+    for accept_encoding, gzipped in [('gzip', True), ('gzip;q=0', False), ('identity', False)]:
+        admin.connection.request('GET', '/api/subjects', headers={
+            'Authorization': f"Bearer {admin.token}", 'Accept-Encoding': accept_encoding
+        })
+        response = admin.connection.getresponse()
+        body = response.read()
+        assert (response.getheader('Content-Encoding') == 'gzip') == gzipped
+        subjects = json.loads(gzip.decompress(body) if gzipped else body)
+        assert len(subjects) == 11
+
+@pytest.mark.parametrize('header, expected', [
+    (None, False),
+    ('', False),
+    ('gzip', True),
+    ('deflate, GZIP', True),
+    ('x-gzip', True),
+    ('gzip;q=0', False),
+    ('gzip; q=0.0, deflate', False),
+    ('gzip;q=0.5', True),
+    ('*', True),
+    ('*;q=0', False),
+    ('gzip;q=0, *', False),
+    ('*;q=0, gzip', True),
+    ('gzip;q=abc', False),
+    ('identity', False),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) == expected
@@ -0,0 +1,110 @@
+# tests/test_catalog_cache.py
+from models.catalog_cache import CatalogCache
+from models.database_manager import DatabaseManager
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def counting_loader(value):
+    calls = []
+
+    def load():
+        calls.append(value)
+        return value
+    return load, calls
+
+def test_entries_are_served_until_they_expire():
+    clock = FakeClock()
+    cache = CatalogCache(ttl_seconds=10, clock=clock)
+    load, calls = counting_loader(['a'])
+
+    assert cache.get_or_load('k', load) == ['a']
+    assert cache.get_or_load('k', load) == ['a']
+    assert len(calls) == 1
+    clock.now = 11
+    cache.get_or_load('k', load)
+    assert len(calls) == 2
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 2, 'evictions': 1, 'invalidations': 0}
+
+def test_least_recently_used_entry_is_dropped():
+    cache = CatalogCache(max_entries=2)
+    for key in ('a', 'b'):
+        cache.get_or_load(key, lambda: key)
+    cache.get_or_load('a', lambda: 'reloaded')
+    cache.get_or_load('c', lambda: 'c')
+    assert cache.get_or_load('a', lambda: 'reloaded') == 'a'
+    assert cache.get_or_load('b', lambda: 'reloaded') == 'reloaded'
+
+def test_invalidating_a_table_drops_only_entries_read_from_it():
+    cache = CatalogCache()
+    cache.get_or_load('subjects', lambda: 'subjects', ('Subjects',))
+    cache.get_or_load('program_subjects', lambda: 'program_subjects', ('Subjects', 'SubjectStructure'))
+    cache.get_or_load('programs', lambda: 'programs', ('Programs',))
+    cache.get_or_load('untagged', lambda: 'untagged')
+
+    cache.invalidate_tables({'SubjectStructure'})
+    assert cache.get_or_load('subjects', lambda: 'new') == 'subjects'
+    assert cache.get_or_load('programs', lambda: 'new') == 'programs'
+    assert cache.get_or_load('program_subjects', lambda: 'new') == 'new'
+    assert cache.get_or_load('untagged', lambda: 'new') == 'new'
+
+def test_value_loaded_across_an_invalidation_is_not_kept():
+    cache = CatalogCache()
+
+    def load():
+        cache.invalidate_tables({'Subjects'})
+        return 'stale'
+
+    assert cache.get_or_load('subjects', load, ('Subjects',)) == 'stale'
+    assert cache.get_or_load('subjects', lambda: 'fresh', ('Subjects',)) == 'fresh'
+
+def test_committed_write_refreshes_what_it_changed(db):
+    assert db.get_all_subjects()[0]['capacity'] is None
+    programs = db.get_programs()
+    misses = db.get_cache_stats()['misses']
+
+    db.set_subject_capacity(db.get_all_subjects()[0]['subject_code'], 30)
+    assert db.get_all_subjects()[0]['capacity'] == 30
+    assert db.get_programs() == programs
+    # Subjects were reloaded, programs were not
+    assert db.get_cache_stats()['misses'] == misses + 1
+
+def test_writes_that_leave_the_catalog_alone_keep_it(db):
+    db.get_all_subjects()
+    db.get_schools()
+    misses = db.get_cache_stats()['misses']
+
+    db.register_subject('69000004', '05500101')
+    db.update_grade('69000001', '05500101', 'A')
+    db.set_subject_capacity('99999999', 10)
+    db.get_all_subjects()
+    db.get_schools()
+    assert db.get_cache_stats()['misses'] == misses
+
+    db.insert_students([{
+        'student_id': '71000001', 'prefix': 'นาย', 'first_name': 'ใหม่', 'last_name': 'มาก',
+        'birth_date': '2006-01-01', 'current_school': 'โรงเรียนใหม่', 'email': 'new@email.com',
+        'program_code': '12345678'
+    }])
+    assert 'โรงเรียนใหม่' in db.get_schools()
+
+def test_callers_get_their_own_copies(db):
+    db.get_all_subjects()[0]['subject_name'] = 'changed'
+    db.get_program('12345678')['program_name'] = 'changed'
+    assert db.get_all_subjects()[0]['subject_name'] != 'changed'
+    assert db.get_program('12345678')['program_name'] != 'changed'
+    assert db.get_program('00000000') is None
+
+def test_writes_from_another_connection_wait_for_the_ttl(db):
+    db.get_all_subjects()
+    other = DatabaseManager(db.db_path)
+    other.set_subject_capacity('05500101', 5)
+    other.close_connection()
+
+    assert db.get_all_subjects()[0]['capacity'] is None
+    db.catalog_cache.invalidate()
+    assert db.get_all_subjects()[0]['capacity'] == 5
@@ -0,0 +1,109 @@
+# tests/test_connection_pool.py
+import sqlite3
+import threading
+
+import pytest
+
+from models.connection_pool import ConnectionPool
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"))
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE Items (name TEXT PRIMARY KEY, value INTEGER)")
+        conn.execute("INSERT INTO Items VALUES ('a', 1)")
+    yield pool
+    pool.close_all()
+
+def read_value(conn):
+    return conn.execute("SELECT value FROM Items WHERE name = 'a'").fetchone()[0]
+
+def in_thread(func):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join(5)
+    return result[0]
+
+def test_one_reader_per_thread(pool):
+    assert pool.reader() is pool.reader()
+    assert in_thread(pool.reader) is not pool.reader()
+
+def test_file_databases_use_wal(pool):
+    assert pool.reader().execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+def test_readers_see_the_last_commit_while_a_write_is_open(pool):
+    holding, release = threading.Event(), threading.Event()
+
+    def write():
+        with pool.writer() as conn:
+            conn.execute("UPDATE Items SET value = 2")
+            holding.set()
+            release.wait(5)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    assert holding.wait(5)
+    assert read_value(pool.reader()) == 1
+    release.set()
+    writer.join(5)
+    assert read_value(pool.reader()) == 2
+
+def test_writer_rolls_back_on_error(pool):
+    with pytest.raises(ZeroDivisionError):
+        with pool.writer() as conn:
+            conn.execute("UPDATE Items SET value = 5")
+            1 / 0
+    assert read_value(pool.reader()) == 1
+
+def test_nested_writers_share_one_transaction(pool):
+    with pytest.raises(sqlite3.IntegrityError):
+        with pool.writer() as outer:
+            outer.execute("UPDATE Items SET value = 3")
+            with pool.writer() as inner:
+                assert inner is outer
+                inner.execute("INSERT INTO Items VALUES ('a', 4)")
+    assert read_value(pool.reader()) == 1
+
+def test_writers_take_turns(pool):
+    def add(n):
+        for i in range(50):
+            with pool.writer() as conn:
+                value = conn.execute("SELECT value FROM Items WHERE name = 'a'").fetchone()[0]
+                conn.execute("UPDATE Items SET value = ?", (value + 1,))
+
+    threads = [threading.Thread(target=add, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert read_value(pool.reader()) == 201
+    assert pool.metrics()['writer_checkouts'] >= 200
+
+def test_commit_listeners_only_hear_about_changes(pool):
+    heard = []
+    pool.add_commit_listener(heard.append)
+    with pool.writer() as conn:
+        conn.execute("UPDATE Items SET value = 1 WHERE name = 'missing'")
+    assert heard == []
+    with pool.writer() as conn:
+        conn.execute("UPDATE Items SET value = 9")
+    assert len(heard) == 1
+
+def test_close_all_reopens_readers(pool):
+    before = pool.reader()
+    pool.close_all()
+    after = pool.reader()
+    assert after is not before and read_value(after) == 1
+
+def test_memory_database_shares_its_connection():
+    pool = ConnectionPool(":memory:")
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE Items (name TEXT)")
+    assert pool.reader() is conn
+    pool.close_all()
+
+def test_update_grade_reports_database_errors(db):
+    # The CHECK constraint on grade rejects the value
+    assert not db.update_grade('69000001', '05500101', 'Z')
+    assert db.update_grade('69000001', '05500101', 'A')
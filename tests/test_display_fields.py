@@ -0,0 +1,50 @@
+# tests/test_display_fields.py
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from models.database_manager import age_sql, calculate_age
+
+def sql_age(birth_date):
+    conn = sqlite3.connect(":memory:")
+    try:
+        return conn.execute(f"SELECT {age_sql('?')}", (birth_date,)).fetchone()[0]
+    finally:
+        conn.close()
+
+def local_today():
+    conn = sqlite3.connect(":memory:")
+    try:
+        return date.fromisoformat(conn.execute("SELECT date('now', 'localtime')").fetchone()[0])
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize('days_ago', [0, 1, 364, 365, 366, 5474, 5475, 5476, 5840, 7300, 36500])
+def test_sql_age_matches_calculate_age(days_ago):
+    today = local_today()
+    birth_date = (today - timedelta(days=days_ago)).isoformat()
+    assert sql_age(birth_date) == calculate_age(birth_date, today)
+
+def test_sql_age_across_leap_days():
+    today = local_today()
+    for birth_date in ('2008-02-29', '2004-02-29', '2009-03-01', '2008-12-31'):
+        assert sql_age(birth_date) == calculate_age(birth_date, today)
+
+def test_students_carry_age_and_full_name(db):
+    for student in db.get_all_students():
+        assert student['age'] == calculate_age(student['birth_date'])
+        assert student['full_name'] == f"{student['prefix']}{student['first_name']} {student['last_name']}"
+
+    student = db.get_student_by_id('69000001')
+    assert student['full_name'] == 'นายสมชาย ใจดี'
+    assert student['age'] == calculate_age('2007-01-15')
+    assert [s['full_name'] for s in db.search_students('สมชาย')] == ['นายสมชาย ใจดี']
+
+def test_registrations_carry_the_registration_day(db):
+    db.register_subject('69000004', '05500101')
+    for registration in db.get_subject_registrations('05500101'):
+        assert registration['registration_day'] == registration['registration_date'][:10]
+        assert registration['full_name'].endswith(registration['last_name'])
+    for subject in db.get_student_registered_subjects('69000001'):
+        assert subject['registration_day'] == subject['registration_date'][:10]
@@ -0,0 +1,64 @@
+# tests/test_exports.py
+import csv
+import io
+import json
+
+import pytest
+
+from models.exporters import write_csv, write_jsonl
+from tools import export_data
+
+STUDENT_COLUMNS = ('student_id', 'prefix', 'first_name', 'last_name', 'birth_date',
+                   'current_school', 'email', 'program_code', 'program_name', 'department')
+
+@pytest.mark.parametrize('batch_size', [1, 3, 1000])
+def test_streams_match_the_full_queries(db, batch_size):
+    students = sorted(db.get_all_students(), key=lambda s: s['student_id'])
+    assert list(db.iter_all_students(batch_size)) == [
+        {column: student[column] for column in STUDENT_COLUMNS} for student in students
+    ]
+
+    roster = [(r['student_id'], r['grade'], r['registration_date']) for r in db.get_subject_registrations('05500101')]
+    streamed = [(r['student_id'], r['grade'], r['registration_date'])
+                for r in db.iter_subject_registrations('05500101', batch_size)]
+    assert sorted(streamed) == sorted(roster) and len(streamed) == 3
+
+    for student in students:
+        transcript = [(r['subject_code'], r['grade']) for r in db.get_student_registered_subjects(student['student_id'])]
+        streamed = [(r['subject_code'], r['grade'])
+                    for r in db.iter_student_transcript(student['student_id'], batch_size)]
+        assert streamed == transcript
+
+    everyone = list(db.iter_transcripts(batch_size))
+    assert [r['student_id'] for r in everyone] == sorted(r['student_id'] for r in everyone)
+    assert len(everyone) == sum(len(db.get_student_registered_subjects(s['student_id'])) for s in students)
+
+def test_streams_are_lazy(db):
+    rows = db.iter_query("SELECT student_id FROM Students ORDER BY student_id", batch_size=2)
+    assert next(rows) == {'student_id': '69000001'}
+    assert next(rows) == {'student_id': '69000002'}
+
+def test_writers_count_rows():
+    rows = [{'student_id': '69000001', 'first_name': 'สมชาย'}, {'student_id': '69000002', 'first_name': 'สมหญิง'}]
+
+    output = io.StringIO()
+    assert write_csv(iter(rows), output) == 2
+    assert list(csv.DictReader(io.StringIO(output.getvalue()))) == rows
+
+    output = io.StringIO()
+    assert write_jsonl(iter(rows), output) == 2
+    assert [json.loads(line) for line in output.getvalue().splitlines()] == rows
+
+    assert write_csv(iter([]), io.StringIO()) == 0
+
+def test_command_line_export(db, tmp_path, capsys):
+    output = tmp_path / "transcript.jsonl"
+    assert export_data.main(['transcript', '69000001', '--db', db.db_path,
+                             '--format', 'jsonl', '--output', str(output)]) == 0
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['subject_code'] for line in lines] == \
+        [r['subject_code'] for r in db.get_student_registered_subjects('69000001')]
+    assert capsys.readouterr().err.strip() == "exported 3 rows"
+
+    with pytest.raises(SystemExit):
+        export_data.main(['roster', '--db', db.db_path])
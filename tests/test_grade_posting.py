@@ -0,0 +1,44 @@
+# tests/test_grade_posting.py
+import pytest
+
+from models.database_manager import DatabaseManager
+
+def roster_grades(db, subject_code):
+    return {row['student_id']: row['grade'] for row in db.iter_subject_registrations(subject_code)}
+
+@pytest.fixture
+def twin(tmp_path):
+    db = DatabaseManager(str(tmp_path / "twin.db"))
+    db.create_tables()
+    db.insert_sample_data()
+    yield db
+    db.close_connection()
+
+POSTING = [('69000001', 'A'), ('69000002', 'Z'), ('69000003', 'B'), ('69000004', 'C'), ('99999999', 'A')]
+
+def test_batch_matches_posting_one_grade_at_a_time(db, twin):
+    results = db.update_grades('05500101', POSTING)
+
+    assert [(r['student_id'], r['grade'], r['success']) for r in results] == [
+        ('69000001', 'A', True), ('69000002', 'Z', False), ('69000003', 'B', True),
+        ('69000004', 'C', False), ('99999999', 'A', False)
+    ]
+    for student_id, grade in POSTING:
+        twin.update_grade(student_id, '05500101', grade)
+    assert roster_grades(db, '05500101') == roster_grades(twin, '05500101')
+    assert roster_grades(db, '05500101')['69000002'] == 'A'
+
+def test_batch_is_one_transaction(db):
+    commits = []
+    db.pool.add_commit_listener(commits.append)
+    db.update_grades('05500101', [(student_id, 'C') for student_id in ('69000001', '69000002', '69000003')])
+    assert len(commits) == 1
+
+def test_batch_without_valid_pairs_writes_nothing(db):
+    commits = []
+    db.pool.add_commit_listener(commits.append)
+    before = roster_grades(db, '05500101')
+    results = db.update_grades('05500101', [('69000004', 'A'), ('69000001', 'Q')])
+    assert not any(result['success'] for result in results)
+    assert roster_grades(db, '05500101') == before
+    assert commits == []
@@ -0,0 +1,66 @@
+# tests/test_login_sessions.py
+import pytest
+
+from controllers.auth_controller import AuthController
+from models import session_store
+from models.session_store import SessionStore
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store.time, 'monotonic', clock)
+    return clock
+
+def test_candidates_match_the_single_account_checks(db):
+    for username, password in [('admin', 'admin123'), ('69000001', 'password123'),
+                               ('admin', 'wrong'), ('69000001', 'wrong'), ('nobody', 'x')]:
+        candidates = db.get_login_candidates(username)
+        admin = bool(db.authenticate_admin(username, password))
+        student = bool(db.authenticate_student(username, password))
+        matched = [c['user_type'] for c in candidates if c['password'] == password]
+        assert matched == ['admin'] * admin + ['student'] * student
+
+def test_login_opens_a_session(db):
+    auth = AuthController(db)
+    session = auth.login('69000001', 'password123')
+    assert (session.user_id, session.user_type) == ('69000001', 'student')
+    assert auth.get_session(session.token) is session
+    assert auth.login('69000001', 'wrong') is None
+    assert auth.login('', '') is None
+
+def test_admin_takes_precedence_over_a_student_with_the_same_id(db):
+    with db.pool.writer() as conn:
+        conn.execute("INSERT INTO Admin (admin_id, username, password) VALUES ('admin002', '69000001', 'password123')")
+    assert AuthController(db).authenticate('69000001', 'password123') == (True, '69000001', 'admin')
+
+def test_logout_revokes_the_session(db):
+    auth = AuthController(db)
+    token = auth.login('admin', 'admin123').token
+    auth.logout(token)
+    assert auth.get_session(token) is None
+    auth.logout(token)
+
+def test_sessions_expire_after_inactivity(clock):
+    store = SessionStore(ttl_seconds=60)
+    active = store.create('69000001', 'student')
+    idle = store.create('69000002', 'student')
+
+    clock.now += 50
+    assert store.get(active.token) is active
+    clock.now += 50
+    # Using a session pushes its expiry back
+    assert store.get(active.token) is active
+    assert store.get(idle.token) is None
+    assert len(store) == 1
+
+    clock.now += 60
+    assert store.purge_expired() == 1
+    assert len(store) == 0
+    assert store.get(None) is None
@@ -0,0 +1,55 @@
+# tests/test_prerequisite_closure.py
+import sqlite3
+
+import pytest
+
+CHAIN = ['05500401', '05500301', '05500201', '05500102', '05500101']
+
+def add_subject(db, subject_code, prerequisite=None):
+    with db.pool.writer() as conn:
+        conn.execute("""
+            INSERT INTO Subjects (subject_code, subject_name, credits, instructor, prerequisite)
+            VALUES (?, 'Test subject', 3, 'Test instructor', ?)
+        """, (subject_code, prerequisite))
+
+def set_prerequisite(db, subject_code, prerequisite):
+    with db.pool.writer() as conn:
+        conn.execute("UPDATE Subjects SET prerequisite = ? WHERE subject_code = ?", (prerequisite, subject_code))
+
+def ancestors(db, subject_code):
+    return [(row['subject_code'], row['depth']) for row in db.get_prerequisite_ancestors(subject_code)]
+
+def test_closure_follows_added_and_removed_edges(db):
+    add_subject(db, '05500501', prerequisite='05500401')
+    assert ancestors(db, '05500501') == [(code, depth) for depth, code in enumerate(CHAIN, start=1)]
+    assert '05500501' in [row['subject_code'] for row in db.get_prerequisite_descendants('05500101')]
+
+    set_prerequisite(db, '05500501', None)
+    assert ancestors(db, '05500501') == []
+    assert '05500501' not in [row['subject_code'] for row in db.get_prerequisite_descendants('05500101')]
+
+    # Links between the other subjects are untouched
+    assert ancestors(db, '05500401') == [(code, depth) for depth, code in enumerate(CHAIN[1:], start=1)]
+
+def test_closure_matches_rebuild(db):
+    add_subject(db, '05500501', prerequisite='05500401')
+    set_prerequisite(db, '05500201', '05500101')
+    conn = db.get_connection()
+    kept = sorted(tuple(row) for row in conn.execute("SELECT * FROM PrerequisiteClosure"))
+    db.rebuild_prerequisite_closure()
+    assert sorted(tuple(row) for row in conn.execute("SELECT * FROM PrerequisiteClosure")) == kept
+
+@pytest.mark.parametrize('subject_code, prerequisite', [
+    ('05500101', '05500401'),
+    ('05500101', '05500101'),
+])
+def test_prerequisite_cycle_is_rejected(db, subject_code, prerequisite):
+    with pytest.raises(sqlite3.IntegrityError, match='prerequisite cycle'):
+        set_prerequisite(db, subject_code, prerequisite)
+    assert db.get_prerequisite_ancestors('05500101') == []
+
+def test_missing_prerequisites_in_the_order_to_take_them(db):
+    # 69000001 passed 05500101 and has nothing further along the chain
+    missing = db.get_missing_prerequisites('69000001', '05500401')
+    assert [row['subject_code'] for row in missing] == ['05500102', '05500201', '05500301']
+    assert all(row['grade'] is None for row in missing)
@@ -0,0 +1,69 @@
+# tests/test_query_stats.py
+import pytest
+
+from models.database_manager import DatabaseManager
+from models.query_stats import QUERY_STATS_ENV, SLOW_QUERY_MS_ENV, HISTOGRAM_BOUNDS_MS, QueryStats
+
+@pytest.fixture
+def instrumented(tmp_path):
+    db = DatabaseManager(str(tmp_path / "stats.db"), query_stats=QueryStats(slow_query_ms=0))
+    db.create_tables()
+    db.insert_sample_data()
+    db.reset_query_stats()
+    yield db
+    db.close_connection()
+
+def test_instrumentation_is_off_by_default(db):
+    assert db.get_query_stats() is None
+
+def test_environment_turns_instrumentation_on():
+    assert QueryStats.from_environment({}) is None
+    assert QueryStats.from_environment({QUERY_STATS_ENV: '0'}) is None
+    stats = QueryStats.from_environment({QUERY_STATS_ENV: '1', SLOW_QUERY_MS_ENV: '25'})
+    assert stats.slow_query_ms == 25
+
+def test_queries_are_charged_to_the_method_that_ran_them(instrumented):
+    instrumented.get_student_by_id('69000001')
+    instrumented.get_student_registered_subjects('69000001')
+    instrumented.get_student_registered_subjects('69000002')
+
+    stats = instrumented.get_query_stats()
+    assert stats['DatabaseManager.get_student_registered_subjects']['count'] == 2
+    assert stats['DatabaseManager.get_student_registered_subjects']['rows'] == 5
+    assert stats['DatabaseManager.get_student_by_id']['count'] >= 1
+    # Connection setup and the pool are plumbing, not callers
+    assert not any('get_connection' in name or 'reader' in name for name in stats)
+
+def test_streamed_rows_are_counted_when_read(instrumented):
+    rows = instrumented.iter_all_students(batch_size=4)
+    assert next(rows)['student_id'] == '69000001'
+    # The statement stays open, so nothing is recorded until the last row is read
+    assert 'DatabaseManager.iter_query' not in instrumented.get_query_stats()
+    assert len(list(rows)) == 10
+    assert instrumented.get_query_stats()['DatabaseManager.iter_query']['rows'] == 11
+
+def test_slow_log_keeps_the_plan_and_skips_connection_setup(instrumented):
+    instrumented.close_connection()
+    instrumented.get_student_by_id('69000001')
+
+    slow = instrumented.get_slow_queries()
+    assert slow and not any('PRAGMA' in query['sql'] for query in slow)
+    lookup = next(query for query in slow if query['method'] == 'DatabaseManager.get_student_by_id')
+    assert lookup['plan'] and lookup['rows'] == 1
+
+    instrumented.reset_query_stats()
+    assert instrumented.get_query_stats() == {} and instrumented.get_slow_queries() == []
+
+def test_histogram_and_percentiles():
+    stats = QueryStats(slow_query_ms=1000)
+    for ms in [0.05] * 98 + [3, 40]:
+        stats.record(None, 'method', 'SELECT 1', (), ms / 1000, 1)
+
+    entry = stats.stats()['method']
+    assert entry['count'] == 100 and entry['rows'] == 100
+    assert sum(entry['histogram_ms'].values()) == 100
+    assert entry['histogram_ms'][f"{HISTOGRAM_BOUNDS_MS[0]:g}"] == 98
+    assert entry['p50_ms'] == 0.1
+    assert entry['p99_ms'] == 5
+    assert entry['max_ms'] == 40
+    assert stats.slow_queries() == []
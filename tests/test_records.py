@@ -0,0 +1,71 @@
+# tests/test_records.py
+import json
+import sqlite3
+
+import pytest
+
+from models.records import Program, Registration, Student, json_default
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    yield conn
+    conn.close()
+
+def fetch(conn, record, sql):
+    cursor = conn.cursor()
+    cursor.row_factory = record.from_row
+    return cursor.execute(sql).fetchone()
+
+def test_rows_behave_like_the_dicts_they_replace(conn):
+    row = fetch(conn, Student, "SELECT '69000001' AS student_id, 'สมชาย' AS first_name, NULL AS email")
+    assert dict(row) == {'student_id': '69000001', 'first_name': 'สมชาย', 'email': None}
+    assert row['email'] is None and 'email' in row
+    assert 'last_name' not in row and row.get('last_name', '-') == '-'
+    with pytest.raises(KeyError):
+        row['last_name']
+    assert list(row.keys()) == ['student_id', 'first_name', 'email']
+    assert len(row) == 3
+    assert row.pop('email') is None and 'email' not in row
+    with pytest.raises(KeyError):
+        del row['email']
+
+def test_rows_have_no_instance_dict(conn):
+    row = fetch(conn, Program, "SELECT '12345678' AS program_code")
+    assert not hasattr(row, '__dict__')
+    # Extras are not allocated until a key outside the fields turns up
+    assert not hasattr(row, '_extra')
+
+def test_keys_outside_the_fields_are_kept(conn):
+    row = fetch(conn, Student, "SELECT '69000001' AS student_id, 'Som' AS nickname")
+    assert row['nickname'] == 'Som' and 'nickname' in row
+    row['status'] = 'ok'
+    assert row.to_dict() == {'student_id': '69000001', 'nickname': 'Som', 'status': 'ok'}
+    del row['nickname']
+    assert dict(row) == {'student_id': '69000001', 'status': 'ok'}
+    with pytest.raises(KeyError):
+        del row['nickname']
+
+def test_copies_are_independent(conn):
+    row = fetch(conn, Student, "SELECT '69000001' AS student_id, 'Som' AS nickname")
+    copy = row.copy()
+    copy['student_id'] = '69000002'
+    copy['nickname'] = 'Ying'
+    assert (row['student_id'], row['nickname']) == ('69000001', 'Som')
+    assert type(copy) is Student
+
+def test_from_mapping_round_trips():
+    values = {'program_code': '12345678', 'program_name': 'Computer Science', 'department': 'Science'}
+    assert Program.from_mapping(values).to_dict() == values
+
+def test_records_serialize_as_json_objects(conn):
+    row = fetch(conn, Student, "SELECT '69000001' AS student_id, 20 AS age")
+    assert json.loads(json.dumps([row], default=json_default)) == [{'student_id': '69000001', 'age': 20}]
+    with pytest.raises(TypeError):
+        json.dumps(object(), default=json_default)
+
+def test_rosters_leave_out_the_password(db):
+    assert 'password' not in Registration._fields
+    roster = db.get_subject_registrations('05500101')
+    assert len(roster) == 3
+    assert all('password' not in row and row['email'] for row in roster)
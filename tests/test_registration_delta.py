@@ -0,0 +1,74 @@
+# tests/test_registration_delta.py
+from controllers.student_controller import StudentController
+from models.change_events import ChangeEventBus, REGISTRATION_ADDED
+
+def dashboard(db, student_id):
+    return {
+        'registered': [dict(row) for row in db.get_student_registered_subjects(student_id)],
+        'available': {row['subject_code']: dict(row) for row in db.get_available_subjects_with_eligibility(student_id)},
+        'summary': dict(db.get_academic_summary(student_id))
+    }
+
+def apply_delta(shown, delta):
+    available = dict(shown['available'])
+    del available[delta['removed_subject_code']]
+    for subject in delta['eligibility_changes']:
+        available[subject['subject_code']] = dict(subject)
+    return {
+        'registered': shown['registered'] + [dict(delta['registration'])],
+        'available': available,
+        'summary': dict(delta['summary'])
+    }
+
+def test_delta_matches_a_full_reload(db):
+    # Grade the prerequisite first, so registering a follow-on subject changes eligibility
+    db.update_grade('69000003', '05500101', 'B')
+    checked = 0
+    for student_id in ('69000001', '69000002', '69000003', '69000004', '69000005'):
+        for subject_code, subject in dashboard(db, student_id)['available'].items():
+            if not subject['can_register']:
+                continue
+            shown = dashboard(db, student_id)
+            success, _, delta = db.register_subject(student_id, subject_code)
+            assert success
+            assert apply_delta(shown, delta) == dashboard(db, student_id)
+            checked += 1
+    assert checked >= 10
+
+def test_delta_lists_subjects_waiting_on_the_new_one(db):
+    success, _, delta = db.register_subject('69000004', '05500101')
+    assert success
+    assert delta['registration']['subject_code'] == '05500101'
+    assert delta['registration']['registration_day'] == delta['registration']['registration_date'][:10]
+    waiting = {subject['subject_code'] for subject in delta['eligibility_changes']}
+    assert waiting and all(subject['prerequisite'] == '05500101' for subject in delta['eligibility_changes'])
+    # Registered but not yet graded, so the follow-on subjects stay closed
+    assert not any(subject['can_register'] for subject in delta['eligibility_changes'])
+
+def test_failed_registration_has_no_delta(db):
+    assert db.register_subject('69000001', '05500101')[2] is None
+    assert db.register_subject('69000001', '99999999')[2] is None
+
+def test_controller_publishes_successful_registrations(db):
+    events = ChangeEventBus()
+    published = []
+    events.subscribe(REGISTRATION_ADDED, published.append)
+    controller = StudentController(db, events)
+
+    assert controller.register_for_subject('69000004', '05500101')[0]
+    assert not controller.register_for_subject('69000004', '05500101')[0]
+    assert [delta['removed_subject_code'] for delta in published] == ['05500101']
+    assert published[0]['student_id'] == '69000004'
+
+def test_event_bus_delivers_in_order_until_unsubscribed():
+    events = ChangeEventBus()
+    calls = []
+    first = events.subscribe('changed', lambda payload: calls.append(('first', payload)))
+    events.subscribe('changed', lambda payload: calls.append(('second', payload)))
+
+    assert events.publish('changed', 1) == 2
+    first()
+    first()
+    assert events.publish('changed', 2) == 1
+    assert events.publish('other', 3) == 0
+    assert calls == [('first', 1), ('second', 1), ('second', 2)]
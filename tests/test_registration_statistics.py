@@ -0,0 +1,72 @@
+# tests/test_registration_statistics.py
+from collections import Counter
+
+import pytest
+
+from controllers.admin_controller import AdminController
+
+def expected_statistics(db):
+    """The statistics recounted row by row in Python"""
+    conn = db.get_connection()
+    subjects = [row['subject_code'] for row in conn.execute("SELECT subject_code FROM Subjects")]
+    students = {row['student_id']: row['program_code'] for row in conn.execute("SELECT * FROM Students")}
+    programs = [row['program_code'] for row in conn.execute("SELECT program_code FROM Programs")]
+    registrations = [tuple(row) for row in conn.execute("SELECT student_id, subject_code, grade FROM RegisteredSubject")]
+
+    subject_counts = dict.fromkeys(subjects, 0)
+    subject_grades = {}
+    for _, subject_code, grade in registrations:
+        subject_counts[subject_code] += 1
+        grades = subject_grades.setdefault(subject_code, {})
+        grades[grade] = grades.get(grade, 0) + 1
+    program_students = Counter(students.values())
+    program_registrations = Counter(students[student_id] for student_id, _, _ in registrations
+                                    if student_id in students)
+    return {
+        'total_subjects': len(subjects),
+        'total_students': len(students),
+        'total_registrations': len(registrations),
+        'subject_registration_counts': subject_counts,
+        'subject_grade_distribution': subject_grades,
+        'grade_distribution': dict(Counter(grade for _, _, grade in registrations)),
+        'program_student_counts': {code: program_students[code] for code in programs},
+        'program_registration_counts': {code: program_registrations[code] for code in programs}
+    }
+
+def change_registrations(db):
+    assert db.register_subject('69000004', '05500101')[0]
+    assert db.update_grade('69000001', '05500101', 'F')
+    db.insert_students([{
+        'student_id': '69000099', 'prefix': 'นาย', 'first_name': 'Test', 'last_name': 'Student',
+        'birth_date': '2005-01-01', 'current_school': 'Test School', 'email': 'test@example.com',
+        'program_code': '12345679'
+    }])
+    with db.pool.writer() as conn:
+        conn.execute("DELETE FROM RegisteredSubject WHERE student_id = '69000002' AND subject_code = '90690101'")
+        # The CHECK on grade lets an explicit NULL through
+        conn.execute("INSERT INTO RegisteredSubject (student_id, subject_code, grade) VALUES ('69000099', '90690201', NULL)")
+        conn.execute("UPDATE Students SET program_code = '12345680' WHERE student_id = '69000003'")
+
+@pytest.mark.parametrize('counters', [False, True])
+def test_statistics_match_a_recount(db, counters):
+    if counters:
+        db.enable_registration_counters()
+    assert AdminController(db).get_registration_statistics() == expected_statistics(db)
+    change_registrations(db)
+    assert db.get_registration_statistics() == expected_statistics(db)
+
+def test_counters_enabled_on_existing_data_are_backfilled(db):
+    change_registrations(db)
+    before = db.get_registration_statistics()
+    db.enable_registration_counters()
+    assert db.registration_counters_enabled() and db.program_counters_enabled()
+    assert db.get_registration_statistics() == before
+    # Enabling again changes nothing
+    db.enable_registration_counters()
+    assert db.get_registration_statistics() == before
+
+def test_program_statistics_list_every_program(db):
+    db.enable_registration_counters()
+    programs = db.get_program_statistics()
+    assert [row['program_code'] for row in programs] == db.get_program_codes()
+    assert sum(row['student_count'] for row in programs) == db.get_registration_statistics()['total_students']
@@ -0,0 +1,77 @@
+# tests/test_search_pipeline.py
+import threading
+
+import pytest
+
+from tests.fake_tk import FakeTkRoot
+from views.search_pipeline import DebouncedSearch
+from views.task_executor import TkTaskExecutor
+
+@pytest.fixture
+def root():
+    root = FakeTkRoot()
+    yield root
+    TkTaskExecutor.shared(root).shutdown()
+
+def make_search(root, search_func, delay_ms=20):
+    shown, errors = [], []
+    search = DebouncedSearch(root, TkTaskExecutor.shared(root).group(), search_func,
+                             on_result=shown.append, on_error=errors.append, delay_ms=delay_ms)
+    return search, shown, errors
+
+def test_typing_runs_only_the_last_search_after_the_delay(root):
+    calls = []
+    search, shown, _ = make_search(root, lambda term: calls.append(term) or term.upper())
+    for term in ('s', 'sm', 'smi'):
+        search.submit(term)
+    assert calls == []
+    assert root.run_until(lambda: shown)
+    assert calls == ['smi'] and shown == ['SMI']
+
+def test_requests_made_while_a_search_runs_collapse_into_the_newest(root):
+    release = threading.Event()
+    calls = []
+
+    def slow(term):
+        calls.append(term)
+        release.wait(5)
+        return term
+
+    search, shown, _ = make_search(root, slow)
+    search.submit_now('a')
+    assert root.run_until(lambda: calls == ['a'])
+    search.submit_now('ab')
+    search.submit_now('abc')
+    release.set()
+    assert root.run_until(lambda: shown)
+    root.run(0.05)
+    # 'a' is stale and 'ab' never ran
+    assert calls == ['a', 'abc'] and shown == ['abc']
+
+def test_search_runs_off_the_tk_thread(root):
+    tk_thread = threading.get_ident()
+    search, shown, _ = make_search(root, lambda term: threading.get_ident() != tk_thread)
+    search.submit_now('x')
+    assert root.run_until(lambda: shown) and shown == [True]
+
+def test_errors_go_to_on_error(root):
+    search, shown, errors = make_search(root, lambda term: 1 / 0)
+    search.submit_now('x')
+    assert root.run_until(lambda: errors)
+    assert isinstance(errors[0], ZeroDivisionError) and shown == []
+
+def test_cancel_and_close_drop_pending_results(root):
+    release = threading.Event()
+    search, shown, _ = make_search(root, lambda term: release.wait(5) and term)
+    search.submit('pending')
+    search.cancel()
+    assert not root.timers
+
+    search.submit_now('running')
+    search.close()
+    release.set()
+    root.run(0.1)
+    assert shown == []
+    search.submit_now('after close')
+    root.run(0.1)
+    assert shown == []
@@ -0,0 +1,60 @@
+# tests/test_seat_capacity.py
+import sqlite3
+import threading
+
+import pytest
+
+from models.database_manager import DatabaseManager, REGISTERED, SECTION_FULL
+
+def test_registration_refused_beyond_capacity(db):
+    seats_taken = db.get_subject_seats('05500101')['seats_taken']
+    assert db.set_subject_capacity('05500101', seats_taken)
+
+    success, _, delta = db.register_subject('69000004', '05500101')
+    assert not success and delta is None
+    assert db.try_register_subject('69000004', '05500101')[0] == SECTION_FULL
+    assert db.get_subject_seats('05500101')['seats_left'] == 0
+
+    assert db.set_subject_capacity('05500101', seats_taken + 1)
+    success, _, delta = db.register_subject('69000004', '05500101')
+    assert success and delta is not None
+    assert db.get_subject_seats('05500101')['seats_taken'] == seats_taken + 1
+
+def test_unlimited_subject_has_no_seats_left_figure(db):
+    seats = db.get_subject_seats('05500101')
+    assert seats['capacity'] is None and seats['seats_left'] is None
+    assert db.get_subject_seats('99999999') is None
+
+def test_trigger_stops_other_writers_overbooking(db):
+    db.set_subject_capacity('05500101', db.get_subject_seats('05500101')['seats_taken'])
+    with pytest.raises(sqlite3.IntegrityError, match='section full'):
+        with db.pool.writer() as conn:
+            conn.execute("INSERT INTO RegisteredSubject (student_id, subject_code) VALUES ('69000004', '05500101')")
+
+def test_concurrent_registrations_fill_exactly_the_capacity(db, tmp_path):
+    student_ids = [f"7{i:07d}" for i in range(40)]
+    db.insert_students([{
+        'student_id': student_id, 'prefix': 'นาย', 'first_name': 'Test', 'last_name': student_id,
+        'birth_date': '2005-01-01', 'current_school': 'Test School',
+        'email': f"{student_id}@test.example", 'program_code': '12345678'
+    } for student_id in student_ids])
+    capacity = 5 + db.get_subject_seats('05500101')['seats_taken']
+    db.set_subject_capacity('05500101', capacity)
+
+    outcomes = []
+    def register(batch):
+        # Each worker has its own connections, like separate processes would
+        worker_db = DatabaseManager(str(tmp_path / "registration.db"), busy_timeout_ms=30000)
+        for student_id in batch:
+            outcomes.append(worker_db.try_register_subject(student_id, '05500101')[0])
+        worker_db.close_connection()
+
+    threads = [threading.Thread(target=register, args=(student_ids[i::8],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert outcomes.count(REGISTERED) == 5
+    assert outcomes.count(SECTION_FULL) == len(student_ids) - 5
+    assert db.get_subject_seats('05500101')['seats_taken'] == capacity
@@ -0,0 +1,81 @@
+# tests/test_student_import.py
+import csv
+import json
+
+from models.student_importer import REQUIRED_FIELDS, StudentImporter
+from tools import import_students
+
+def applicant(student_id, **overrides):
+    row = {
+        'student_id': student_id, 'prefix': 'นาย', 'first_name': 'Importer', 'last_name': student_id,
+        'birth_date': '2006-05-01', 'current_school': 'Import School',
+        'email': f"{student_id}@import.test", 'program_code': '12345679'
+    }
+    row.update(overrides)
+    return row
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=REQUIRED_FIELDS + ('password',))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def test_import_accepts_valid_rows_and_reports_the_rest(db, tmp_path):
+    rows = [applicant(f"7100{i:04d}") for i in range(25)] + [
+        applicant('71009001', birth_date='not a date'),
+        applicant('71009002', birth_date='2020-01-01'),
+        applicant('71009003', email='no-at-sign'),
+        applicant('71009004', program_code='00000000'),
+        applicant('71009005', first_name=''),
+        applicant('71000000'),
+        applicant('71009006', email='71000001@import.test'),
+        applicant('69000001'),
+        applicant('71009007', email='somchai@email.com'),
+        applicant('71009008', password='secret'),
+    ]
+    write_csv(tmp_path / "applicants.csv", rows)
+
+    summary = StudentImporter(db, chunk_size=10).import_file(
+        str(tmp_path / "applicants.csv"), report_path=str(tmp_path / "rejected.csv"))
+
+    assert summary['imported'] == 26
+    assert summary['rejection_reasons'] == {
+        'invalid birth_date': 1, 'younger than 15': 1, 'invalid email': 1,
+        'unknown program_code': 1, 'missing first_name': 1, 'duplicate student_id': 1,
+        'duplicate email': 1, 'student_id already exists': 1, 'email already exists': 1
+    }
+    assert summary['rejected'] == 9
+
+    with open(tmp_path / "rejected.csv", encoding='utf-8') as f:
+        report = list(csv.DictReader(f))
+    assert len(report) == 9
+    # Line 1 is the header, so the first data row is line 2
+    assert report[0] == {'line': '27', 'student_id': '71009001',
+                         'email': '71009001@import.test', 'reason': 'invalid birth_date'}
+
+    assert db.get_student_by_id('71000024')['first_name'] == 'Importer'
+    assert db.authenticate_student('71009008', 'secret')
+    assert db.authenticate_student('71000000', 'password123')
+    # The deferred search index is rebuilt after the load
+    assert len(db.search_students('Importer')) == 26
+
+def test_jsonl_lines_that_do_not_parse_are_rejected(db, tmp_path):
+    path = tmp_path / "applicants.jsonl"
+    path.write_text(json.dumps(applicant('71000001'), ensure_ascii=False) + "\n\n{not json\n",
+                    encoding='utf-8')
+    summary = StudentImporter(db).import_file(str(path))
+    assert summary['imported'] == 1 and summary['rejected'] == 1
+
+def test_find_existing_students_batches_large_lookups(db):
+    ids = [f"7200{i:04d}" for i in range(1200)] + ['69000002']
+    emails = [f"{i}@nowhere.test" for i in range(1200)] + ['wichai@email.com']
+    assert db.find_existing_students(ids, emails) == ({'69000002'}, {'wichai@email.com'})
+
+def test_command_line_import(db, tmp_path, capsys):
+    db_path = db.db_path
+    db.close_connection()
+    write_csv(tmp_path / "applicants.csv", [applicant('71000001'), applicant('69000001')])
+
+    assert import_students.main([str(tmp_path / "applicants.csv"), '--db', db_path]) == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert (summary['imported'], summary['rejected']) == (1, 1)
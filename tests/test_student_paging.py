@@ -0,0 +1,97 @@
+# tests/test_student_paging.py
+import threading
+
+import pytest
+
+from controllers.admin_controller import AdminController
+from tests.fake_tk import FakeScrollbar, FakeTkRoot, FakeTreeview
+from views.paged_treeview import PagedTreeview
+from views.task_executor import TkTaskExecutor
+
+@pytest.fixture
+def db(db):
+    # Repeated names and birth dates, so pages have to break ties on student_id
+    db.insert_students([{
+        'student_id': f"6910{i:04d}", 'prefix': 'นาย', 'first_name': ['สมชาย', 'สมศักดิ์', 'อนันต์'][i % 3],
+        'last_name': ['ใจดี', 'ทดสอบ'][i % 2], 'birth_date': f"2006-0{1 + i % 3}-15",
+        'current_school': ['โรงเรียนสมชาย', 'โรงเรียนสงขลา'][i % 2], 'email': f"page{i}@example.com",
+        'program_code': '12345678'
+    } for i in range(57)])
+    return db
+
+def all_pages(db, term, school, sort_by, page_size):
+    rows, after = [], None
+    while True:
+        page = db.search_students_page(term, school, sort_by, after=after, page_size=page_size)
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        after = db.student_page_key(page[-1], sort_by)
+
+def ids(rows):
+    return [row['student_id'] for row in rows]
+
+@pytest.mark.parametrize('term, school, sort_by', [
+    ('', '', 'name'),
+    ('', '', 'age'),
+    ('สม', '', 'name'),
+    ('สมชาย', '', 'relevance'),
+    ('ใจดี', 'สงขลา', 'age'),
+    ('', 'โรงเรียน', 'name'),
+])
+@pytest.mark.parametrize('page_size', [1, 7, 100])
+def test_keyset_pages_match_the_full_search(db, term, school, sort_by, page_size):
+    assert ids(all_pages(db, term, school, sort_by, page_size)) == ids(db.search_students(term, school, sort_by))
+
+def render(row):
+    return (row['student_id'], row['first_name'])
+
+def paged_tree(root, tasks=None, page_size=10):
+    tree = FakeTreeview(root)
+    paged = PagedTreeview(tree, FakeScrollbar(), render, lambda row: row['student_id'],
+                          page_size=page_size, tasks=tasks)
+    return tree, paged
+
+def start(paged, controller, sort_by='name'):
+    paged.reset(controller.search_students_page('', '', sort_by, page_size=paged.page_size),
+                lambda after, size: controller.search_students_page('', '', sort_by, after, size),
+                lambda row: controller.student_page_key(row, sort_by))
+
+def test_scrolling_to_the_end_loads_the_next_page(db):
+    controller = AdminController(db)
+    root = FakeTkRoot()
+    tree, paged = paged_tree(root)
+    start(paged, controller)
+    assert len(tree.order) == 10
+
+    tree.scroll_to_end()
+    root.run_until(lambda: not root.timers)
+    assert len(tree.order) == 20
+
+    while not paged.exhausted:
+        tree.scroll_to_end()
+        root.run_until(lambda: not root.timers)
+    assert tree.order == ids(controller.search_students())
+
+def test_pages_load_off_the_tk_thread_and_stale_pages_are_dropped(db):
+    controller = AdminController(db)
+    root = FakeTkRoot()
+    executor = TkTaskExecutor(root)
+    release = threading.Event()
+
+    def slow_page(after, size):
+        release.wait(5)
+        return controller.search_students_page('', '', 'name', after, size)
+
+    tree, paged = paged_tree(root, tasks=executor.group())
+    paged.reset(controller.search_students_page('', '', 'name', page_size=10), slow_page,
+                lambda row: controller.student_page_key(row, 'name'))
+    tree.scroll_to_end()
+    assert root.run_until(lambda: paged._loading is not None)
+
+    # A new search replaces the list before the old page arrives
+    start(paged, controller, sort_by='age')
+    release.set()
+    root.run(0.1)
+    assert tree.order == ids(controller.search_students('', '', 'age'))[:10]
+    executor.shutdown()
@@ -0,0 +1,51 @@
+# tests/test_student_search.py
+import pytest
+
+TERMS = ['สมชาย', 'สม', 'เรียน', 'ใจดี', '690000', '69000011', 'Smith', 'a"b', '']
+SCHOOLS = ['', 'โรงเรียน', 'สงขลา', 'ดาว']
+
+def ids(rows):
+    return [row['student_id'] for row in rows]
+
+def like_search(db, *args):
+    # The LIKE queries used when SQLite has no FTS5
+    enabled = db._student_search_enabled
+    db._student_search_enabled = False
+    try:
+        return db.search_students(*args)
+    finally:
+        db._student_search_enabled = enabled
+
+@pytest.mark.parametrize('term', TERMS)
+@pytest.mark.parametrize('school', SCHOOLS)
+@pytest.mark.parametrize('sort_by', ['name', 'age'])
+def test_index_finds_what_like_finds(db, term, school, sort_by):
+    assert db.student_search_enabled()
+    assert ids(db.search_students(term, school, sort_by)) == ids(like_search(db, term, school, sort_by))
+
+def test_relevance_sort_returns_the_same_students(db):
+    found = db.search_students('เรียน', '', 'relevance')
+    assert sorted(ids(found)) == sorted(ids(like_search(db, 'เรียน', '', 'name')))
+    assert all('search_rank' in row for row in found)
+
+def test_index_follows_student_writes(db):
+    with db.pool.writer() as conn:
+        conn.execute("UPDATE Students SET first_name = 'ทดสอบระบบ' WHERE student_id = '69000001'")
+        conn.execute("DELETE FROM Students WHERE student_id = '69000011'")
+    assert ids(db.search_students('ทดสอบระบบ')) == ['69000001']
+    assert db.search_students('สมชาย') == []
+    assert db.search_students('ธนากร') == []
+
+def test_suspended_index_catches_up_on_resume(db):
+    db.suspend_student_search_index()
+    db.insert_students([{
+        'student_id': '69000099', 'prefix': 'นาย', 'first_name': 'ค้นหาเจอ', 'last_name': 'ทดสอบ',
+        'birth_date': '2005-01-01', 'current_school': 'Test School', 'email': 'search@example.com',
+        'program_code': '12345678'
+    }])
+    db.resume_student_search_index()
+    assert ids(db.search_students('ค้นหาเจอ')) == ['69000099']
+    assert ids(db.search_students('ค้นหาเจอ')) == ids(like_search(db, 'ค้นหาเจอ', '', 'name'))
+
+def test_limit(db):
+    assert ids(db.search_students('', '', 'name', limit=3)) == ids(db.search_students())[:3]
@@ -0,0 +1,36 @@
+# tests/test_subject_eligibility.py
+import pytest
+
+from controllers.student_controller import StudentController
+
+STUDENTS = ['69000001', '69000002', '69000003', '69000004', '69000006']
+
+@pytest.mark.parametrize('student_id', STUDENTS)
+def test_batched_status_matches_per_subject_check(db, student_id):
+    for subject in db.get_available_subjects_with_eligibility(student_id):
+        assert (subject['can_register'], subject['prerequisite_status']) == \
+            db.check_prerequisite(student_id, subject['subject_code'])
+
+@pytest.mark.parametrize('student_id', STUDENTS)
+def test_available_subjects_are_the_unregistered_program_subjects(db, student_id):
+    registered = {row['subject_code'] for row in db.get_student_registered_subjects(student_id)}
+    available = [subject['subject_code'] for subject in db.get_available_subjects_with_eligibility(student_id)]
+    assert available == [subject['subject_code'] for subject in db.get_available_subjects_for_student(student_id)]
+    assert not registered & set(available)
+
+def test_passing_a_prerequisite_unlocks_the_next_subject(db):
+    controller = StudentController(db)
+    status = {s['subject_code']: s['can_register'] for s in controller.get_available_subjects('69000004')}
+    assert status['05500101'] and not status['05500102']
+
+    assert controller.register_for_subject('69000004', '05500101')[0]
+    # Registered but still in progress: not passed yet
+    status = {s['subject_code']: s['can_register'] for s in controller.get_available_subjects('69000004')}
+    assert '05500101' not in status and not status['05500102']
+
+    assert db.update_grade('69000004', '05500101', 'C')
+    status = {s['subject_code']: s['can_register'] for s in controller.get_available_subjects('69000004')}
+    assert status['05500102']
+
+def test_unknown_student_has_no_available_subjects(db):
+    assert db.get_available_subjects_with_eligibility('00000000') == []
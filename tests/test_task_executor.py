@@ -0,0 +1,111 @@
+# tests/test_task_executor.py
+import threading
+
+import pytest
+
+from tests.fake_tk import FakeTkRoot
+from views.task_executor import TkTaskExecutor
+
+@pytest.fixture
+def root():
+    return FakeTkRoot()
+
+@pytest.fixture
+def executor(root):
+    executor = TkTaskExecutor(root, max_workers=2, poll_ms=5)
+    yield executor
+    executor.shutdown()
+
+def test_work_runs_on_a_worker_and_results_on_the_tk_thread(root, executor):
+    results = []
+    executor.submit(lambda: threading.get_ident(),
+                    on_result=lambda worker: results.append((worker, threading.get_ident())))
+    assert root.run_until(lambda: results)
+    worker, callback = results[0]
+    assert worker != threading.get_ident() and callback == threading.get_ident()
+
+def test_errors_go_to_on_error_or_to_tk(root, executor):
+    errors = []
+    executor.submit(lambda: 1 / 0, on_error=errors.append)
+    executor.submit(lambda: [][0])
+    assert root.run_until(lambda: errors and root.reported)
+    assert isinstance(errors[0], ZeroDivisionError)
+    assert isinstance(root.reported[0], IndexError)
+
+def test_failing_callback_does_not_stop_the_others(root, executor):
+    results = []
+    executor.submit(lambda: 1, on_result=lambda value: 1 / 0)
+    executor.submit(lambda: 2, on_result=results.append)
+    assert root.run_until(lambda: results and root.reported)
+    assert results == [2]
+
+def test_polling_stops_when_nothing_is_outstanding(root, executor):
+    done = []
+    executor.submit(lambda: None, on_result=done.append)
+    assert root.run_until(lambda: done)
+    root.run(0.02)
+    assert root.timers == {}
+
+def test_calls_from_a_task_arrive_before_its_result(root, executor):
+    order = []
+
+    def work():
+        executor.call_in_tk(order.append, ('progress', threading.get_ident() == tk_thread))
+        return 'done'
+
+    tk_thread = threading.get_ident()
+    executor.submit(work, on_result=order.append)
+    assert root.run_until(lambda: 'done' in order)
+    assert order == [('progress', False), 'done']
+
+    executor.call_in_tk(order.append, 'now')
+    assert order[-1] == 'now'
+
+def test_cancelled_task_delivers_nothing(root, executor):
+    release = threading.Event()
+    results = []
+    task = executor.submit(release.wait, 5, on_result=results.append)
+    task.cancel()
+    release.set()
+    root.run(0.05)
+    assert results == []
+
+def test_group_reports_busy_and_drops_results_after_close(root, executor):
+    busy, results = [], []
+    group = executor.group(on_busy=busy.append)
+    release = threading.Event()
+
+    group.submit(release.wait, 5, on_result=results.append)
+    group.submit(release.wait, 5, on_result=results.append)
+    assert busy == [True] and group.busy
+    release.set()
+    assert root.run_until(lambda: not group.busy)
+    assert busy == [True, False] and results == [True, True]
+
+    release.clear()
+
+    def late():
+        group.call_in_tk(results.append, 'late')
+        return release.wait(5)
+
+    group.submit(late, on_result=results.append)
+    group.close()
+    release.set()
+    root.run(0.05)
+    assert results == [True, True]
+    assert busy == [True, False, True]
+    assert group.submit(lambda: None) is None
+
+def test_group_errors_go_to_the_group_handler(root, executor):
+    errors = []
+    group = executor.group(on_error=errors.append)
+    group.submit(lambda: 1 / 0)
+    assert root.run_until(lambda: errors)
+    group.report_error(ValueError('page failed'))
+    assert [type(error) for error in errors] == [ZeroDivisionError, ValueError]
+
+def test_shared_executor_is_one_per_window(root):
+    executor = TkTaskExecutor.shared(root)
+    assert TkTaskExecutor.shared(root) is executor
+    executor.shutdown()
+    assert executor.submit(lambda: None) is None
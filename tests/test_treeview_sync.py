@@ -0,0 +1,83 @@
+# tests/test_treeview_sync.py
+import random
+
+from views.treeview_sync import TreeviewSync
+from tests.fake_tk import FakeTreeview
+
+def subject(code, name, seats=0):
+    return {'subject_code': code, 'subject_name': name, 'seats': seats}
+
+def make_sync():
+    tree = FakeTreeview(columns=('code', 'name', 'seats'))
+    sync = TreeviewSync(tree, lambda row: row['subject_code'],
+                        lambda row: (row['subject_code'], row['subject_name'], row['seats']))
+    return tree, sync
+
+ROWS = [subject('05500101', 'Intro'), subject('05500102', 'Programming'), subject('90690101', 'English')]
+
+def test_refreshing_the_same_rows_touches_nothing():
+    tree, sync = make_sync()
+    assert sync.sync(ROWS) == {'inserted': 3, 'updated': 0, 'deleted': 0, 'moved': 0}
+    tree.calls.clear()
+    assert sync.sync([dict(row) for row in ROWS]) == {'inserted': 0, 'updated': 0, 'deleted': 0, 'moved': 0}
+    assert tree.calls == []
+
+def test_only_changed_rows_are_written():
+    tree, sync = make_sync()
+    sync.sync(ROWS)
+    tree.calls.clear()
+
+    rows = [ROWS[0], subject('05500102', 'Programming', seats=5), subject('90690201', 'Thai')]
+    assert sync.sync(rows) == {'inserted': 1, 'updated': 1, 'deleted': 1, 'moved': 0}
+    assert tree.calls == [('delete', '90690101'), ('item', '05500102'), ('insert', '90690201')]
+    assert tree.order == ['05500101', '05500102', '90690201']
+    # Codes stay strings, leading zeros and all
+    assert sync.values('05500101') == ('05500101', 'Intro', 0)
+
+def test_reordering_moves_from_the_first_difference():
+    tree, sync = make_sync()
+    sync.sync(ROWS)
+    tree.calls.clear()
+    counts = sync.sync([ROWS[0], ROWS[2], ROWS[1]])
+    assert counts['moved'] == 2
+    assert tree.order == ['05500101', '90690101', '05500102']
+    assert ('move', '05500101') not in tree.calls
+
+def test_scroll_position_is_kept_unless_asked_otherwise():
+    tree, sync = make_sync()
+    sync.sync(ROWS)
+    tree.first_visible = 0.4
+    sync.sync(ROWS[1:])
+    assert tree.first_visible == 0.4
+    sync.sync(ROWS, keep_position=False)
+    assert tree.first_visible == 0.0
+
+def test_append_update_remove_and_set_cell():
+    tree, sync = make_sync()
+    sync.append(ROWS[:2])
+    sync.append([subject('05500102', 'Programming I'), ROWS[2]])
+    assert tree.order == [row['subject_code'] for row in ROWS]
+    assert tree.rows['05500102'][1] == 'Programming I'
+
+    assert sync.update([subject('90690101', 'English', 9), subject('99999999', 'Missing')]) == 1
+    assert tree.rows['90690101'][2] == 9
+
+    sync.set_cell('05500101', 'seats', 7)
+    assert tree.rows['05500101'] == ('05500101', 'Intro', 7)
+    # The next sync puts back what the rows say
+    assert sync.sync(ROWS)['updated'] == 3
+
+    assert sync.remove('05500101', '99999999') == 1
+    assert '05500101' not in sync and len(sync) == 2
+    sync.clear()
+    assert tree.order == [] and len(sync) == 0
+
+def test_random_refreshes_end_up_showing_the_rows():
+    rng = random.Random(7)
+    tree, sync = make_sync()
+    codes = [f"0550{i:04d}" for i in range(30)]
+    for _ in range(200):
+        rows = [subject(code, f"name {rng.randint(0, 2)}") for code in rng.sample(codes, rng.randint(0, 30))]
+        sync.sync(rows)
+        assert tree.order == [row['subject_code'] for row in rows]
+        assert all(tree.rows[row['subject_code']][1] == row['subject_name'] for row in rows)
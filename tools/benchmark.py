@@ -0,0 +1,326 @@
+# tools/benchmark.py
+"""
+Time every public DatabaseManager and controller method against generated
+databases of increasing size, and report peak Python memory per call.
+
+    python -m tools.benchmark --scales 1k,10k,100k --output bench.json
+    python -m tools.benchmark --scales 1k,10k --baseline bench.json
+
+Arguments are filled in by parameter name from the generated data (see
+BenchmarkContext.argument), so new methods are picked up automatically; a
+method with a parameter the context does not know is reported as uncovered.
+A case that raises is recorded with its error. With --baseline, a case whose
+median time or peak memory grew by more than --tolerance is reported as a
+regression. Uncovered methods, errors and regressions make the exit status 1.
+
+Generated databases are kept in --data-dir and copied before each run,
+because the benchmarks write to them. Peak memory comes from tracemalloc and
+covers Python allocations only, not SQLite's page cache.
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+from controllers.admin_controller import AdminController
+from controllers.auth_controller import AuthController
+from controllers.student_controller import StudentController
+from models.database_manager import DatabaseManager
+from models.dataset_generator import DatasetGenerator
+from tools.generate_dataset import parse_count
+
+# Methods not worth timing, with the reason
+SKIPPED = {
+    'DatabaseManager.get_connection': "returns the thread's connection",
+    'DatabaseManager.close_connection': "closes the pool the benchmark runs on",
+    'DatabaseManager.create_tables': "one-off schema setup",
+    'DatabaseManager.migrate': "one-off schema setup",
+    'DatabaseManager.insert_sample_data': "does nothing on a populated database",
+    'DatabaseManager.create_student_search_index': "one-off schema setup",
+    'DatabaseManager.suspend_student_search_index': "drops triggers other benchmarks rely on",
+    'DatabaseManager.resume_student_search_index': "pairs with suspend_student_search_index",
+    'DatabaseManager.suspend_academic_summary': "drops triggers other benchmarks rely on",
+    'DatabaseManager.resume_academic_summary': "pairs with suspend_academic_summary",
+    'DatabaseManager.enable_registration_counters': "changes how statistics are computed for later cases",
+    'DatabaseManager.iter_query': "generic helper behind the iter_* methods",
+}
+
+# Extra argument sets for methods whose cost depends on them
+VARIANTS = {
+    'DatabaseManager.search_students': [
+        {'search_term': 'สม'},
+        {'search_term': '', 'sort_by': 'age'},
+        {'search_term': 'สมชาย', 'sort_by': 'relevance'},
+    ],
+    'DatabaseManager.search_students_page': [
+        {'search_term': '', 'sort_by': 'age'},
+        {'search_term': 'สมชาย', 'sort_by': 'relevance'},
+    ],
+}
+
+REGISTRATION_METHODS = {'register_subject', 'try_register_subject', 'register_for_subject', 'try_register_for_subject'}
+
+class BenchmarkContext:
+    """Sample arguments drawn from the generated database"""
+    def __init__(self, db_manager: DatabaseManager, auth_controller: AuthController):
+        self.db_manager = db_manager
+        self.auth_controller = auth_controller
+        conn = db_manager.get_connection()
+
+        total = conn.execute("SELECT COUNT(*) FROM Students").fetchone()[0]
+        step = max(1, total // 200)
+        self.student_ids = [row[0] for row in conn.execute(
+            "SELECT student_id FROM Students ORDER BY student_id"
+        ).fetchall()[::step]]
+        self.emails = [row[0] for row in conn.execute(
+            "SELECT email FROM Students ORDER BY student_id LIMIT 500"
+        )]
+        self.subject_code = conn.execute("""
+            SELECT subject_code FROM RegisteredSubject
+            GROUP BY subject_code ORDER BY COUNT(*) DESC, subject_code LIMIT 1
+        """).fetchone()[0]
+        self.roster = [row[0] for row in conn.execute(
+            "SELECT student_id FROM RegisteredSubject WHERE subject_code = ? ORDER BY student_id LIMIT 100",
+            (self.subject_code,)
+        )]
+        self.program_code = conn.execute("""
+            SELECT program_code FROM Students GROUP BY program_code ORDER BY COUNT(*) DESC LIMIT 1
+        """).fetchone()[0]
+        self.sample_student = db_manager.get_student_by_id(self.student_ids[0])
+        self._new_students = 0
+
+    def argument(self, method: str, name: str, i: int):
+        """The value for parameter `name` of `method` in repeat `i`; raises KeyError when unknown"""
+        student_id = self.student_ids[i % len(self.student_ids)]
+        if name == 'subject_code' and method in REGISTRATION_METHODS:
+            return self.available_subject(student_id)
+        if name == 'token':
+            return self.auth_controller.login(student_id, 'password123').token
+        if name == 'students':
+            return self.new_students(100)
+
+        values = {
+            'student_id': student_id,
+            'username': student_id,
+            'password': 'password123',
+            'subject_code': self.subject_code,
+            'grade': 'B',
+            'grades': [(roster_id, 'B') for roster_id in self.roster],
+            'search_term': 'สมชาย',
+            'school_filter': '',
+            'sort_by': 'name',
+            'program_code': self.program_code,
+            'student_ids': self.student_ids[:500],
+            'emails': self.emails,
+            'capacity': None,
+            'student': self.sample_student,
+        }
+        return values[name]
+
+    def available_subject(self, student_id: str) -> str:
+        # Registration benchmarks should take the full path, not stop at "already registered"
+        for subject in self.db_manager.get_available_subjects_with_eligibility(student_id):
+            if subject['can_register']:
+                return subject['subject_code']
+        return self.subject_code
+
+    def new_students(self, count: int) -> List[Dict]:
+        students = []
+        for _ in range(count):
+            self._new_students += 1
+            student_id = f"B{self._new_students:07d}"
+            students.append({
+                'student_id': student_id, 'prefix': 'นาย', 'first_name': 'Bench', 'last_name': student_id,
+                'birth_date': '2005-01-01', 'current_school': 'Bench School',
+                'email': f"{student_id}@bench.test", 'program_code': self.program_code, 'password': ''
+            })
+        return students
+
+def public_methods(target) -> List[Tuple[str, Callable]]:
+    cls = type(target)
+    return [(f"{cls.__name__}.{name}", getattr(target, name)) for name in sorted(dir(cls))
+            if not name.startswith('_') and callable(getattr(cls, name))]
+
+def consume(result) -> Optional[int]:
+    # Generators do their work while being read; the row count is reported either way
+    if inspect.isgenerator(result) or hasattr(result, '__next__'):
+        return sum(1 for _ in result)
+    if isinstance(result, (list, tuple, set, dict)):
+        return len(result)
+    return None
+
+def build_cases(targets, context: BenchmarkContext) -> Tuple[List, List[str]]:
+    cases, uncovered = [], []
+    for target in targets:
+        for name, method in public_methods(target):
+            if name in SKIPPED:
+                continue
+            method_name = name.split('.', 1)[1]
+            required = [p.name for p in inspect.signature(method).parameters.values()
+                        if p.default is inspect.Parameter.empty
+                        and p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)]
+            try:
+                for parameter in required:
+                    context.argument(method_name, parameter, 0)
+            except KeyError as error:
+                uncovered.append(f"{name}: no sample value for {error}")
+                continue
+
+            for overrides in [{}] + VARIANTS.get(name, []):
+                label = name + ''.join(f" {key}={value!r}" for key, value in overrides.items())
+
+                def make_args(i, method_name=method_name, required=required, overrides=overrides):
+                    kwargs = {parameter: context.argument(method_name, parameter, i) for parameter in required}
+                    kwargs.update(overrides)
+                    return kwargs
+
+                cases.append((label, method, make_args))
+    return cases, uncovered
+
+def run_case(method: Callable, make_args: Callable, repeat: int, max_seconds: float) -> Dict:
+    timings = []
+    rows = None
+    spent = 0.0
+    i = 0
+    while i < repeat and (i == 0 or spent < max_seconds):
+        kwargs = make_args(i)
+        started = time.perf_counter()
+        rows = consume(method(**kwargs))
+        elapsed = time.perf_counter() - started
+        timings.append(elapsed)
+        spent += elapsed
+        i += 1
+
+    # One more run under tracemalloc, which slows Python down too much to time with
+    kwargs = make_args(i)
+    tracemalloc.start()
+    try:
+        consume(method(**kwargs))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'runs': len(timings),
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'min_ms': round(min(timings) * 1000, 3),
+        'peak_kb': round(peak / 1024, 1),
+        'rows': rows
+    }
+
+def prepare_database(data_dir: str, work_dir: str, students: int, seed: int) -> Tuple[str, Optional[float]]:
+    """Copy of the generated database for `students`, generating it on first use"""
+    pristine = os.path.join(data_dir, f"bench_{students}_seed{seed}.db")
+    generate_seconds = None
+    if not os.path.exists(pristine):
+        started = time.perf_counter()
+        db_manager = DatabaseManager(pristine + ".partial")
+        db_manager.create_tables()
+        DatasetGenerator(db_manager, seed=seed).generate(students)
+        with db_manager.pool.writer() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        db_manager.close_connection()
+        os.replace(pristine + ".partial", pristine)
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(pristine + ".partial" + suffix):
+                os.remove(pristine + ".partial" + suffix)
+        generate_seconds = round(time.perf_counter() - started, 3)
+
+    working = os.path.join(work_dir, f"bench_{students}.db")
+    shutil.copyfile(pristine, working)
+    return working, generate_seconds
+
+def run_scale(db_path: str, repeat: int, max_seconds: float) -> Dict:
+    db_manager = DatabaseManager(db_path)
+    db_manager.create_tables()
+    auth_controller = AuthController(db_manager)
+    targets = [db_manager, StudentController(db_manager), AdminController(db_manager), auth_controller]
+    context = BenchmarkContext(db_manager, auth_controller)
+
+    cases, uncovered = build_cases(targets, context)
+    results = {}
+    for label, method, make_args in cases:
+        try:
+            results[label] = run_case(method, make_args, repeat, max_seconds)
+        except Exception as error:
+            results[label] = {'error': f"{type(error).__name__}: {error}"}
+    db_manager.close_connection()
+    return {'cases': results, 'uncovered': uncovered}
+
+def compare(report: Dict, baseline: Dict, tolerance: float, min_delta_ms: float,
+            min_delta_kb: float) -> List[str]:
+    regressions = []
+    for scale, current in report['scales'].items():
+        previous = baseline.get('scales', {}).get(scale)
+        if not previous:
+            continue
+        for label, result in current['cases'].items():
+            before = previous['cases'].get(label)
+            if not before or 'error' in result or 'error' in before:
+                continue
+            slower = result['median_ms'] - before['median_ms']
+            if slower > min_delta_ms and result['median_ms'] > before['median_ms'] * (1 + tolerance):
+                regressions.append(f"{scale} {label}: {before['median_ms']}ms -> {result['median_ms']}ms")
+            bigger = result['peak_kb'] - before['peak_kb']
+            if bigger > min_delta_kb and result['peak_kb'] > before['peak_kb'] * (1 + tolerance):
+                regressions.append(f"{scale} {label}: {before['peak_kb']}KB -> {result['peak_kb']}KB peak")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseManager and controller methods")
+    parser.add_argument('--scales', default="1k,10k", help="Comma-separated student counts, e.g. 1k,100k,1m")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case")
+    parser.add_argument('--max-seconds', type=float, default=2.0,
+                        help="Stop repeating a case once its runs took this long")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), "student_registration_bench"),
+                        help="Where generated databases are kept between runs")
+    parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+    parser.add_argument('--baseline', help="Earlier report to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    parser.add_argument('--min-delta-kb', type=float, default=256.0, help="Ignore memory growth smaller than this")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    report = {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'seed': args.seed,
+        'scales': {}
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scale in args.scales.split(','):
+            students = parse_count(scale)
+            db_path, generate_seconds = prepare_database(args.data_dir, work_dir, students, args.seed)
+            result = run_scale(db_path, args.repeat, args.max_seconds)
+            if generate_seconds is not None:
+                result['generate_seconds'] = generate_seconds
+            report['scales'][str(students)] = result
+
+    problems = [f"{scale} {line}" for scale, result in report['scales'].items() for line in result['uncovered']]
+    problems += [f"{scale} {label}: {case['error']}" for scale, result in report['scales'].items()
+                 for label, case in result['cases'].items() if 'error' in case]
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['regressions'] = compare(report, baseline, args.tolerance, args.min_delta_ms, args.min_delta_kb)
+        problems += report['regressions']
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,218 @@
+# tools/check_query_plans.py
+"""
+Run every DatabaseManager query against the sample data and check its
+EXPLAIN QUERY PLAN for full table scans that no index serves.
+
+    python -m tools.check_query_plans
+    python -m tools.check_query_plans --verbose
+
+Any plan step that reads a whole table counts as a scan, including a walk
+of an index ("SCAN t USING INDEX ..."). Exits with 1 when a query scans a
+table that ALLOWED_SCANS does not list for its call, or when a public
+DatabaseManager method is neither exercised nor listed in SKIPPED.
+"""
+import argparse
+import os
+import re
+import tempfile
+from typing import Dict, List, Set, Tuple
+from models.database_manager import DatabaseManager
+
+# Methods called with sample arguments; every SQL statement they run is checked
+CALLS = [
+    ('get_student_by_id', ('69000001',)),
+    ('get_all_students', ()),
+    ('authenticate_student', ('69000001', 'password123')),
+    ('authenticate_admin', ('admin', 'admin123')),
+    ('get_login_candidates', ('admin',)),
+    ('get_available_subjects_for_student', ('69000001',)),
+    ('get_student_registered_subjects', ('69000001',)),
+    ('get_academic_summary', ('69000001',)),
+    ('verify_academic_summary', ()),
+    ('get_available_subjects_with_eligibility', ('69000001',)),
+    ('check_prerequisite', ('69000001', '05500102')),
+    ('get_prerequisite_ancestors', ('05500301',)),
+    ('get_prerequisite_descendants', ('05500101',)),
+    ('get_missing_prerequisites', ('69000001', '05500301')),
+    ('set_subject_capacity', ('05500101', 40)),
+    ('try_register_subject', ('69000011', '05500101')),
+    ('register_subject', ('69000011', '90690101')),
+    ('get_subject_seats', ('05500101',)),
+    ('get_subject_registrations', ('05500101',)),
+    ('update_grade', ('69000011', '05500101', 'A')),
+    ('update_grades', ('05500101', [('69000001', 'A')])),
+    ('get_all_subjects', ()),
+    ('search_students', ('สม', '', 'name')),
+    ('search_students', ('สมชาย', '', 'relevance')),
+    ('search_students', ('', '', 'age')),
+    ('search_students_page', ('', '', 'name')),
+    ('search_students_page', ('', '', 'age')),
+    ('search_students_page', ('', '', 'name', ('ก', 'ก', '0'))),
+    ('search_students_page', ('', '', 'age', ('2008-01-01', '0'))),
+    ('get_schools', ()),
+    ('get_programs', ()),
+    ('get_program', ('12345678',)),
+    ('get_program_subjects', ('12345678',)),
+    ('iter_all_students', ()),
+    ('iter_subject_registrations', ('05500101',)),
+    ('iter_student_transcript', ('69000001',)),
+    ('iter_transcripts', ()),
+    ('get_program_codes', ()),
+    ('find_existing_students', (['69000001'], ['nobody@example.com'])),
+    ('get_subject_grade_counts', ()),
+    ('get_program_statistics', ()),
+    ('get_registration_statistics', ()),
+]
+
+# Public methods that run no query of their own worth planning
+SKIPPED = {
+    'get_connection', 'close_connection', 'get_pool_metrics', 'get_cache_stats', 'get_schema_version',
+    'create_tables', 'migrate', 'create_student_search_index', 'suspend_student_search_index',
+    'resume_student_search_index', 'rebuild_student_search_index', 'student_search_enabled',
+    'insert_sample_data', 'enable_registration_counters', 'registration_counters_enabled',
+    'program_counters_enabled',
+    'student_page_key', 'iter_query', 'insert_students', 'rebuild_prerequisite_closure',
+    'rebuild_academic_summary', 'suspend_academic_summary', 'resume_academic_summary',
+    'get_query_stats', 'get_slow_queries', 'reset_query_stats', 'ensure_schema',
+}
+
+# Calls whose full scans are the point of the query, keyed by method name or by
+# (method, args) for a single call. Tables are named as the plan names them,
+# by their alias when the query gives one; scans of any other table still fail.
+ALLOWED_SCANS = {
+    'get_all_students': ({'s'}, "lists every student"),
+    'iter_all_students': ({'s'}, "exports every student"),
+    'iter_transcripts': ({'rs'}, "exports every registration"),
+    'get_all_subjects': ({'Subjects'}, "lists the whole subject catalog"),
+    'get_programs': ({'Programs'}, "lists the whole program catalog"),
+    'get_program_codes': ({'Programs'}, "lists the whole program catalog"),
+    'get_schools': ({'Students'}, "lists every school once; the catalog cache keeps it"),
+    'get_subject_grade_counts': ({'RegisteredSubject'}, "aggregates every registration"),
+    'get_program_statistics': ({'Students', 's', 'p'}, "aggregates every student"),
+    'get_registration_statistics': ({'Subjects', 'Students', 'RegisteredSubject', 's', 'p'},
+                                    "aggregates every registration"),
+    'verify_academic_summary': ({'rs', 'e', 'a'}, "recomputes every student's totals"),
+    # Terms shorter than the trigram index can match fall back to LIKE
+    ('search_students', ('สม', '', 'name')): ({'s'}, "short search terms use LIKE '%term%'"),
+    ('search_students', ('', '', 'age')): ({'s'}, "an empty search lists every student"),
+    # A first page walks the sort index only until the page is full
+    ('search_students_page', ('', '', 'name')): ({'s'}, "first page, stopped by LIMIT"),
+    ('search_students_page', ('', '', 'age')): ({'s'}, "first page, stopped by LIMIT"),
+}
+
+# Looking a table up in the schema catalog is cheap whatever its plan says, and
+# FTS5 reads its one-row config table whenever it opens the index
+CATALOG_TABLES = {'sqlite_master', 'sqlite_schema', 'StudentSearch_config'}
+
+# "SCAN t", "SCAN t USING [COVERING] INDEX i" and, before SQLite 3.36, "SCAN TABLE t AS alias";
+# a schema prefix is dropped. SCAN CONSTANT ROW reads no table, and a virtual
+# table's own index decides what it reads.
+SCAN = re.compile(r'^SCAN (?:TABLE )?(?:\w+\.)?(\w+)(?: AS (\w+))?(.*)$')
+
+def public_methods() -> List[str]:
+    return sorted(name for name in dir(DatabaseManager)
+                  if not name.startswith('_') and callable(getattr(DatabaseManager, name)))
+
+def capture_statements(db_manager: DatabaseManager, name: str, args: Tuple) -> List[str]:
+    statements = []
+
+    def trace(sql):
+        # Statements run by triggers are reported with a leading comment
+        if not sql.lstrip().startswith('--'):
+            statements.append(sql)
+
+    # Start cold so cached catalog reads still run their query
+    db_manager.catalog_cache.invalidate()
+    with db_manager.pool.writer() as writer:
+        reader = db_manager.get_connection()
+        for conn in {id(writer): writer, id(reader): reader}.values():
+            conn.set_trace_callback(trace)
+        try:
+            result = getattr(db_manager, name)(*args)
+            # Generators only run their query when consumed
+            if hasattr(result, '__next__'):
+                for _ in result:
+                    pass
+        finally:
+            for conn in (writer, reader):
+                conn.set_trace_callback(None)
+    return statements
+
+def explain(db_manager: DatabaseManager, sql: str) -> List[str]:
+    conn = db_manager.get_connection()
+    return [row['detail'] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+
+def is_plannable(sql: str) -> bool:
+    return sql.lstrip().split(None, 1)[0].upper() in ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+
+def scanned_tables(plan: List[str]) -> List[str]:
+    tables = []
+    for detail in plan:
+        match = SCAN.match(detail)
+        if not match or detail == 'SCAN CONSTANT ROW' or 'VIRTUAL TABLE' in match.group(3):
+            continue
+        if match.group(1) not in CATALOG_TABLES:
+            tables.append(match.group(2) or match.group(1))
+    return tables
+
+def allowed_scans(name: str, args: Tuple) -> Tuple[Set[str], str]:
+    for key, allowed in ALLOWED_SCANS.items():
+        if key == (name, args) or key == name:
+            return allowed
+    return set(), ""
+
+def check(db_manager: DatabaseManager, verbose: bool = False) -> Dict:
+    report = {'checked': 0, 'problems': [], 'allowed': []}
+
+    uncovered = set(public_methods()) - SKIPPED - {name for name, _ in CALLS}
+    for name in sorted(uncovered):
+        report['problems'].append(f"{name}: not exercised by check_query_plans")
+
+    for name, args in CALLS:
+        for sql in capture_statements(db_manager, name, args):
+            if not is_plannable(sql):
+                continue
+            report['checked'] += 1
+            plan = explain(db_manager, sql)
+            scans = scanned_tables(plan)
+            if verbose:
+                print(f"{name}: {' '.join(sql.split())}")
+                for detail in plan:
+                    print(f"    {detail}")
+            if not scans:
+                continue
+            statement = ' '.join(sql.split())[:120]
+            tables, reason = allowed_scans(name, args)
+            allowed = [table for table in scans if table in tables]
+            if allowed:
+                report['allowed'].append(f"{name}: full scan of {', '.join(allowed)} in {statement} ({reason})")
+            unexpected = [table for table in scans if table not in tables]
+            if unexpected:
+                report['problems'].append(f"{name}: full scan of {', '.join(unexpected)} in {statement}")
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check query plans for unindexed table scans")
+    parser.add_argument('--verbose', action='store_true', help="Print every statement and its plan")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "plans.db"))
+        db_manager.create_tables()
+        # No ANALYZE: on the tiny sample tables the planner would rightly prefer
+        # scans, while its default estimates resemble a full-size database
+        db_manager.insert_sample_data()
+        try:
+            report = check(db_manager, verbose=args.verbose)
+        finally:
+            db_manager.close_connection()
+
+    for line in report['allowed']:
+        print(f"allowed  {line}")
+    for line in report['problems']:
+        print(f"PROBLEM  {line}")
+    print(f"{report['checked']} statements checked, {len(report['problems'])} problems")
+    return 1 if report['problems'] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
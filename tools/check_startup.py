@@ -0,0 +1,65 @@
+# tools/check_startup.py
+"""
+Launch the desktop app, wait for the first interactive frame of the login
+screen, close it, and report the startup phase timings. Exits 1 when a warm
+start (schema already set up) takes longer than the budget.
+
+    python -m tools.check_startup
+    python -m tools.check_startup --db student_registration.db --mode production --runs 5
+
+Needs a display; on a headless machine run it under xvfb-run.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tkinter as tk
+from Main import MainApplication, STARTUP_BUDGET_MS
+
+def launch(db_path: str, mode: str) -> dict:
+    started = time.perf_counter()
+
+    def close(app):
+        app.root.after_idle(app.root.destroy)
+
+    app = MainApplication(db_path=db_path, mode=mode, started=started, on_ready=close)
+    app.run()
+    app.db_manager.close_connection()
+    return {'interactive_ms': app.time_to_interactive_ms, 'phases': app.startup_timings}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure time to the first interactive frame")
+    parser.add_argument('--db', help="Database to start against (default: a new temporary one)")
+    parser.add_argument('--mode', choices=['development', 'production'], default='development')
+    parser.add_argument('--runs', type=int, default=3, help="Warm starts to measure")
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    try:
+        tk.Tk().destroy()
+    except tk.TclError as error:
+        print(f"cannot open a window: {error}", file=sys.stderr)
+        return 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "startup.db")
+        # The first launch may run the schema setup; the rest should skip it
+        first = launch(db_path, args.mode)
+        warm = [launch(db_path, args.mode) for _ in range(max(1, args.runs))]
+
+    median_ms = statistics.median(run['interactive_ms'] for run in warm)
+    report = {
+        'budget_ms': args.budget_ms,
+        'first_start': first,
+        'warm_starts': warm,
+        'warm_median_ms': median_ms,
+        'within_budget': median_ms <= args.budget_ms
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if report['within_budget'] else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,50 @@
+# tools/export_data.py
+"""
+Stream rosters and transcripts to CSV or JSONL.
+
+    python -m tools.export_data students --format csv --output students.csv
+    python -m tools.export_data roster 05500101
+    python -m tools.export_data transcript 69000001 --format jsonl
+    python -m tools.export_data transcripts --output transcripts.jsonl --format jsonl
+"""
+import argparse
+import sys
+from models.database_manager import DatabaseManager
+from models.exporters import WRITERS
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export students, rosters and transcripts")
+    parser.add_argument('dataset', choices=['students', 'roster', 'transcript', 'transcripts'])
+    parser.add_argument('key', nargs='?', help="Subject code for roster, student id for transcript")
+    parser.add_argument('--db', default="student_registration.db", help="SQLite database file")
+    parser.add_argument('--format', choices=sorted(WRITERS), default='csv')
+    parser.add_argument('--output', help="Output file (default: stdout)")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Rows fetched from SQLite per batch")
+    args = parser.parse_args(argv)
+
+    if args.dataset in ('roster', 'transcript') and not args.key:
+        parser.error(f"{args.dataset} needs a {'subject code' if args.dataset == 'roster' else 'student id'}")
+
+    db_manager = DatabaseManager(args.db)
+    if args.dataset == 'students':
+        rows = db_manager.iter_all_students(args.batch_size)
+    elif args.dataset == 'roster':
+        rows = db_manager.iter_subject_registrations(args.key, args.batch_size)
+    elif args.dataset == 'transcript':
+        rows = db_manager.iter_student_transcript(args.key, args.batch_size)
+    else:
+        rows = db_manager.iter_transcripts(args.batch_size)
+
+    write = WRITERS[args.format]
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as output:
+            count = write(rows, output)
+    else:
+        count = write(rows, sys.stdout)
+
+    db_manager.close_connection()
+    print(f"exported {count} rows", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
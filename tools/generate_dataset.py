@@ -0,0 +1,50 @@
+# tools/generate_dataset.py
+"""
+Create a database filled with a deterministic synthetic intake.
+
+    python -m tools.generate_dataset bench_100k.db --students 100000
+    python -m tools.generate_dataset bench_1m.db --students 1000000 --seed 7
+"""
+import argparse
+import json
+import os
+import time
+from models.database_manager import DatabaseManager
+from models.dataset_generator import DatasetGenerator
+
+def parse_count(text: str) -> int:
+    # Accepts 1000, 100k or 1m
+    text = text.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic student registration database")
+    parser.add_argument('path', help="SQLite database file to create")
+    parser.add_argument('--students', type=parse_count, default=1000, help="Number of students, e.g. 1000, 100k, 1m")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--programs', type=int, default=12)
+    parser.add_argument('--schools', type=int, default=800)
+    parser.add_argument('--force', action='store_true', help="Replace the file if it exists")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.path):
+        if not args.force:
+            parser.error(f"{args.path} exists; use --force to replace it")
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(args.path + suffix):
+                os.remove(args.path + suffix)
+
+    started = time.perf_counter()
+    db_manager = DatabaseManager(args.path)
+    db_manager.create_tables()
+    counts = DatasetGenerator(db_manager, seed=args.seed, programs=args.programs,
+                              schools=args.schools).generate(args.students)
+    db_manager.close_connection()
+
+    counts['seconds'] = round(time.perf_counter() - started, 3)
+    print(json.dumps(counts, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,40 @@
+# tools/import_students.py
+"""
+Bulk-load students from a CSV or JSONL file.
+
+    python -m tools.import_students applicants.csv --report rejected.csv
+"""
+import argparse
+import json
+import time
+from models.database_manager import DatabaseManager
+from models.student_importer import StudentImporter
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import students from CSV or JSONL")
+    parser.add_argument('path', help="CSV file with a header row, or JSONL with one student per line")
+    parser.add_argument('--db', default="student_registration.db", help="SQLite database file")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="Input format (default: from file extension)")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="Rows written per transaction")
+    parser.add_argument('--report', help="Write rejected rows and reasons to this CSV file")
+    parser.add_argument('--keep-search-index', action='store_true',
+                        help="Update the search index per row instead of rebuilding it after the load")
+    args = parser.parse_args(argv)
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.create_tables()
+
+    started = time.perf_counter()
+    summary = StudentImporter(
+        db_manager, chunk_size=args.chunk_size, defer_search_index=not args.keep_search_index
+    ).import_file(
+        args.path, report_path=args.report, file_format=args.format
+    )
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    db_manager.close_connection()
+
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0 if summary['imported'] or not summary['rejected'] else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,264 @@
+# tools/load_test.py
+"""
+Registration-day load generator. Simulated students log in, look at the
+subjects open to them and register, with think time between steps, against
+the controllers directly.
+
+    python -m tools.load_test --students 200 --concurrency 50 --ops-per-student 20
+    python -m tools.load_test --mode processes --concurrency 8 --think-ms 50 --output run.json
+
+Operations are drawn from a seeded mix, so two runs with the same arguments
+issue the same requests. Prints (or writes) a JSON report with throughput,
+p50/p95/p99 latency, SQLITE_BUSY counts and error rates per operation.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from controllers.auth_controller import AuthController
+from controllers.student_controller import StudentController
+from models.database_manager import DatabaseManager
+
+OPERATIONS = ('authenticate', 'get_available_subjects', 'register_subject')
+DEFAULT_MIX = "authenticate=1,get_available_subjects=4,register_subject=2"
+LOAD_PROGRAMS = ('12345678', '12345679', '12345680')
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def prepare_database(db_path: str, students: int) -> List[str]:
+    db_manager = DatabaseManager(db_path)
+    db_manager.create_tables()
+    db_manager.insert_sample_data()
+
+    student_ids = [f"8{i:07d}" for i in range(students)]
+    taken_ids, _ = db_manager.find_existing_students(student_ids, [])
+    db_manager.insert_students([{
+        'student_id': student_id, 'prefix': 'นางสาว', 'first_name': 'Load', 'last_name': student_id,
+        'birth_date': '2005-06-01', 'current_school': 'Load Test School',
+        'email': f"{student_id}@load.test", 'program_code': LOAD_PROGRAMS[i % len(LOAD_PROGRAMS)]
+    } for i, student_id in enumerate(student_ids) if student_id not in taken_ids])
+    db_manager.close_connection()
+    return student_ids
+
+def is_busy(error: Exception) -> bool:
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is not None:
+        return code in (sqlite3.SQLITE_BUSY, getattr(sqlite3, 'SQLITE_LOCKED', 6))
+    message = str(error)
+    return 'locked' in message or 'busy' in message
+
+class SimulatedStudent:
+    """One student's session: a seeded sequence of operations with think time in between"""
+    def __init__(self, student_id: str, auth_controller: AuthController,
+                 student_controller: StudentController, rng: random.Random):
+        self.student_id = student_id
+        self.auth_controller = auth_controller
+        self.student_controller = student_controller
+        self.rng = rng
+        self.available = []
+
+    def authenticate(self):
+        self.auth_controller.authenticate(self.student_id, 'password123')
+
+    def get_available_subjects(self):
+        self.available = self.student_controller.get_available_subjects(self.student_id)
+
+    def register_subject(self) -> str:
+        choices = [subject['subject_code'] for subject in self.available if subject['can_register']]
+        if not choices:
+            self.get_available_subjects()
+            choices = [subject['subject_code'] for subject in self.available] or ['05500101']
+        subject_code = self.rng.choice(choices)
+        outcome, _ = self.student_controller.try_register_for_subject(self.student_id, subject_code)
+        self.available = [s for s in self.available if s['subject_code'] != subject_code]
+        return outcome
+
+def run_worker(db_path: Optional[str], db_manager: Optional[DatabaseManager], student_ids: List[str],
+               config: Dict) -> Dict:
+    """Run the given students one after another; returns raw latencies and counters"""
+    own_db = db_manager is None
+    if own_db:
+        db_manager = DatabaseManager(db_path, busy_timeout_ms=config['busy_timeout_ms'])
+    auth_controller = AuthController(db_manager)
+    student_controller = StudentController(db_manager)
+
+    names = list(config['mix'])
+    weights = [config['mix'][name] for name in names]
+    think_seconds = config['think_ms'] / 1000
+
+    latencies = defaultdict(list)
+    errors = Counter()
+    busy = Counter()
+    outcomes = Counter()
+    for student_id in student_ids:
+        rng = random.Random(f"{config['seed']}:{student_id}")
+        student = SimulatedStudent(student_id, auth_controller, student_controller, rng)
+        for _ in range(config['ops_per_student']):
+            if think_seconds:
+                time.sleep(rng.expovariate(1 / think_seconds))
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                result = getattr(student, name)()
+                if name == 'register_subject':
+                    outcomes[result] += 1
+            except Exception as error:
+                errors[name] += 1
+                if is_busy(error):
+                    busy[name] += 1
+            latencies[name].append(time.perf_counter() - started)
+
+    if own_db:
+        db_manager.close_connection()
+    return {'latencies': dict(latencies), 'errors': dict(errors), 'busy': dict(busy), 'outcomes': dict(outcomes)}
+
+def _process_worker(db_path, student_ids, config, start_event, results):
+    start_event.wait()
+    results.put(run_worker(db_path, None, student_ids, config))
+
+def run_threads(db_path: str, batches: List[List[str]], config: Dict) -> List[Dict]:
+    # Threads share one DatabaseManager, as the HTTP service does
+    db_manager = DatabaseManager(db_path, busy_timeout_ms=config['busy_timeout_ms'])
+    start = threading.Barrier(len(batches))
+    results = [None] * len(batches)
+
+    def work(index):
+        start.wait()
+        results[index] = run_worker(None, db_manager, batches[index], config)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(len(batches))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db_manager.close_connection()
+    return results
+
+def run_processes(db_path: str, batches: List[List[str]], config: Dict) -> List[Dict]:
+    start_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_process_worker,
+                                         args=(db_path, batch, config, start_event, results))
+                 for batch in batches]
+    for process in processes:
+        process.start()
+    start_event.set()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return collected
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize(results: List[Dict], seconds: float) -> Dict:
+    latencies = defaultdict(list)
+    errors, busy, outcomes = Counter(), Counter(), Counter()
+    for result in results:
+        for name, values in result['latencies'].items():
+            latencies[name].extend(values)
+        errors.update(result['errors'])
+        busy.update(result['busy'])
+        outcomes.update(result['outcomes'])
+
+    operations = {}
+    for name in OPERATIONS:
+        values = sorted(latencies.get(name, []))
+        if not values:
+            continue
+        operations[name] = {
+            'count': len(values),
+            'errors': errors[name],
+            'sqlite_busy': busy[name],
+            'error_rate': round(errors[name] / len(values), 6),
+            'throughput_per_second': round(len(values) / seconds, 1) if seconds else None,
+            'latency_ms': {
+                'mean': round(sum(values) / len(values) * 1000, 3),
+                'p50': round(percentile(values, 0.50) * 1000, 3),
+                'p95': round(percentile(values, 0.95) * 1000, 3),
+                'p99': round(percentile(values, 0.99) * 1000, 3),
+                'max': round(values[-1] * 1000, 3)
+            }
+        }
+
+    total = sum(op['count'] for op in operations.values())
+    return {
+        'seconds': round(seconds, 3),
+        'operations_total': total,
+        'throughput_per_second': round(total / seconds, 1) if seconds else None,
+        'errors_total': sum(errors.values()),
+        'sqlite_busy_total': sum(busy.values()),
+        'operations': operations,
+        'registration_outcomes': dict(outcomes)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Registration-day load generator")
+    parser.add_argument('--db', help="SQLite database file (default: a temporary file)")
+    parser.add_argument('--mode', choices=['threads', 'processes'], default='threads')
+    parser.add_argument('--students', type=int, default=200, help="Simulated students")
+    parser.add_argument('--concurrency', type=int, default=50, help="Students active at the same time")
+    parser.add_argument('--ops-per-student', type=int, default=20)
+    parser.add_argument('--think-ms', type=float, default=0,
+                        help="Mean think time between a student's operations (exponentially distributed)")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Relative weight of each operation")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--busy-timeout-ms', type=int, default=5000)
+    parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    config = {
+        'mix': parse_mix(args.mix),
+        'ops_per_student': args.ops_per_student,
+        'think_ms': args.think_ms,
+        'seed': args.seed,
+        'busy_timeout_ms': args.busy_timeout_ms
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "load.db")
+        student_ids = prepare_database(db_path, args.students)
+        workers = max(1, min(args.concurrency, len(student_ids)))
+        batches = [student_ids[i::workers] for i in range(workers)]
+
+        run = run_processes if args.mode == 'processes' else run_threads
+        started = time.perf_counter()
+        results = run(db_path, batches, config)
+        seconds = time.perf_counter() - started
+
+    report = {
+        'config': dict(config, mode=args.mode, students=len(student_ids), concurrency=workers),
+        **summarize(results, seconds)
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if report['errors_total'] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+# tools/rebuild_academic_summary.py
+"""
+Check the stored per-student GPA and credit totals against a full recompute
+from the registrations, and rebuild them when they differ.
+
+    python -m tools.rebuild_academic_summary
+    python -m tools.rebuild_academic_summary --check
+"""
+import argparse
+import json
+from models.database_manager import DatabaseManager
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify and rebuild StudentAcademicSummary")
+    parser.add_argument('--db', default="student_registration.db", help="SQLite database file")
+    parser.add_argument('--check', action='store_true', help="Only report differences, do not rebuild")
+    parser.add_argument('--force', action='store_true', help="Rebuild even when no differences are found")
+    args = parser.parse_args(argv)
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.create_tables()
+
+    mismatches = db_manager.verify_academic_summary()
+    summary = {'mismatches': len(mismatches), 'students': [m['student_id'] for m in mismatches[:20]],
+               'rebuilt': False}
+    if not args.check and (mismatches or args.force):
+        db_manager.rebuild_academic_summary()
+        summary['rebuilt'] = True
+        summary['mismatches_after_rebuild'] = len(db_manager.verify_academic_summary())
+    db_manager.close_connection()
+
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if args.check:
+        return 1 if mismatches else 0
+    return 1 if summary.get('mismatches_after_rebuild') else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
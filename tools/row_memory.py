@@ -0,0 +1,78 @@
+# tools/row_memory.py
+"""
+Per-row memory of the student list and a subject roster, as record objects
+(what DatabaseManager returns) and as the per-row dicts it used to return.
+
+    python -m tools.row_memory --students 100k
+
+Uses the generated databases of tools.benchmark (kept in --data-dir) and
+tracemalloc, so only Python allocations are counted.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from models.database_manager import DatabaseManager
+from tools.benchmark import prepare_database
+from tools.generate_dataset import parse_count
+
+def retained_bytes(build):
+    """Bytes still allocated by what build() returns, and the result"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before, result
+
+def measure(name, load) -> dict:
+    record_bytes, records = retained_bytes(load)
+    rows = len(records)
+    # The row objects alone, without the values they hold
+    container_bytes = (sys.getsizeof(records[0]), sys.getsizeof(records[0].to_dict())) if records else (None, None)
+    del records
+    # The same rows loaded again and turned into dicts, the way they were returned
+    # before; the records are freed once converted, so only the dicts remain
+    dict_bytes, _ = retained_bytes(lambda: [record.to_dict() for record in load()])
+    return {
+        'method': name,
+        'rows': rows,
+        'record_bytes_per_row': round(record_bytes / rows) if rows else None,
+        'dict_bytes_per_row': round(dict_bytes / rows) if rows else None,
+        'saved_percent': round(100 * (1 - record_bytes / dict_bytes), 1) if dict_bytes else None,
+        'record_object_bytes': container_bytes[0],
+        'dict_object_bytes': container_bytes[1]
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-row memory of record objects versus dicts")
+    parser.add_argument('--students', default="100k", help="Generated database size, e.g. 10k or 100k")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), "student_registration_bench"))
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_path, _ = prepare_database(args.data_dir, work_dir, parse_count(args.students), args.seed)
+        db_manager = DatabaseManager(db_path)
+        subject_code = db_manager.get_connection().execute("""
+            SELECT subject_code FROM RegisteredSubject
+            GROUP BY subject_code ORDER BY COUNT(*) DESC LIMIT 1
+        """).fetchone()[0]
+        report = [
+            measure('get_all_students', db_manager.get_all_students),
+            measure('get_subject_registrations', lambda: db_manager.get_subject_registrations(subject_code)),
+        ]
+        db_manager.close_connection()
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+# tools/stress_registration.py
+"""
+Registration-day stress test: many registrants race for the seats of one
+subject, each worker with its own DatabaseManager (its own SQLite connections),
+and the result is checked for overbooking.
+
+    python -m tools.stress_registration --registrants 500 --capacity 40 --workers 32
+    python -m tools.stress_registration --mode processes --workers 16
+
+Prints a JSON summary; exits with 1 if the subject ended up with more
+registrations than seats, if any attempt failed with an error (SQLITE_BUSY
+included), or if no registration was accepted at all, since a run in which
+nothing got through proves nothing about overbooking.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+from models.database_manager import DatabaseManager, REGISTERED
+
+STRESS_SUBJECT = '99999901'
+STRESS_PROGRAM = '12345678'
+# Outcomes of attempts that raised start with this, followed by the exception
+ERROR_PREFIX = 'error: '
+
+def prepare_database(db_path: str, registrants: int, capacity: int) -> List[str]:
+    db_manager = DatabaseManager(db_path)
+    db_manager.create_tables()
+    db_manager.insert_sample_data()
+
+    with db_manager.pool.writer() as conn:
+        conn.execute("DELETE FROM RegisteredSubject WHERE subject_code = ?", (STRESS_SUBJECT,))
+        conn.execute("""
+            INSERT OR REPLACE INTO Subjects (subject_code, subject_name, credits, instructor, prerequisite, capacity)
+            VALUES (?, 'Registration Stress Test', 3, 'stress', NULL, ?)
+        """, (STRESS_SUBJECT, capacity))
+
+    student_ids = [f"7{i:07d}" for i in range(registrants)]
+    taken_ids, _ = db_manager.find_existing_students(student_ids, [])
+    db_manager.insert_students([{
+        'student_id': student_id, 'prefix': 'นาย', 'first_name': 'Stress', 'last_name': student_id,
+        'birth_date': '2005-01-01', 'current_school': 'Stress School',
+        'email': f"{student_id}@stress.test", 'program_code': STRESS_PROGRAM
+    } for student_id in student_ids if student_id not in taken_ids])
+    db_manager.close_connection()
+    return student_ids
+
+def register_all(db_path: str, student_ids: List[str], busy_timeout_ms: int) -> Dict[str, int]:
+    """One worker: register each student in turn on a private DatabaseManager"""
+    db_manager = DatabaseManager(db_path, busy_timeout_ms=busy_timeout_ms)
+    outcomes = Counter()
+    for student_id in student_ids:
+        try:
+            outcome, _ = db_manager.try_register_subject(student_id, STRESS_SUBJECT)
+        except Exception as error:
+            outcome = f"{ERROR_PREFIX}{type(error).__name__}: {error}"
+        outcomes[outcome] += 1
+    db_manager.close_connection()
+    return dict(outcomes)
+
+def _process_worker(db_path, student_ids, busy_timeout_ms, start_event, results):
+    start_event.wait()
+    results.put(register_all(db_path, student_ids, busy_timeout_ms))
+
+def run_threads(db_path: str, batches: List[List[str]], busy_timeout_ms: int) -> List[Dict[str, int]]:
+    start = threading.Barrier(len(batches))
+    results = [None] * len(batches)
+
+    def work(index):
+        start.wait()
+        results[index] = register_all(db_path, batches[index], busy_timeout_ms)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(len(batches))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def run_processes(db_path: str, batches: List[List[str]], busy_timeout_ms: int) -> List[Dict[str, int]]:
+    start_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_process_worker,
+                                args=(db_path, batch, busy_timeout_ms, start_event, results))
+        for batch in batches
+    ]
+    for process in processes:
+        process.start()
+    start_event.set()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return collected
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent registration stress test")
+    parser.add_argument('--db', help="SQLite database file (default: a temporary file)")
+    parser.add_argument('--mode', choices=['threads', 'processes'], default='threads')
+    parser.add_argument('--registrants', type=int, default=500, help="Students competing for seats")
+    parser.add_argument('--capacity', type=int, default=50, help="Seats in the contested subject")
+    parser.add_argument('--workers', type=int, default=32, help="Concurrent threads or processes")
+    parser.add_argument('--busy-timeout-ms', type=int, default=30000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "stress.db")
+        student_ids = prepare_database(db_path, args.registrants, args.capacity)
+        workers = max(1, min(args.workers, len(student_ids)))
+        batches = [student_ids[i::workers] for i in range(workers)]
+
+        started = time.perf_counter()
+        run = run_processes if args.mode == 'processes' else run_threads
+        outcomes = Counter()
+        for result in run(db_path, batches, args.busy_timeout_ms):
+            outcomes.update(result)
+        seconds = time.perf_counter() - started
+
+        db_manager = DatabaseManager(db_path)
+        seats = db_manager.get_subject_seats(STRESS_SUBJECT)
+        db_manager.close_connection()
+
+    overbooked = max(seats['seats_taken'] - args.capacity, 0)
+    errors = sum(count for outcome, count in outcomes.items() if outcome.startswith(ERROR_PREFIX))
+    registered = outcomes[REGISTERED]
+    summary = {
+        'mode': args.mode,
+        'workers': workers,
+        'registrants': len(student_ids),
+        'capacity': args.capacity,
+        'seats_taken': seats['seats_taken'],
+        'overbooked': overbooked,
+        'registered': registered,
+        'errors': errors,
+        'outcomes': dict(outcomes),
+        'seconds': round(seconds, 3),
+        'registrations_per_second': round(len(student_ids) / seconds, 1) if seconds else None
+    }
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 1 if overbooked or errors or not registered else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
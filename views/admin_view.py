@@ -2,9 +2,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Dict, List
+from views.search_pipeline import DebouncedSearch
+from views.task_executor import TkTaskExecutor
+from views.paged_treeview import PagedTreeview
+from views.treeview_sync import TreeviewSync
+
+# Wait this long after the last keystroke before querying
+SEARCH_DEBOUNCE_MS = 300
+
+# Students fetched per scroll page
+STUDENT_PAGE_SIZE = 100
 
 class AdminView:
-    def __init__(self, parent, admin_controller, logout_callback):
+    def __init__(self, parent, admin_controller, logout_callback, search_debounce_ms=SEARCH_DEBOUNCE_MS,
+                 executor=None):
         self.parent = parent
         self.admin_controller = admin_controller
         self.logout_callback = logout_callback
@@ -14,8 +25,14 @@ class AdminView:
         for widget in parent.winfo_children():
             widget.destroy()
         
+        self.search_debounce_ms = search_debounce_ms
+        self.student_search = None
+        
+        # Controller calls run on the shared worker pool; results come back on the Tk thread
+        executor = executor or TkTaskExecutor.shared(parent)
+        self.tasks = executor.group(on_busy=self.show_loading, on_error=self.on_load_error)
+        
         self.setup_ui()
-        self.load_students_data()
     
     def setup_ui(self):
         # Main frame with notebook (tabs)
@@ -30,16 +47,37 @@ class AdminView:
         self.grades_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.grades_frame, text="กรอกเกรด")
         
-        # Setup tabs
-        self.setup_students_tab()
-        self.setup_grades_tab()
+        # Tabs are built and loaded the first time they are selected
+        self.tab_loaders = {
+            str(self.students_frame): self.setup_students_tab,
+            str(self.grades_frame): self.setup_grades_tab
+        }
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
         
         # Logout button
         logout_frame = ttk.Frame(self.parent)
         logout_frame.pack(fill='x', padx=10, pady=5)
         
+        self.loading_label = ttk.Label(logout_frame, text="", foreground='gray')
+        self.loading_label.pack(side='left')
+        
         ttk.Button(logout_frame, text="ออกจากระบบ", 
                   command=self.logout_callback).pack(side='right')
+        
+        self.on_tab_changed()
+    
+    def show_loading(self, busy):
+        # Shown while any of this view's controller calls is running
+        self.loading_label.config(text="กำลังโหลดข้อมูล..." if busy else "")
+        self.parent.config(cursor='watch' if busy else '')
+    
+    def on_load_error(self, error):
+        messagebox.showerror("ข้อผิดพลาด", f"โหลดข้อมูลไม่สำเร็จ: {error}")
+    
+    def on_tab_changed(self, event=None):
+        loader = self.tab_loaders.pop(self.notebook.select(), None)
+        if loader:
+            loader()
     
     def setup_students_tab(self):
         # Search and filter frame
@@ -55,7 +93,11 @@ class AdminView:
         # School filter
         ttk.Label(search_frame, text="โรงเรียน:").grid(row=0, column=2, sticky='w', padx=5)
         self.school_var = tk.StringVar()
-        self.school_combo = ttk.Combobox(search_frame, textvariable=self.school_var, state='readonly')
+        # The school list is queried when the dropdown first opens
+        self.school_combo = ttk.Combobox(search_frame, textvariable=self.school_var, state='readonly',
+                                        postcommand=self.load_schools)
+        self.school_combo.set('ทั้งหมด')
+        self.schools_loaded = False
         self.school_combo.grid(row=0, column=3, sticky='ew', padx=5)
         self.school_combo.bind('<<ComboboxSelected>>', self.on_filter_change)
         
@@ -63,7 +105,7 @@ class AdminView:
         ttk.Label(search_frame, text="เรียงตาม:").grid(row=0, column=4, sticky='w', padx=5)
         self.sort_var = tk.StringVar(value="name")
         sort_combo = ttk.Combobox(search_frame, textvariable=self.sort_var, 
-                                values=["name", "age"], state='readonly')
+                                values=["name", "age", "relevance"], state='readonly')
         sort_combo.grid(row=0, column=5, sticky='ew', padx=5)
         sort_combo.bind('<<ComboboxSelected>>', self.on_filter_change)
         
@@ -93,7 +135,12 @@ class AdminView:
         # Scrollbar for students
         students_scrollbar = ttk.Scrollbar(list_frame, orient='vertical', 
                                          command=self.students_tree.yview)
-        self.students_tree.configure(yscrollcommand=students_scrollbar.set)
+        
+        # Further pages are fetched only as the list is scrolled
+        self.students_pager = PagedTreeview(self.students_tree, students_scrollbar,
+                                            self.student_row_values, lambda student: student['student_id'],
+                                            page_size=STUDENT_PAGE_SIZE, tasks=self.tasks)
+        self.shown_student_filters = None
         
         self.students_tree.pack(side='left', fill='both', expand=True)
         students_scrollbar.pack(side='right', fill='y')
@@ -110,6 +157,17 @@ class AdminView:
         
         # Bind double-click to view profile
         self.students_tree.bind('<Double-1>', lambda e: self.view_student_profile())
+        
+        # Student searches run on the worker pool; only the latest result is shown
+        self.student_search = DebouncedSearch(
+            self.students_tree,
+            self.tasks,
+            self.search_first_page,
+            self.populate_students,
+            on_error=self.on_search_error,
+            delay_ms=self.search_debounce_ms
+        )
+        self.refresh_students()
     
     def setup_grades_tab(self):
         # Subject selection frame
@@ -148,6 +206,12 @@ class AdminView:
                                     command=self.registrations_tree.yview)
         self.registrations_tree.configure(yscrollcommand=reg_scrollbar.set)
         
+        # Rows are keyed by student_id so selections map straight back to students
+        self.registrations_rows = TreeviewSync(self.registrations_tree, lambda reg: reg['student_id'],
+                                               self.registration_row_values)
+        self.shown_subject_code = None
+        self.registrations_load = None
+        
         self.registrations_tree.pack(side='left', fill='both', expand=True)
         reg_scrollbar.pack(side='right', fill='y')
         
@@ -165,55 +229,98 @@ class AdminView:
         ttk.Button(grade_frame, text="อัพเดทเกรด", 
                   command=self.update_selected_grade).pack(side='left', padx=5)
         
+        # Multi-entry mode: grades are staged on the selected rows and saved together
+        self.pending_grades = {}
+        self.bulk_grade_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(grade_frame, text="กรอกหลายรายการ", variable=self.bulk_grade_var,
+                       command=self.on_bulk_grade_mode_change).pack(side='left', padx=5)
+        
+        self.save_grades_button = ttk.Button(grade_frame, text="บันทึกเกรดทั้งหมด",
+                                            command=self.save_pending_grades, state='disabled')
+        self.save_grades_button.pack(side='left', padx=5)
+        
         # Statistics label
         self.stats_label = ttk.Label(self.grades_frame, text="", foreground='blue')
         self.stats_label.pack(pady=5)
-    
-    def load_students_data(self):
-        # Load schools for filter
-        schools = ['ทั้งหมด'] + self.admin_controller.get_schools()
-        self.school_combo['values'] = schools
-        self.school_combo.set('ทั้งหมด')
         
         # Load subjects for grade entry
-        subjects = self.admin_controller.get_all_subjects()
+        self.tasks.submit(self.admin_controller.get_all_subjects, on_result=self.show_subjects)
+    
+    def show_subjects(self, subjects):
         subject_options = [f"{s['subject_code']}: {s['subject_name']}" for s in subjects]
         self.subject_combo['values'] = subject_options
-        
-        # Load students
-        self.refresh_students()
     
-    def refresh_students(self):
-        # Clear existing items
-        for item in self.students_tree.get_children():
-            self.students_tree.delete(item)
-        
-        # Get filter values
+    def load_schools(self):
+        # Load schools for filter; the first opening lists them once the query returns
+        if self.schools_loaded:
+            return
+        self.schools_loaded = True
+        self.tasks.submit(self.admin_controller.get_schools, on_result=self.show_schools,
+                          on_error=self.on_schools_error)
+    
+    def show_schools(self, schools):
+        self.school_combo['values'] = ['ทั้งหมด'] + schools
+    
+    def on_schools_error(self, error):
+        # Try again the next time the dropdown opens
+        self.schools_loaded = False
+        self.on_load_error(error)
+    
+    def get_search_filters(self):
         search_term = self.search_entry.get()
         school_filter = self.school_var.get() if self.school_var.get() != 'ทั้งหมด' else ''
         sort_by = self.sort_var.get()
+        return search_term, school_filter, sort_by
+    
+    def refresh_students(self):
+        filters = self.get_search_filters()
+        # Refreshing the same search re-reads every row already scrolled into view
+        page_size = STUDENT_PAGE_SIZE
+        if filters == self.shown_student_filters:
+            page_size = max(page_size, len(self.students_pager.rows))
+        self.student_search.submit_now(*filters, page_size)
+    
+    def search_first_page(self, search_term, school_filter, sort_by, page_size=STUDENT_PAGE_SIZE):
+        students = self.admin_controller.search_students_page(
+            search_term, school_filter, sort_by, page_size=page_size
+        )
+        return (search_term, school_filter, sort_by), page_size, students
+    
+    def populate_students(self, result):
+        filters, page_size, students = result
+        search_term, school_filter, sort_by = filters
         
-        # Load students with filters
-        students = self.admin_controller.search_students(search_term, school_filter, sort_by)
-        
-        for student in students:
-            # Calculate age
-            from datetime import datetime, date
-            birth_date = datetime.strptime(student['birth_date'], '%Y-%m-%d').date()
-            age = (date.today() - birth_date).days // 365
-            
-            values = (
-                student['student_id'],
-                student['first_name'],
-                student['last_name'],
-                f"{age} ปี",
-                student['current_school'],
-                student['program_name']
+        def fetch_page(after, page_size):
+            return self.admin_controller.search_students_page(
+                search_term, school_filter, sort_by, after, page_size
             )
-            self.students_tree.insert('', 'end', values=values)
+        
+        # Only a refresh of the search already shown keeps the scroll position
+        self.students_pager.reset(
+            students,
+            fetch_page,
+            lambda student: self.admin_controller.student_page_key(student, sort_by),
+            requested=page_size,
+            keep_position=filters == self.shown_student_filters
+        )
+        self.shown_student_filters = filters
+    
+    def student_row_values(self, student):
+        # Age comes computed from the query
+        return (
+            student['student_id'],
+            student['first_name'],
+            student['last_name'],
+            f"{student['age']} ปี",
+            student['current_school'],
+            student['program_name']
+        )
     
     def on_search_change(self, event):
-        self.refresh_students()
+        self.student_search.submit(*self.get_search_filters())
+    
+    def on_search_error(self, error):
+        messagebox.showerror("ข้อผิดพลาด", f"ไม่สามารถค้นหานักเรียนได้: {error}")
     
     def on_filter_change(self, event):
         self.refresh_students()
@@ -224,40 +331,37 @@ class AdminView:
             messagebox.showwarning("คำเตือน", "กรุณาเลือกนักเรียนที่ต้องการดูประวัติ")
             return
         
-        item = selection[0]
-        student_id = self.students_tree.item(item)['values'][0]
+        # Item ids are the student ids
+        student_id = selection[0]
         
-        # Open student profile window
-        self.open_student_profile_window(student_id)
+        # Open student profile window once its data has loaded
+        self.tasks.submit(self.fetch_student_profile, student_id, on_result=self.open_student_profile_window)
     
-    def open_student_profile_window(self, student_id):
-        # Create new window for student profile
-        profile_window = tk.Toplevel(self.parent)
-        profile_window.title(f"ประวัตินักเรียน - {student_id}")
-        profile_window.geometry("800x600")
-        
-        # Get student data
+    def fetch_student_profile(self, student_id):
+        # Runs on a worker thread
         student = self.admin_controller.get_student_details(student_id)
         registered_subjects = self.admin_controller.get_student_registered_subjects(student_id)
-        
+        return student_id, student, registered_subjects
+    
+    def open_student_profile_window(self, profile):
+        student_id, student, registered_subjects = profile
         if not student:
             messagebox.showerror("ข้อผิดพลาด", "ไม่พบข้อมูลนักเรียน")
-            profile_window.destroy()
             return
         
+        # Create new window for student profile
+        profile_window = tk.Toplevel(self.parent)
+        profile_window.title(f"ประวัตินักเรียน - {student_id}")
+        profile_window.geometry("800x600")
+        
         # Student info frame
         info_frame = ttk.LabelFrame(profile_window, text="ข้อมูลส่วนตัว", padding=10)
         info_frame.pack(fill='x', padx=10, pady=10)
         
-        # Calculate age
-        from datetime import datetime, date
-        birth_date = datetime.strptime(student['birth_date'], '%Y-%m-%d').date()
-        age = (date.today() - birth_date).days // 365
-        
         info_data = [
             ("รหัสนักเรียน:", student['student_id']),
-            ("ชื่อ-นามสกุล:", f"{student['prefix']}{student['first_name']} {student['last_name']}"),
-            ("วันเกิด:", f"{student['birth_date']} (อายุ {age} ปี)"),
+            ("ชื่อ-นามสกุล:", student['full_name']),
+            ("วันเกิด:", f"{student['birth_date']} (อายุ {student['age']} ปี)"),
             ("โรงเรียนปัจจุบัน:", student['current_school']),
             ("อีเมล:", student['email']),
             ("หลักสูตร:", f"{student['program_name']} ({student['department']})")
@@ -280,13 +384,12 @@ class AdminView:
             subjects_tree.column(col, width=120 if col != 'ชื่อวิชา' else 200)
         
         for subject in registered_subjects:
-            reg_date = subject['registration_date'].split()[0]  # Get date part only
             values = (
                 subject['subject_code'],
                 subject['subject_name'],
                 subject['credits'],
                 subject['grade'],
-                reg_date
+                subject['registration_day']
             )
             subjects_tree.insert('', 'end', values=values)
         
@@ -316,23 +419,23 @@ class AdminView:
         # Extract subject code
         subject_code = selected_subject.split(':')[0]
         
-        # Clear existing items
-        for item in self.registrations_tree.get_children():
-            self.registrations_tree.delete(item)
+        self.pending_grades.clear()
+        self.update_save_grades_button()
         
-        # Load registrations
-        registrations = self.admin_controller.get_subject_registrations(subject_code)
+        # Only the roster of the subject chosen last is shown
+        if self.registrations_load is not None:
+            self.registrations_load.cancel()
+        self.registrations_load = self.tasks.submit(
+            self.admin_controller.get_subject_registrations, subject_code,
+            on_result=lambda registrations: self.show_subject_registrations(subject_code, registrations)
+        )
+    
+    def show_subject_registrations(self, subject_code, registrations):
+        self.registrations_load = None
         
-        for reg in registrations:
-            reg_date = reg['registration_date'].split()[0]  # Get date part only
-            values = (
-                reg['student_id'],
-                f"{reg['prefix']}{reg['first_name']} {reg['last_name']}",
-                reg['current_school'],
-                reg['grade'],
-                reg_date
-            )
-            self.registrations_tree.insert('', 'end', values=values)
+        # Reloading the same subject only updates the rows that changed
+        self.registrations_rows.sync(registrations, keep_position=subject_code == self.shown_subject_code)
+        self.shown_subject_code = subject_code
         
         # Update statistics
         total_count = len(registrations)
@@ -348,6 +451,15 @@ class AdminView:
         
         self.stats_label.config(text=stats_text)
     
+    def registration_row_values(self, reg):
+        return (
+            reg['student_id'],
+            reg['full_name'],
+            reg['current_school'],
+            reg['grade'],
+            reg['registration_day']
+        )
+    
     def update_selected_grade(self):
         # Check if subject is selected
         if not self.subject_var.get():
@@ -366,28 +478,73 @@ class AdminView:
             messagebox.showwarning("คำเตือน", "กรุณาเลือกเกรดที่ต้องการให้")
             return
         
-        # Get selected data
-        item = selection[0]
-        student_id = self.registrations_tree.item(item)['values'][0]
-        student_name = self.registrations_tree.item(item)['values'][1]
-        subject_code = self.subject_var.get().split(':')[0]
+        if self.bulk_grade_var.get():
+            self.stage_grades(selection, new_grade)
+            return
         
         # Confirm update
-        result = messagebox.askyesno("ยืนยันการอัพเดท", 
-                                   f"ต้องการอัพเดทเกรดของ\n{student_name} ({student_id})\n"
-                                   f"เป็น {new_grade} ใช่หรือไม่?")
-        
-        if result:
-            success = self.admin_controller.update_student_grade(student_id, subject_code, new_grade)
-            
-            if success:
-                messagebox.showinfo("สำเร็จ", "อัพเดทเกรดเรียบร้อยแล้ว")
-                self.load_subject_registrations()  # Refresh the list
-                self.grade_var.set('')  # Clear grade selection
-            else:
-                messagebox.showerror("ข้อผิดพลาด", "ไม่สามารถอัพเดทเกรดได้")
+        if len(selection) == 1:
+            student_id = selection[0]
+            student_name = self.registrations_rows.values(student_id)[1]
+            question = f"ต้องการอัพเดทเกรดของ\n{student_name} ({student_id})\nเป็น {new_grade} ใช่หรือไม่?"
+        else:
+            question = f"ต้องการอัพเดทเกรดของนักเรียน {len(selection)} คน\nเป็น {new_grade} ใช่หรือไม่?"
+        
+        if messagebox.askyesno("ยืนยันการอัพเดท", question):
+            self.post_grades([(student_id, new_grade) for student_id in selection])
+    
+    def on_bulk_grade_mode_change(self):
+        # Leaving multi-entry mode discards grades that were not saved
+        if not self.bulk_grade_var.get() and self.pending_grades:
+            self.load_subject_registrations()
+        self.update_save_grades_button()
+    
+    def stage_grades(self, student_ids, grade):
+        for student_id in student_ids:
+            self.pending_grades[student_id] = grade
+            self.registrations_rows.set_cell(student_id, 'เกรดปัจจุบัน', f"{grade} *")
+        self.update_save_grades_button()
+    
+    def update_save_grades_button(self):
+        count = len(self.pending_grades)
+        self.save_grades_button.config(
+            text=f"บันทึกเกรดทั้งหมด ({count})" if count else "บันทึกเกรดทั้งหมด",
+            state='normal' if self.bulk_grade_var.get() and count else 'disabled'
+        )
+    
+    def save_pending_grades(self):
+        if not self.pending_grades:
+            return
+        
+        if messagebox.askyesno("ยืนยันการอัพเดท",
+                               f"ต้องการบันทึกเกรดของนักเรียน {len(self.pending_grades)} คนใช่หรือไม่?"):
+            self.post_grades(list(self.pending_grades.items()))
+    
+    def post_grades(self, grades):
+        subject_code = self.subject_var.get().split(':')[0]
+        self.tasks.submit(self.admin_controller.update_student_grades, subject_code, grades,
+                          on_result=self.show_grade_results)
+    
+    def show_grade_results(self, results):
+        failures = [r for r in results if not r['success']]
+        
+        if failures:
+            details = "\n".join(f"{r['student_id']}: {r['message']}" for r in failures[:10])
+            messagebox.showerror("ข้อผิดพลาด",
+                                 f"อัพเดทสำเร็จ {len(results) - len(failures)} จาก {len(results)} รายการ\n{details}")
+        else:
+            messagebox.showinfo("สำเร็จ", f"อัพเดทเกรดเรียบร้อยแล้ว ({len(results)} รายการ)")
+        
+        self.load_subject_registrations()  # Refresh the list
+        self.grade_var.set('')  # Clear grade selection
     
     def destroy(self):
+        if self.student_search:
+            self.student_search.close()
+        # Results still in flight are dropped instead of touching destroyed widgets
+        self.tasks.close()
+        self.parent.config(cursor='')
+        
         # Clear the parent window
         for widget in self.parent.winfo_children():
             widget.destroy()
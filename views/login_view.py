@@ -1,16 +1,22 @@
 # views/login_view.py
 import tkinter as tk
 from tkinter import ttk, messagebox
+from views.task_executor import TkTaskExecutor
 
 class LoginView:
-    def __init__(self, parent, on_login_callback):
+    def __init__(self, parent, auth_controller, on_login_callback, executor=None):
         self.parent = parent
+        self.auth_controller = auth_controller
         self.on_login_callback = on_login_callback
         
         # Clear the parent window
         for widget in parent.winfo_children():
             widget.destroy()
         
+        # Password checks run on the shared worker pool so the window stays responsive
+        executor = executor or TkTaskExecutor.shared(parent)
+        self.tasks = executor.group(on_busy=self.show_loading, on_error=self.on_login_error)
+        
         self.setup_ui()
     
     def setup_ui(self):
@@ -38,8 +44,8 @@ class LoginView:
         self.password_entry.grid(row=1, column=1, sticky='ew', pady=5, padx=(10, 0))
         
         # Login button
-        login_btn = ttk.Button(login_frame, text="เข้าสู่ระบบ", command=self.handle_login)
-        login_btn.grid(row=2, column=0, columnspan=2, pady=20)
+        self.login_btn = ttk.Button(login_frame, text="เข้าสู่ระบบ", command=self.handle_login)
+        self.login_btn.grid(row=2, column=0, columnspan=2, pady=20)
         
         # Configure column weight
         login_frame.columnconfigure(1, weight=1)
@@ -66,22 +72,31 @@ class LoginView:
             messagebox.showerror("ข้อผิดพลาด", "กรุณากรอกรหัสผู้ใช้และรหัสผ่าน")
             return
         
-        # Import here to avoid circular imports
-        from controllers.auth_controller import AuthController
-        from models.database_manager import DatabaseManager
-        
-        db_manager = DatabaseManager()
-        auth_controller = AuthController(db_manager)
-        
-        success, user_id, user_type = auth_controller.authenticate(username, password)
-        
-        if success:
-            self.on_login_callback(user_id, user_type)
+        # Ignore Enter or clicks while a login is already being checked
+        if self.tasks.busy:
+            return
+        self.tasks.submit(self.auth_controller.login, username, password, on_result=self.show_login_result)
+    
+    def show_login_result(self, session):
+        if session:
+            self.on_login_callback(session)
         else:
             messagebox.showerror("ข้อผิดพลาด", "รหัสผู้ใช้หรือรหัสผ่านไม่ถูกต้อง")
             self.password_entry.delete(0, tk.END)
     
+    def show_loading(self, busy):
+        self.login_btn.config(state='disabled' if busy else 'normal',
+                              text="กำลังเข้าสู่ระบบ..." if busy else "เข้าสู่ระบบ")
+        self.parent.config(cursor='watch' if busy else '')
+    
+    def on_login_error(self, error):
+        messagebox.showerror("ข้อผิดพลาด", f"เข้าสู่ระบบไม่สำเร็จ: {error}")
+    
     def destroy(self):
+        # A login still being checked is dropped
+        self.tasks.close()
+        self.parent.config(cursor='')
+        
         # Clear the parent window
         for widget in self.parent.winfo_children():
             widget.destroy()
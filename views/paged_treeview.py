@@ -0,0 +1,98 @@
+# views/paged_treeview.py
+from typing import Callable, Dict, List, Optional
+from views.task_executor import TaskGroup
+from views.treeview_sync import TreeviewSync
+
+class PagedTreeview:
+    """
+    Fill a Treeview one page at a time as the user scrolls towards the end.
+    Only rows that have been scrolled into reach are ever fetched. Rows are keyed
+    by `row_key`, so a reset that shows the same rows again only touches the
+    ones that changed. With `tasks`, pages are fetched off the Tk thread.
+    """
+    def __init__(self, tree, scrollbar, render_row: Callable[[Dict], tuple], row_key: Callable[[Dict], object],
+                 page_size: int = 100, prefetch_fraction: float = 0.9, tasks: Optional[TaskGroup] = None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.tasks = tasks
+        self.rows = TreeviewSync(tree, row_key, render_row)
+        self.page_size = page_size
+        self.prefetch_fraction = prefetch_fraction
+
+        self.fetch_page = None
+        self.page_key = None
+        self.last_row = None
+        self.exhausted = True
+        self._load_after = None
+        self._loading = None
+        self._generation = 0
+
+        self.tree.configure(yscrollcommand=self._on_yscroll)
+
+    def reset(self, first_page: List[Dict], fetch_page: Callable[[Optional[tuple], int], List[Dict]],
+              page_key: Callable[[Dict], tuple], requested: Optional[int] = None, keep_position: bool = False):
+        """
+        Show `first_page` and remember how to fetch the ones after it.
+        fetch_page(after_key, page_size) returns the next rows; page_key(row) gives a row's seek key.
+        `requested` is how many rows first_page was asked for (default page_size); a refresh
+        asks for as many rows as are shown and passes keep_position to stay where the user was.
+        """
+        self._cancel_pending_load()
+        self._generation += 1
+        self.fetch_page = fetch_page
+        self.page_key = page_key
+
+        self.rows.sync(first_page, keep_position=keep_position)
+        self.last_row = first_page[-1] if first_page else None
+        self.exhausted = len(first_page) < (requested or self.page_size)
+
+    def load_next_page(self):
+        self._load_after = None
+        if self.exhausted or self.fetch_page is None or self._loading is not None:
+            return
+        after = self.page_key(self.last_row) if self.last_row is not None else None
+        if self.tasks is None:
+            self._append(self.fetch_page(after, self.page_size))
+            return
+
+        generation = self._generation
+        self._loading = self.tasks.submit(
+            self.fetch_page, after, self.page_size,
+            on_result=lambda rows: self._page_loaded(generation, rows),
+            on_error=lambda error: self._page_failed(generation, error)
+        )
+
+    def _page_loaded(self, generation, rows: List[Dict]):
+        self._loading = None
+        # A page of a search that has since been replaced is dropped
+        if generation == self._generation:
+            self._append(rows)
+
+    def _page_failed(self, generation, error: Exception):
+        self._loading = None
+        if generation == self._generation:
+            # Stop, rather than retry on every scroll
+            self.exhausted = True
+            self.tasks.report_error(error)
+
+    def _append(self, rows: List[Dict]):
+        self.rows.append(rows)
+        if rows:
+            self.last_row = rows[-1]
+        self.exhausted = len(rows) < self.page_size
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+
+        # Also fires when a page does not fill the view, which keeps loading until it does
+        if (not self.exhausted and self._load_after is None and self._loading is None
+                and float(last) >= self.prefetch_fraction):
+            self._load_after = self.tree.after_idle(self.load_next_page)
+
+    def _cancel_pending_load(self):
+        if self._load_after is not None:
+            self.tree.after_cancel(self._load_after)
+            self._load_after = None
+        if self._loading is not None:
+            self._loading.cancel()
+            self._loading = None
@@ -0,0 +1,96 @@
+# views/search_pipeline.py
+import tkinter as tk
+from typing import Callable, Optional
+from views.task_executor import TaskGroup
+
+class DebouncedSearch:
+    """
+    Run a search through a view's TaskGroup after the user stops typing. One
+    search runs at a time; requests made meanwhile collapse into the newest, and
+    only the result of the most recent request is handed back to the Tk thread.
+    """
+    def __init__(self, widget, tasks: TaskGroup, search_func: Callable, on_result: Callable,
+                 on_error: Optional[Callable] = None, delay_ms: int = 300):
+        self.widget = widget
+        self.tasks = tasks
+        self.search_func = search_func
+        self.on_result = on_result
+        self.on_error = on_error
+        self.delay_ms = delay_ms
+
+        self._generation = 0
+        self._debounce_after = None
+        self._running = None
+        self._queued = None
+        self._closed = False
+
+    def submit(self, *args):
+        """Schedule a search once the debounce window passes without new input"""
+        if self._closed:
+            return
+        self._cancel_debounce()
+        self._debounce_after = self.widget.after(self.delay_ms, self._dispatch, args)
+
+    def submit_now(self, *args):
+        """Run a search immediately, superseding any pending one"""
+        if self._closed:
+            return
+        self._cancel_debounce()
+        self._dispatch(args)
+
+    def cancel(self):
+        """Drop the pending search and ignore any result still in flight"""
+        self._cancel_debounce()
+        self._generation += 1
+        self._queued = None
+
+    def close(self):
+        self.cancel()
+        self._closed = True
+        if self._running is not None:
+            self._running.cancel()
+            self._running = None
+
+    def _dispatch(self, args):
+        self._debounce_after = None
+        self._generation += 1
+        self._queued = (self._generation, args)
+        if self._running is None:
+            self._start_queued()
+
+    def _start_queued(self):
+        generation, args = self._queued
+        self._queued = None
+        self._running = self.tasks.submit(
+            self.search_func, *args,
+            on_result=lambda result: self._finished(generation, result, None),
+            on_error=lambda error: self._finished(generation, None, error)
+        )
+
+    def _finished(self, generation, result, error):
+        self._running = None
+        # Skip straight to the newest request if the user kept typing
+        if self._queued is not None:
+            self._start_queued()
+            return
+        if generation != self._generation:
+            return
+
+        if error is None:
+            self.on_result(result)
+        elif self.on_error:
+            self.on_error(error)
+        else:
+            self.tasks.report_error(error)
+
+    def _cancel_debounce(self):
+        if self._debounce_after:
+            self._after_cancel(self._debounce_after)
+            self._debounce_after = None
+
+    def _after_cancel(self, after_id):
+        try:
+            self.widget.after_cancel(after_id)
+        except tk.TclError:
+            # The widget is already gone along with its timers
+            pass
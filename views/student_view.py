@@ -2,9 +2,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Dict, List
+from models.change_events import REGISTRATION_ADDED
+from views.task_executor import TkTaskExecutor
+from views.treeview_sync import TreeviewSync
 
 class StudentView:
-    def __init__(self, parent, student_controller, student_id, logout_callback):
+    def __init__(self, parent, student_controller, student_id, logout_callback, executor=None):
         self.parent = parent
         self.student_controller = student_controller
         self.student_id = student_id
@@ -14,8 +17,18 @@ class StudentView:
         for widget in parent.winfo_children():
             widget.destroy()
         
+        # Controller calls run on the shared worker pool; results come back on the Tk thread
+        executor = executor or TkTaskExecutor.shared(parent)
+        self.tasks = executor.group(on_busy=self.show_loading, on_error=self.on_load_error)
+        
         self.setup_ui()
         self.load_student_data()
+        
+        # Registrations are applied as deltas rather than by reloading the dashboard.
+        # They are published on the worker that registered, so the delta is handed to the Tk thread
+        self.unsubscribe_registrations = student_controller.events.subscribe(
+            REGISTRATION_ADDED, lambda delta: self.tasks.call_in_tk(self.on_registration_added, delta)
+        )
     
     def setup_ui(self):
         # Main frame with notebook (tabs)
@@ -40,9 +53,20 @@ class StudentView:
         logout_frame = ttk.Frame(self.parent)
         logout_frame.pack(fill='x', padx=10, pady=5)
         
+        self.loading_label = ttk.Label(logout_frame, text="", foreground='gray')
+        self.loading_label.pack(side='left')
+        
         ttk.Button(logout_frame, text="ออกจากระบบ", 
                   command=self.logout_callback).pack(side='right')
     
+    def show_loading(self, busy):
+        # Shown while any of this view's controller calls is running
+        self.loading_label.config(text="กำลังโหลดข้อมูล..." if busy else "")
+        self.parent.config(cursor='watch' if busy else '')
+    
+    def on_load_error(self, error):
+        messagebox.showerror("ข้อผิดพลาด", f"โหลดข้อมูลไม่สำเร็จ: {error}")
+    
     def setup_profile_tab(self):
         # Student info frame
         info_frame = ttk.LabelFrame(self.profile_frame, text="ข้อมูลส่วนตัว", padding=10)
@@ -83,6 +107,8 @@ class StudentView:
         registered_scrollbar = ttk.Scrollbar(subjects_frame, orient='vertical', 
                                            command=self.registered_tree.yview)
         self.registered_tree.configure(yscrollcommand=registered_scrollbar.set)
+        self.registered_rows = TreeviewSync(self.registered_tree, lambda subject: subject['subject_code'],
+                                            self.registered_row_values)
         
         self.registered_tree.pack(side='left', fill='both', expand=True)
         registered_scrollbar.pack(side='right', fill='y')
@@ -109,6 +135,8 @@ class StudentView:
         available_scrollbar = ttk.Scrollbar(available_frame, orient='vertical', 
                                           command=self.available_tree.yview)
         self.available_tree.configure(yscrollcommand=available_scrollbar.set)
+        self.available_rows = TreeviewSync(self.available_tree, lambda subject: subject['subject_code'],
+                                           self.available_row_values)
         
         self.available_tree.pack(side='left', fill='both', expand=True)
         available_scrollbar.pack(side='right', fill='y')
@@ -127,84 +155,81 @@ class StudentView:
         self.available_tree.bind('<Double-1>', lambda e: self.register_selected_subject())
     
     def load_student_data(self):
-        # Load student profile
+        self.tasks.submit(self.fetch_student_data, on_result=self.show_student_data)
+    
+    def fetch_student_data(self):
+        # Runs on a worker thread; show_student_data fills the widgets
         profile = self.student_controller.get_student_profile(self.student_id)
+        return {
+            'profile': profile,
+            'summary': self.student_controller.get_academic_summary(self.student_id) if profile else None,
+            'registered': self.student_controller.get_student_registered_subjects(self.student_id),
+            'available': self.student_controller.get_available_subjects(self.student_id)
+        }
+    
+    def show_student_data(self, data):
+        # Load student profile
+        profile = data['profile']
         if profile:
-            # Calculate age
-            from datetime import datetime, date
-            birth_date = datetime.strptime(profile['birth_date'], '%Y-%m-%d').date()
-            age = (date.today() - birth_date).days // 365
-            
-            # Update info labels
+            # Update info labels; age and full name come computed from the query
             self.info_labels['student_id'].config(text=profile['student_id'])
-            self.info_labels['full_name'].config(text=f"{profile['prefix']}{profile['first_name']} {profile['last_name']}")
+            self.info_labels['full_name'].config(text=profile['full_name'])
             self.info_labels['birth_date'].config(text=profile['birth_date'])
-            self.info_labels['age'].config(text=f"{age} ปี")
+            self.info_labels['age'].config(text=f"{profile['age']} ปี")
             self.info_labels['current_school'].config(text=profile['current_school'])
             self.info_labels['email'].config(text=profile['email'])
             self.info_labels['program_info'].config(text=f"{profile['program_name']} ({profile['department']})")
             
             # Calculate and display GPA and credits
-            gpa = self.student_controller.get_student_gpa(self.student_id)
-            credits = self.student_controller.get_completed_credits(self.student_id)
-            self.info_labels['gpa'].config(text=f"{gpa:.2f}")
-            self.info_labels['completed_credits'].config(text=f"{credits} หน่วยกิต")
-        
-        # Load registered subjects
-        self.load_registered_subjects()
-        
-        # Load available subjects
-        self.load_available_subjects()
-    
-    def load_registered_subjects(self):
-        # Clear existing items
-        for item in self.registered_tree.get_children():
-            self.registered_tree.delete(item)
-        
-        subjects = self.student_controller.get_student_registered_subjects(self.student_id)
-        for subject in subjects:
-            # Format registration date
-            reg_date = subject['registration_date'].split()[0]  # Get date part only
-            
-            values = (
-                subject['subject_code'],
-                subject['subject_name'],
-                subject['credits'],
-                subject['instructor'],
-                subject['grade'],
-                reg_date
-            )
-            self.registered_tree.insert('', 'end', values=values)
-    
-    def load_available_subjects(self):
-        # Clear existing items
-        for item in self.available_tree.get_children():
-            self.available_tree.delete(item)
-        
-        subjects = self.student_controller.get_available_subjects(self.student_id)
-        for subject in subjects:
-            status = "✓ ลงได้" if subject['can_register'] else "✗ ลงไม่ได้"
-            
-            values = (
-                subject['subject_code'],
-                subject['subject_name'],
-                subject['credits'],
-                subject['instructor'],
-                subject['semester'],
-                status,
-                subject['prerequisite_status']
-            )
-            
-            item = self.available_tree.insert('', 'end', values=values)
-            
-            # Color code the items
-            if not subject['can_register']:
-                self.available_tree.set(item, '0', subject['subject_code'])
-                # You might want to change the foreground color here
+            self.show_academic_summary(data['summary'])
+        
+        # Only rows that changed since the last load are touched
+        self.registered_rows.sync(data['registered'])
+        self.available_rows.sync(data['available'])
+    
+    def show_academic_summary(self, summary):
+        self.info_labels['gpa'].config(text=f"{summary['gpa']:.2f}")
+        self.info_labels['completed_credits'].config(text=f"{summary['completed_credits']} หน่วยกิต")
+    
+    def on_registration_added(self, delta):
+        if delta['student_id'] != self.student_id:
+            return
+        
+        # The new registration goes last, as it is the latest; nothing else is re-read
+        self.registered_rows.append([delta['registration']])
+        self.available_rows.remove(delta['removed_subject_code'])
+        self.available_rows.update(delta['eligibility_changes'])
+        self.show_academic_summary(delta['summary'])
+    
+    def registered_row_values(self, subject):
+        return (
+            subject['subject_code'],
+            subject['subject_name'],
+            subject['credits'],
+            subject['instructor'],
+            subject['grade'],
+            subject['registration_day']
+        )
+    
+    def available_row_values(self, subject):
+        status = "✓ ลงได้" if subject['can_register'] else "✗ ลงไม่ได้"
+        return (
+            subject['subject_code'],
+            subject['subject_name'],
+            subject['credits'],
+            subject['instructor'],
+            subject['semester'],
+            status,
+            subject['prerequisite_status']
+        )
     
     def refresh_available_subjects(self):
         """Refresh the available subjects list"""
-        self.load_available_subjects()
+        self.tasks.submit(self.student_controller.get_available_subjects, self.student_id,
+                          on_result=self.show_refreshed_subjects)
+    
+    def show_refreshed_subjects(self, subjects):
+        self.available_rows.sync(subjects)
         messagebox.showinfo("สำเร็จ", "รีเฟรชข้อมูลเรียบร้อยแล้ว")
     
     def register_selected_subject(self):
@@ -213,10 +238,11 @@ class StudentView:
             messagebox.showwarning("คำเตือน", "กรุณาเลือกวิชาที่ต้องการลงทะเบียน")
             return
         
-        item = selection[0]
-        subject_code = self.available_tree.item(item)['values'][0]
-        subject_name = self.available_tree.item(item)['values'][1]
-        status = self.available_tree.item(item)['values'][5]
+        # Item ids are the subject codes, kept as strings
+        subject_code = selection[0]
+        values = self.available_rows.values(subject_code)
+        subject_name = values[1]
+        status = values[5]
         
         if "ลงไม่ได้" in status:
             messagebox.showerror("ข้อผิดพลาด", "ไม่สามารถลงทะเบียนวิชานี้ได้ กรุณาตรวจสอบข้อกำหนด")
@@ -227,17 +253,24 @@ class StudentView:
                                    f"คุณต้องการลงทะเบียนวิชา\n{subject_code}: {subject_name}\nใช่หรือไม่?")
         
         if result:
-            success, message = self.student_controller.register_for_subject(self.student_id, subject_code)
-            
-            if success:
-                messagebox.showinfo("สำเร็จ", message)
-                # Switch to profile tab and refresh data
-                self.notebook.select(0)  # Select profile tab
-                self.load_student_data()
-            else:
-                messagebox.showerror("ข้อผิดพลาด", message)
+            self.tasks.submit(self.student_controller.register_for_subject, self.student_id, subject_code,
+                              on_result=self.show_registration_result)
+    
+    def show_registration_result(self, result):
+        success, message = result
+        if success:
+            messagebox.showinfo("สำเร็จ", message)
+            # The grids were already updated from the registration delta
+            self.notebook.select(0)  # Select profile tab
+        else:
+            messagebox.showerror("ข้อผิดพลาด", message)
     
     def destroy(self):
+        self.unsubscribe_registrations()
+        # Results still in flight are dropped instead of touching destroyed widgets
+        self.tasks.close()
+        self.parent.config(cursor='')
+        
         # Clear the parent window
         for widget in self.parent.winfo_children():
             widget.destroy()
@@ -0,0 +1,183 @@
+# views/task_executor.py
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Set
+
+class Task:
+    """A call submitted to TkTaskExecutor; cancel() drops its result"""
+    __slots__ = ('future', 'on_result', 'on_error', 'group', 'cancelled')
+
+    def __init__(self, future, on_result: Optional[Callable], on_error: Optional[Callable], group):
+        self.future = future
+        self.on_result = on_result
+        self.on_error = on_error
+        self.group = group
+        self.cancelled = False
+
+    def cancel(self):
+        # A call already running finishes on its worker, but its result is never delivered
+        self.cancelled = True
+        self.future.cancel()
+
+class TkTaskExecutor:
+    """
+    Run blocking calls (controller and database work) on a worker pool so the
+    window keeps responding. The Tk thread polls for finished calls with after()
+    while any are outstanding, and result and error callbacks always run there.
+    Views submit through a TaskGroup (see group()), which shows their loading
+    state and drops late results once the view is destroyed.
+    """
+    def __init__(self, root, max_workers: int = 4, poll_ms: int = 30):
+        self.root = root
+        self.poll_ms = poll_ms
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tk-task")
+        self._tasks = []
+        self._calls = queue.SimpleQueue()
+        self._poll_after = None
+        self._tk_thread = threading.get_ident()
+        self._closed = False
+
+    @classmethod
+    def shared(cls, widget) -> 'TkTaskExecutor':
+        """The executor of widget's window, created on first use"""
+        root = widget.winfo_toplevel()
+        executor = getattr(root, '_task_executor', None)
+        if executor is None:
+            executor = root._task_executor = cls(root)
+        return executor
+
+    def group(self, on_busy: Optional[Callable[[bool], None]] = None,
+              on_error: Optional[Callable[[Exception], None]] = None) -> 'TaskGroup':
+        return TaskGroup(self, on_busy, on_error)
+
+    def submit(self, func: Callable, *args, on_result: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, group: Optional['TaskGroup'] = None) -> Optional[Task]:
+        """Run func(*args) on a worker; on_result(value) or on_error(exception) follow on the Tk thread"""
+        if self._closed:
+            return None
+        task = Task(self._pool.submit(func, *args), on_result, on_error, group)
+        self._tasks.append(task)
+        self._schedule_poll()
+        return task
+
+    def call_in_tk(self, func: Callable, *args):
+        """
+        Run func(*args) on the Tk thread: at once when called there, otherwise at
+        the next poll. Worker threads rely on the poll their own task keeps alive,
+        so calls made from a task are delivered before the task's result.
+        """
+        if threading.get_ident() == self._tk_thread:
+            func(*args)
+        else:
+            self._calls.put((func, args))
+
+    def shutdown(self):
+        self._closed = True
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._poll_after is not None:
+            self.root.after_cancel(self._poll_after)
+            self._poll_after = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_poll(self):
+        if self._poll_after is None:
+            self._poll_after = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_after = None
+
+        while True:
+            try:
+                func, args = self._calls.get_nowait()
+            except queue.Empty:
+                break
+            self._run_callback(func, *args)
+
+        finished = [task for task in self._tasks if task.future.done()]
+        self._tasks = [task for task in self._tasks if not task.future.done()]
+        for task in finished:
+            if task.group is not None:
+                task.group._finished(task)
+            if task.cancelled:
+                continue
+            error = task.future.exception()
+            if error is None:
+                if task.on_result:
+                    self._run_callback(task.on_result, task.future.result())
+            elif task.on_error:
+                self._run_callback(task.on_error, error)
+            else:
+                self.root.report_callback_exception(type(error), error, error.__traceback__)
+
+        if self._tasks and not self._closed:
+            self._schedule_poll()
+
+    def _run_callback(self, func: Callable, *args):
+        # One failing callback must not stop the others or the polling
+        try:
+            func(*args)
+        except Exception:
+            self.root.report_callback_exception(*sys.exc_info())
+
+class TaskGroup:
+    """
+    The tasks of one view. on_busy(True) is called when the first of them starts
+    and on_busy(False) when the last one finishes. close() cancels the ones still
+    outstanding; nothing is delivered to the view after that.
+    """
+    def __init__(self, executor: TkTaskExecutor, on_busy: Optional[Callable[[bool], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        self.executor = executor
+        self.on_busy = on_busy
+        self.on_error = on_error
+        self.closed = False
+        self._tasks: Set[Task] = set()
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._tasks)
+
+    def submit(self, func: Callable, *args, on_result: Optional[Callable] = None,
+               on_error: Optional[Callable] = None) -> Optional[Task]:
+        """Like TkTaskExecutor.submit; errors without an on_error go to the group's"""
+        if self.closed:
+            return None
+        task = self.executor.submit(func, *args, on_result=on_result,
+                                    on_error=on_error or self.on_error, group=self)
+        if task is not None:
+            self._tasks.add(task)
+            if len(self._tasks) == 1:
+                self._set_busy(True)
+        return task
+
+    def call_in_tk(self, func: Callable, *args):
+        """TkTaskExecutor.call_in_tk, skipped if the group is closed by then"""
+        def call():
+            if not self.closed:
+                func(*args)
+        self.executor.call_in_tk(call)
+
+    def report_error(self, error: Exception):
+        if self.on_error:
+            self.on_error(error)
+        else:
+            self.executor.root.report_callback_exception(type(error), error, error.__traceback__)
+
+    def close(self):
+        self.closed = True
+        for task in self._tasks:
+            task.cancel()
+
+    def _finished(self, task: Task):
+        self._tasks.discard(task)
+        if not self._tasks:
+            self._set_busy(False)
+
+    def _set_busy(self, busy: bool):
+        if self.on_busy and not self.closed:
+            self.on_busy(busy)
@@ -0,0 +1,112 @@
+# views/treeview_sync.py
+from typing import Callable, Dict, Iterable, List, Optional
+
+class TreeviewSync:
+    """
+    Keep a Treeview in step with a list of rows keyed by primary key. Each
+    refresh inserts, updates, moves or deletes only the rows that changed, so
+    selection and scroll position survive it.
+
+    Rows are inserted with iid=key(row), so tree.selection() returns keys
+    as strings. Reading them back from item values would turn codes such
+    as '05500101' into ints.
+    """
+    def __init__(self, tree, key: Callable[[Dict], object], render_row: Callable[[Dict], tuple]):
+        self.tree = tree
+        self.key = key
+        self.render_row = render_row
+        # Values as last written for each displayed key, in display order
+        self._values: Dict[str, tuple] = {}
+
+    def sync(self, rows: Iterable[Dict], keep_position: bool = True) -> Dict[str, int]:
+        """Make the tree show exactly `rows`, in order; returns what had to change"""
+        wanted = {}
+        for row in rows:
+            wanted[str(self.key(row))] = tuple(self.render_row(row))
+        counts = {'inserted': 0, 'updated': 0, 'deleted': 0, 'moved': 0}
+        first_visible = self.tree.yview()[0] if keep_position else 0.0
+
+        removed = [iid for iid in self._values if iid not in wanted]
+        if removed:
+            self.tree.delete(*removed)
+            counts['deleted'] = len(removed)
+
+        for index, (iid, values) in enumerate(wanted.items()):
+            shown = self._values.get(iid)
+            if shown is None:
+                self.tree.insert('', index, iid=iid, values=values)
+                counts['inserted'] += 1
+            elif shown != values:
+                self.tree.item(iid, values=values)
+                counts['updated'] += 1
+
+        # Rows that survived keep their old positions; put them in the new order
+        order = list(wanted)
+        current = self.tree.get_children('')
+        if list(current) != order:
+            start = next(i for i, (a, b) in enumerate(zip(current, order)) if a != b)
+            for index in range(start, len(order)):
+                self.tree.move(order[index], '', index)
+            counts['moved'] = len(order) - start
+
+        self._values = wanted
+        self.tree.yview_moveto(first_visible)
+        return counts
+
+    def append(self, rows: Iterable[Dict]) -> List[Dict]:
+        """Add rows after the ones shown; a row already shown is updated where it is"""
+        rows = list(rows)
+        for row in rows:
+            iid = str(self.key(row))
+            values = tuple(self.render_row(row))
+            shown = self._values.get(iid)
+            if shown is None:
+                self.tree.insert('', 'end', iid=iid, values=values)
+            elif shown != values:
+                self.tree.item(iid, values=values)
+            self._values[iid] = values
+        return rows
+
+    def update(self, rows: Iterable[Dict]) -> int:
+        """Rewrite rows that are shown, where they are; rows not shown are ignored"""
+        updated = 0
+        for row in rows:
+            iid = str(self.key(row))
+            values = tuple(self.render_row(row))
+            if iid in self._values and self._values[iid] != values:
+                self.tree.item(iid, values=values)
+                self._values[iid] = values
+                updated += 1
+        return updated
+
+    def remove(self, *iids: str) -> int:
+        """Delete the given rows if shown; returns how many were"""
+        shown = [iid for iid in iids if iid in self._values]
+        if shown:
+            self.tree.delete(*shown)
+            for iid in shown:
+                del self._values[iid]
+        return len(shown)
+
+    def set_cell(self, iid: str, column: str, value):
+        """Change one displayed cell, keeping track of it so the next sync sees the difference"""
+        self.tree.set(iid, column, value)
+        columns = self.tree['columns']
+        values = list(self._values[iid])
+        values[list(columns).index(column)] = value
+        self._values[iid] = tuple(values)
+
+    def clear(self):
+        if self._values:
+            self.tree.delete(*self._values)
+        self._values = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, iid: str) -> bool:
+        return iid in self._values
+
+    def values(self, iid: str) -> Optional[tuple]:
+        """The values last written for `iid` (unlike tree.item(), strings stay strings)"""
+        return self._values.get(iid)